@@ -0,0 +1,103 @@
+import sys
+import numpy as np
+from contextlib import closing
+from results_store import DB_PATH, CSV_NAME, AWARD_ORDER, AWARD_RANK, connect
+'''
+结果分析: 把结果库一次性读成 NumPy 数组, 预先算好 (年份, 题目, 奖项) 三维立方体
+- counts: 获奖数量
+- share: 占该题参赛队伍的比例
+- cum_share: 按奖项等级 O→N 累计的比例, 例如 cum_share[..., M] 即“M 及以上”的比例
+- yoy: 与上一年相比的增长率(第一年、上一年为 0 时为 nan)
+- rank: 各奖项的等级(README 中的 Rank 列: O-1, F-2, M-3, H-4, S-5, U/D/N-6)
+
+所有视图都是数组切片, 不再逐行扫描 CSV
+'''
+
+# 题目顺序与 CSV 一致: MCM A/B/C, ICM D/E/F
+COLUMNS = [("MCM", "A"), ("MCM", "B"), ("MCM", "C"), ("ICM", "D"), ("ICM", "E"), ("ICM", "F")]
+AWARDS = list(AWARD_ORDER)
+RANK = np.array([AWARD_RANK[a] for a in AWARDS], dtype=np.int8)
+
+
+class ResultsCube:
+    """years: (Y,); counts / share / cum_share / yoy: (Y, 6, 8), 轴依次为 年份 / COLUMNS / AWARDS"""
+
+    def __init__(self, years, counts):
+        self.years = np.asarray(years, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.totals = self.counts.sum(axis=2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denom = self.totals[:, :, None].astype(float)
+            self.share = np.where(denom > 0, self.counts / denom, np.nan)
+            self.cum_share = np.where(denom > 0, np.cumsum(self.counts, axis=2) / denom, np.nan)
+            prev = self.counts[:-1].astype(float)
+            growth = np.where(prev > 0, (self.counts[1:] - prev) / prev, np.nan)
+        self.yoy = np.concatenate([np.full((1,) + self.counts.shape[1:], np.nan), growth])
+        self.rank = RANK
+
+    # -----------------------------------
+    # 选择器
+    # -----------------------------------
+    def _index(self, year=None, contest_type=None, problem=None, award=None):
+        """把筛选条件转换为三个轴上的下标数组"""
+        yi = np.arange(len(self.years)) if year is None else np.flatnonzero(np.isin(self.years, year))
+        pi = np.array([i for i, (t, p) in enumerate(COLUMNS)
+                       if contest_type in (None, t) and problem in (None, p)], dtype=np.intp)
+        ai = np.arange(len(AWARDS)) if award is None else np.array([AWARDS.index(award)])
+        return np.ix_(yi, pi, ai)
+
+    def view(self, name: str = "counts", year=None, contest_type=None, problem=None, award=None):
+        """返回某个指标的子立方体, 如 cube.view("cum_share", contest_type="MCM", award="M")"""
+        return getattr(self, name)[self._index(year, contest_type, problem, award)]
+
+    def at_or_better(self, award: str = "M"):
+        """(Y, 6): 获得 award 及以上奖项的比例"""
+        return self.cum_share[:, :, AWARDS.index(award)]
+
+    def rows(self):
+        """展开为 [年份, 题号, 赛别, 奖项, 数量, 等级] 行(跳过没有数据的题目)"""
+        yi, pi, ai = np.nonzero(np.broadcast_to(self.totals[:, :, None] > 0, self.counts.shape))
+        return [[int(self.years[y]), COLUMNS[p][1], COLUMNS[p][0], AWARDS[a],
+                 int(self.counts[y, p, a]), int(RANK[a])]
+                for y, p, a in zip(yi, pi, ai)]
+
+
+def build_cube(rows) -> ResultsCube:
+    """rows: [(年份, 题号, 赛别, 奖项, 数量), ...]"""
+    if not rows:
+        return ResultsCube(np.zeros(0), np.zeros((0, len(COLUMNS), len(AWARDS))))
+    year_col, prob_col, type_col, award_col, count_col = zip(*rows)
+    years, yi = np.unique(np.array(year_col, dtype=np.int32), return_inverse=True)
+    col_index = {key: i for i, key in enumerate(COLUMNS)}
+    pi = np.array([col_index[key] for key in zip(type_col, prob_col)], dtype=np.intp)
+    ai = np.array([AWARD_ORDER.index(a) for a in award_col], dtype=np.intp)
+    counts = np.zeros((len(years), len(COLUMNS), len(AWARDS)), dtype=np.int64)
+    np.add.at(counts, (yi, pi, ai), np.array(count_col, dtype=np.int64))
+    return ResultsCube(years, counts)
+
+
+def load_cube(db_path: str = DB_PATH, csv_name: str = CSV_NAME) -> ResultsCube:
+    """从结果库读取(库不存在时由 CSV 导入)"""
+    with closing(connect(db_path, csv_name)) as conn:
+        rows = conn.execute("SELECT year, problem, type, award, count FROM results").fetchall()
+    return build_cube(rows)
+
+
+# -----------------------------------
+# 主函数: 打印各题 M 及以上的比例
+# -----------------------------------
+def main():
+    cube = load_cube()
+    if not len(cube.years):
+        print("[错误] 结果库为空")
+        sys.exit(1)
+
+    pct = cube.at_or_better("M") * 100
+    print("M 及以上比例(%)")
+    print("Year  " + "".join(f"{t}-{p:<5}" for t, p in COLUMNS))
+    for year, line in zip(cube.years, pct):
+        print(f"{year}  " + "".join(f"{v:<9.2f}" for v in line))
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
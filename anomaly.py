@@ -0,0 +1,376 @@
+import os
+import re
+import sys
+import json
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pagecache import iter_page_texts
+from pagesplit import FIRST_PAGE
+from profiles import AWARDS, lookup
+from extractors import CONTROL_PAT
+'''
+全量异常扫描(代替 printstr.py 人工翻看 unicode_escape 转储):
+对每个 PDF 的每页清洗后文本(页面文本来自 .page_cache, 第二次扫描不再打开 PDF)找三类问题,
+按影响的页数加权排序, 每条附页码, 方便回到 dump 里确认
+
+- 奖项词的近似写法: 页面按字母切词, 只看字母(去掉空格、逗号、全角标点...)的小写投影,
+  与奖项词表比较编辑距离; 拆开的词(Honorab le)、拼写偏差(Meritorius)、粘连的词(WinnerDisqualified)
+  分别记为 断词 / 近似 / 粘连; 已被本年份规则计数的位置降权, 没被计数的排在前面
+- 少见的码位: ASCII 以外、也不是带重音的拉丁字母或常见排版标点的字符(私用区、控制字符、
+  全角符号、特殊空白...), 按 Unicode 类别加权
+- 队伍行与奖项不一致: 页内控制号个数与计数的奖项数不同, 或有队伍行(控制号到下一个控制号之间)没有奖项
+
+扫描的是 profiles 规则清洗后的文本, 已经修好的问题不会再报; --raw 扫描原始文本
+
+用法: python anomaly.py [起始年份 [结束年份]] [--raw] [--top N] [-o 报告.json]
+'''
+
+# 近似匹配的奖项词(太短的 Not 不参与, 误报太多)
+AWARD_WORDS = sorted({w.lower() for aw in AWARDS for w in aw.split() if len(w) >= 6})
+MAX_JOIN = 3  # 最多把几个相邻的字母段拼起来比较
+MAX_GAP = 2  # 相邻字母段之间最多隔几个非字母字符
+MAX_LETTERS = max(map(len, AWARD_WORDS)) + 2
+WEIGHTS = {
+    "断词": 3, "近似": 3, "粘连": 3,  # 本年份规则没有计数
+    "counted": 1,  # 规则已计数, 只是写法不规范
+    "行不一致": 2,
+}
+# 码位的权重: 私用区 / 控制 / 格式 / 未分配字符最可疑
+CATEGORY_WEIGHTS = {"Co": 3, "Cc": 3, "Cf": 3, "Cn": 3, "Cs": 3, "Zs": 2, "Zl": 2, "Zp": 2}
+# 成片出现的字符按区段合并为一条: (起, 止, 名称, 权重)
+CHAR_BLOCKS = [
+    (0x3000, 0x303F, "CJK 符号和标点", 2),
+    (0x4E00, 0x9FFF, "CJK 统一汉字", 2),
+    (0xE000, 0xF8FF, "私用区", 3),
+    (0xFF00, 0xFFEF, "全角/半角形式", 2),
+]
+SAMPLE_CHARS = 8
+ORDINARY = set("‘’“”–—·…•")
+REFS_SHOWN = 5
+
+_LETTERS = re.compile(r"[^\W\d_]+")
+_AWARD_WORD_RE = re.compile("|".join(sorted(AWARD_WORDS, key=len, reverse=True)), re.I)
+_UNUSUAL = re.compile(r"[^\x20-\x7e\n\t]")
+
+
+# -----------------------------------
+# 编辑距离
+# -----------------------------------
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein 距离, 超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return min(prev[-1], limit + 1)
+
+
+def max_distance(word: str) -> int:
+    return 1 if len(word) <= 7 else 2
+
+
+_NEAREST = {}
+
+
+def nearest_word(letters: str):
+    """字母投影 -> (最接近的奖项词, 距离), 没有足够接近的返回 None; 按投影缓存(同一写法在全库反复出现)"""
+    if letters in _NEAREST:
+        return _NEAREST[letters]
+    best = None
+    for word in AWARD_WORDS:
+        limit = max_distance(word)
+        d = edit_distance(letters, word, limit)
+        if d <= limit and (best is None or d < best[1]):
+            best = (word, d)
+    _NEAREST[letters] = best
+    return best
+
+
+def _is_award_word(letters: str) -> bool:
+    hit = nearest_word(letters)
+    return hit is not None and hit[1] == 0
+
+
+def merged_word(letters: str):
+    """一个字母段里粘着奖项词(winnerdisqualified), 返回其中的奖项词"""
+    m = _AWARD_WORD_RE.search(letters)
+    return m.group() if m is not None and m.group() != letters else None
+
+
+def merged_shape(token: str) -> str:
+    """粘连段的写法: 奖项词以外的字母记为 *(SmithSuccessfulParticipant → *SuccessfulParticipant), 同一种粘连合为一条"""
+    shape, last = [], 0
+    for m in _AWARD_WORD_RE.finditer(token):
+        if m.start() > last:
+            shape.append("*")
+        shape.append(m.group())
+        last = m.end()
+    if last < len(token):
+        shape.append("*")
+    return "".join(shape)
+
+
+# -----------------------------------
+# 单页扫描
+# -----------------------------------
+def counted_spans(text: str, award_pat, normalize=None):
+    """本年份规则实际计数的匹配位置 [(起, 止), ...], 判定与 awardcount 相同"""
+    spans = []
+    for m in award_pat.finditer(text):
+        word = m.group()
+        if (normalize(word) if normalize is not None else word) in AWARDS:
+            spans.append(m.span())
+    return spans
+
+
+def _overlaps(span, spans) -> bool:
+    return any(lo < span[1] and span[0] < hi for lo, hi in spans)
+
+
+def near_misses(text: str, spans):
+    """产出 (种类, 原文片段, 奖项词, 是否已计数)"""
+    tokens = [(m.start(), m.end(), m.group().casefold()) for m in _LETTERS.finditer(text)]
+    k = 0
+    while k < len(tokens):
+        found = None
+        letters = ""
+        for n in range(MAX_JOIN):
+            if k + n >= len(tokens) or (n and tokens[k + n][0] - tokens[k + n - 1][1] > MAX_GAP):
+                break
+            letters += tokens[k + n][2]
+            if len(letters) > MAX_LETTERS:
+                break
+            hit = nearest_word(letters)
+            if hit is None:
+                continue
+            word, d = hit
+            if n and d and (d >= min(len(tokens[k][2]), len(tokens[k + n][2]))
+                            or any(_is_award_word(tokens[k + m][2]) for m in range(1, n + 1))):
+                continue  # "a Winner" / "Na Honorab le": 首尾的段可能整段都是编辑, 或后面的段本身就是奖项词
+            if d == 0 and n == 0:
+                found = ("exact", word, 1)  # 正常的奖项词
+                break
+            if found is None or d < found[1][1]:
+                found = ("断词" if d == 0 else "近似", hit, n + 1)
+            if d == 0:
+                break
+        if found is None and len(tokens[k][2]) > 6:
+            word = merged_word(tokens[k][2])
+            if word is not None:
+                found = ("粘连", (word, 0), 1)
+        if found is None or found[0] == "exact":
+            k += 1
+            continue
+        kind, (word, _), n = found
+        span = (tokens[k][0], tokens[k + n - 1][1])
+        yield kind, text[span[0]:span[1]], word, _overlaps(span, spans)
+        k += n
+
+
+def row_mismatch(text: str, spans):
+    """(控制号个数, 计数的奖项数, 没有奖项的队伍行数); 页面一致时返回 None"""
+    controls = list(CONTROL_PAT.finditer(text))
+    bare = 0
+    for k, m in enumerate(controls):
+        end = controls[k + 1].start() if k + 1 < len(controls) else len(text)
+        if not any(m.end() <= lo < end for lo, _ in spans):
+            bare += 1
+    if len(controls) == len(spans) and not bare:
+        return None
+    return len(controls), len(spans), bare
+
+
+def char_group(ch: str):
+    """字符 -> (分组键, 说明, 权重)"""
+    code = ord(ch)
+    for lo, hi, name, weight in CHAR_BLOCKS:
+        if lo <= code <= hi:
+            return f"U+{lo:04X}-U+{hi:04X}", name, weight
+    category = unicodedata.category(ch)
+    return f"U+{code:04X}", f"{unicodedata.name(ch, '?')} ({category})", CATEGORY_WEIGHTS.get(category, 1)
+
+
+def unusual_chars(text: str):
+    """页内少见的字符 -> 出现次数"""
+    if text.isascii() and _UNUSUAL.search(text) is None:
+        return {}
+    chars = {}
+    for m in _UNUSUAL.finditer(text):
+        ch = m.group()
+        if ch in ORDINARY or (ch < "\u0250" and ch.isalpha()):
+            continue
+        chars[ch] = chars.get(ch, 0) + 1
+    return chars
+
+
+# -----------------------------------
+# 一个 PDF
+# -----------------------------------
+def _add(findings: dict, key, weight: int, ref, n: int = 1, **info):
+    entry = findings.get(key)
+    if entry is None:
+        entry = findings[key] = {"kind": key[0], "weight": weight, "count": 0, "refs": [], **info}
+    entry["weight"] = max(entry["weight"], weight)
+    entry["count"] += n
+    if ref not in entry["refs"]:
+        entry["refs"].append(ref)
+
+
+def scan_pdf(task, raw: bool = False) -> dict:
+    """工作进程: 扫描一个 PDF, 返回 {键: 条目}; 页引用为 (标签, 页码)"""
+    year, prob, pdf_path, contest_type = task
+    profile = lookup(year, contest_type, prob)
+    clean = None if raw else profile.clean
+    label = f"{year}-{contest_type}-{prob}"
+    findings = {}
+    try:
+        for i, raw_text in iter_page_texts(pdf_path, FIRST_PAGE):
+            text = raw_text if clean is None else clean(raw_text)
+            ref = (label, i + 1)
+            spans = counted_spans(text, profile.award_pat, profile.normalize)
+            for kind, sample, word, counted in near_misses(text, spans):
+                if kind == "粘连":
+                    sample = merged_shape(sample)
+                elif kind == "近似":
+                    sample = " ".join(sample.split())
+                _add(findings, (kind, sample, word), WEIGHTS["counted"] if counted else WEIGHTS[kind], ref,
+                     sample=sample, word=word, counted=True)
+                findings[(kind, sample, word)]["counted"] &= counted
+            mismatch = row_mismatch(text, spans)
+            if mismatch is not None:
+                n_rows, n_hits, bare = mismatch
+                entry = findings.setdefault(("行不一致", label), {
+                    "kind": "行不一致", "weight": WEIGHTS["行不一致"], "count": 0, "refs": [],
+                    "sample": label, "rows": 0, "hits": 0, "bare": 0})
+                entry["count"] += 1
+                entry["rows"] += n_rows
+                entry["hits"] += n_hits
+                entry["bare"] += bare
+                entry["refs"].append(ref)
+            for ch, n in unusual_chars(text).items():
+                key, name, weight = char_group(ch)
+                _add(findings, ("码位", key), weight, ref, n, sample=f"{key} {name}", chars="")
+                entry = findings[("码位", key)]
+                if ch not in entry["chars"] and len(entry["chars"]) < SAMPLE_CHARS:
+                    entry["chars"] += ch
+    except Exception as e:
+        print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
+    return findings
+
+
+def _scan_task(args):
+    return scan_pdf(*args)
+
+
+def scan(tasks, raw: bool = False, max_workers=None):
+    """扫描全部任务, 合并后按 权重 × 影响页数 降序返回条目列表"""
+    max_workers = max_workers or os.cpu_count() or 4
+    merged = {}
+    jobs = [(task, raw) for task in tasks]
+    if max_workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_scan_task, jobs))
+    else:
+        results = map(_scan_task, jobs)
+    for findings in results:
+        for key, entry in findings.items():
+            old = merged.get(key)
+            if old is None:
+                merged[key] = entry
+                continue
+            old["weight"] = max(old["weight"], entry["weight"])
+            for field in ("count", "rows", "hits", "bare"):
+                if field in old:
+                    old[field] += entry[field]
+            old["refs"].extend(entry["refs"])
+            if "counted" in old:
+                old["counted"] &= entry["counted"]
+            if "chars" in old:
+                old["chars"] += "".join(ch for ch in entry["chars"] if ch not in old["chars"])[
+                                :SAMPLE_CHARS - len(old["chars"])]
+    for entry in merged.values():
+        entry["score"] = entry["weight"] * len(entry["refs"])
+    return sorted(merged.values(), key=lambda e: (-e["score"], -e["count"], e["kind"], e["sample"]))
+
+
+# -----------------------------------
+# 报告
+# -----------------------------------
+def format_refs(refs) -> str:
+    shown = ", ".join(f"{label} p.{page}" for label, page in refs[:REFS_SHOWN])
+    return shown + (f" 等 {len(refs)} 页" if len(refs) > REFS_SHOWN else "")
+
+
+def describe(entry: dict) -> str:
+    kind = entry["kind"]
+    if kind == "行不一致":
+        return f"控制号 {entry['rows']} / 计数的奖项 {entry['hits']} / 无奖项的队伍行 {entry['bare']}"
+    if kind == "码位":
+        return f"{entry['sample']}: {entry['chars'].encode('unicode_escape').decode('ascii')}"
+    sample = entry["sample"].encode("unicode_escape").decode("ascii")
+    return f"'{sample}' → {entry['word']}" + ("（已计数）" if entry["counted"] else "")
+
+
+def print_report(entries, top: int = 50):
+    if not entries:
+        print("✅ 没有发现异常")
+        return
+    print(f"\n{'#':>3} {'分数':>6} {'次数':>6}  {'种类':<5} 说明 / 页码")
+    for rank, entry in enumerate(entries[:top], 1):
+        print(f"{rank:>3} {entry['score']:>6} {entry['count']:>6}  {entry['kind']:<5} {describe(entry)}")
+        print(f"{'':>24}{format_refs(entry['refs'])}")
+    if len(entries) > top:
+        print(f"\n[提示] 另有 {len(entries) - top} 条未显示(--top 调整)")
+
+
+def save_report(entries, path: str):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([dict(entry, refs=[f"{label} p.{page}" for label, page in entry["refs"]]) for entry in entries],
+                  f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    from countall import build_tasks
+    args = sys.argv[1:]
+    raw = "--raw" in args
+    top, output = 50, None
+    years = []
+    k = 0
+    while k < len(args):
+        if args[k] == "--top":
+            top = int(args[k + 1])
+            k += 1
+        elif args[k] == "-o":
+            output = args[k + 1]
+            k += 1
+        elif not args[k].startswith("-"):
+            years.append(int(args[k]))
+        k += 1
+    start_year = years[0] if years else 2016
+    end_year = years[1] if len(years) > 1 else (start_year if years else 2025)
+
+    tasks = build_tasks(start_year, end_year)
+    if not tasks:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+    print(f"🚀 扫描 {len(tasks)} 个 PDF（{'原始' if raw else '清洗后'}文本）...")
+    entries = scan(tasks, raw)
+    print_report(entries, top)
+    if output:
+        save_report(entries, output)
+        print(f"\n🎯 完整报告已写入文件：{output}")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import re
+from collections import Counter
+from profiles import AWARDS, CASE_SPECIAL
+'''
+奖项计数核心:
+原流程把每个匹配原文追加到 designations 列表, 再逐个 normalize_award(小写化 + 最多 8 次子串判断),
+最后 Counter 重新哈希所有字符串; 这里改为每页只扫描一次, 直接累加到按奖项下标的定长整数数组
+(O/F/M/H/S/U/D/N 依次为 0-7, 最后一格记录匹配到但不计入任何奖项的次数)
+
+- 匹配文本到奖项下标的映射按文本缓存, normalize_award 对每种写法只调用一次
+- re.I 的多选正则比大小写敏感的慢数倍: 页面中没有 CASE_SPECIAL 字符时, 在小写副本上用小写化的
+  大小写敏感正则扫描(位置一一对应, 匹配结果与原正则完全相同), 否则退回原正则
+- 正则不加分组: 带分组的多选正则用不上 re 的首字符快速跳过
+
+normalize 为 None 时与 countall2020-2025.py 一致, 只有与标准写法逐字相同的匹配才计数
+'''
+
+N_SLOTS = len(AWARDS) + 1
+SKIP = len(AWARDS)
+_AWARD_INDEX = {aw: i for i, aw in enumerate(AWARDS)}
+_AWARD_INDEX_LOWER = {aw.lower(): i for i, aw in enumerate(AWARDS)}
+
+
+def lowered_pattern(award_pat):
+    """
+    返回与 award_pat 在小写文本上等价的大小写敏感正则; 不能安全转换时返回 None
+    (非 re.I、含非 ASCII 字符, 或含 \\S \\W 这类小写后含义会变的转义)
+    捕获分组改为非捕获分组, 这样 findall 返回整个匹配, 扫描也更快
+    """
+    source = award_pat.pattern
+    if not award_pat.flags & re.I or not isinstance(source, str) or not source.isascii():
+        return None
+    if re.search(r"\\[A-Z]|\\\d|\\\\|\[|\(\?P=", source):
+        return None
+    source = re.sub(r"(?<!\\)\((?!\?)", "(?:", source)
+    return re.compile(source.lower(), award_pat.flags & ~re.I)
+
+
+class AwardMatcher:
+    """一个 (匹配正则, 标准化函数) 组合的计数器, 按 Profile 复用"""
+
+    def __init__(self, award_pat, normalize=None):
+        self.pat = award_pat
+        self.normalize = normalize
+        self.fast_pat = lowered_pattern(award_pat)
+        self._slots = {}        # 匹配原文 -> 下标
+        self._slots_lower = {}  # 小写匹配文本 -> 下标
+
+    def _slot(self, word: str) -> int:
+        if self.normalize is None:
+            return _AWARD_INDEX.get(word, SKIP)
+        award = self.normalize(word)
+        return _AWARD_INDEX[award] if award else SKIP
+
+    def _slot_lower(self, word: str) -> int:
+        if self.normalize is None:
+            # 只是候选, 计数前还要核对原文大小写
+            return _AWARD_INDEX_LOWER.get(word, SKIP)
+        # normalize_award 只看小写后的文本
+        award = self.normalize(word)
+        return _AWARD_INDEX[award] if award else SKIP
+
+    def count(self, text: str, counts: list):
+        """扫描一页文本, 累加到 counts(长度 N_SLOTS)"""
+        if self.fast_pat is not None and (text.isascii() or not any(ch in text for ch in CASE_SPECIAL)):
+            slots = self._slots_lower
+            if self.normalize is None:
+                for m in self.fast_pat.finditer(text.lower()):
+                    word = m.group()
+                    i = slots.get(word)
+                    if i is None:
+                        i = slots[word] = self._slot_lower(word)
+                    if i != SKIP and not text.startswith(AWARDS[i], m.start()):
+                        i = SKIP
+                    counts[i] += 1
+            else:
+                for word in self.fast_pat.findall(text.lower()):
+                    i = slots.get(word)
+                    if i is None:
+                        i = slots[word] = self._slot_lower(word)
+                    counts[i] += 1
+            return counts
+
+        slots = self._slots
+        for m in self.pat.finditer(text):
+            word = m.group()
+            i = slots.get(word)
+            if i is None:
+                i = slots[word] = self._slot(word)
+            counts[i] += 1
+        return counts
+
+    def to_counter(self, counts) -> Counter:
+        """
+        转为原流程的 Counter(键为标准奖项名); 不计数的匹配:
+        normalize 为 None 时原流程会以匹配原文为键留在 Counter 中, 这里记在键 None 下, 以保持“是否有匹配”的判断不变
+        """
+        counter = Counter({aw: n for aw, n in zip(AWARDS, counts) if n})
+        if self.normalize is None and counts[SKIP]:
+            counter[None] = counts[SKIP]
+        return counter
+
+
+_MATCHERS = {}
+
+
+def matcher_for(award_pat, normalize=None) -> AwardMatcher:
+    """每个进程内按 (正则, 标准化函数) 缓存计数器"""
+    key = (award_pat.pattern, award_pat.flags, normalize)
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = _MATCHERS[key] = AwardMatcher(award_pat, normalize)
+    return matcher
@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import platform
+import tempfile
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+import pagecache
+from pagecache import EXTRACTORS, AUTO, _extract_page, page_count
+from awardcount import AwardMatcher, N_SLOTS
+from profiles import AWARDS, AWARD_SHORT, lookup
+from pagesplit import count_page_range
+from countall import run_tasks
+from synthpdf import make_results_pdf
+'''
+基准测试: 不需要真实的 COMAP 文件, 先用 synthpdf.py 生成一套带各年份排版问题的结果 PDF, 然后
+1. 分阶段计时(单进程, 不经过页面缓存): open(PdfReader 构造) / extract / clean / match(原流程的 award_pat.finditer) / count(awardcount 计数)
+2. 各执行方式整体计时: serial(单进程) / per-pdf(每个 PDF 一个工作进程, 同 countall-para.py) /
+   page-ranges(按页段并行, 同 countall.py), 分别使用各提取器; 页面缓存为空(冷)和已填满(热)各一次
+每项输出 页/秒、MB/秒、峰值 RSS, 并核对统计结果与生成时的真实数量
+
+每个执行方式在单独的子进程中运行, 峰值 RSS 互不影响
+结果写入 bench_results/<时间>.json, 并与目录中上一次的结果对比
+
+用法: python bench.py [每个 PDF 的页数] [结果目录]
+'''
+
+# (年份, 赛别, 题号): 覆盖每一种清洗规则
+CORPUS = [
+    (2016, "MCM", "A"),
+    (2018, "ICM", "D"),
+    (2019, "MCM", "B"),
+    (2022, "ICM", "F"),
+    (2024, "MCM", "C"),
+]
+STAGES = ["open", "extract", "clean", "match", "count"]
+MODES = ["serial", "per-pdf", "page-ranges"]
+RESULTS_DIR = "bench_results"
+
+
+def make_corpus(root: str, n_pages: int):
+    """生成语料, 返回 (任务列表 [(年份, 题号, 路径, 赛别), ...], {路径: 真实数量})"""
+    tasks = []
+    truth = {}
+    for year, contest_type, problem in CORPUS:
+        folder = os.path.join(root, "Contest_PDFs", contest_type)
+        os.makedirs(folder, exist_ok=True)
+        pdf_path = os.path.join(folder, f"{year}_{contest_type}_Problem_{problem}_Results.pdf")
+        truth[pdf_path] = make_results_pdf(pdf_path, year, contest_type, problem, n_pages)
+        tasks.append((year, problem, pdf_path, contest_type))
+    return tasks, truth
+
+
+def peak_rss_mb():
+    """(本进程, 已结束的子进程中最大的) 峰值 RSS, MB"""
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(self_kb / 1024, 1), round(children_kb / 1024, 1)
+
+
+def corpus_mb(tasks) -> float:
+    return sum(os.path.getsize(pdf_path) for _, _, pdf_path, _ in tasks) / 2 ** 20
+
+
+# -----------------------------------
+# 分阶段计时
+# -----------------------------------
+def time_stages(tasks, extractor: str):
+    """单进程逐页计时, 返回 {阶段: 秒} 及页数"""
+    _, make_extract = EXTRACTORS[extractor]
+    seconds = dict.fromkeys(STAGES, 0.0)
+    n_pages = 0
+    clock = time.perf_counter
+    for year, problem, pdf_path, contest_type in tasks:
+        profile = lookup(year, contest_type, problem)
+        matcher = AwardMatcher(profile.award_pat, profile.normalize)
+        counts = [0] * N_SLOTS
+        t0 = clock()
+        with open(pdf_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            total = len(reader.pages)
+            extract = make_extract(reader)
+            seconds["open"] += clock() - t0
+            for i in range(1, total):
+                t0 = clock()
+                text = _extract_page(reader, i, extract)
+                t1 = clock()
+                if profile.clean is not None:
+                    text = profile.clean(text)
+                t2 = clock()
+                [m.group() for m in profile.award_pat.finditer(text)]
+                t3 = clock()
+                matcher.count(text, counts)
+                t4 = clock()
+                seconds["extract"] += t1 - t0
+                seconds["clean"] += t2 - t1
+                seconds["match"] += t3 - t2
+                seconds["count"] += t4 - t3
+                n_pages += 1
+    return seconds, n_pages
+
+
+def stage_report(tasks, extractor: str) -> dict:
+    seconds, n_pages = time_stages(tasks, extractor)
+    size_mb = corpus_mb(tasks)
+    stages = {}
+    for name, sec in seconds.items():
+        stages[name] = {
+            "seconds": round(sec, 4),
+            "pages_per_s": round(n_pages / sec, 1) if sec else None,
+        }
+    read = seconds["open"] + seconds["extract"]
+    return {"pages": n_pages, "mb_per_s_read": round(size_mb / read, 2) if read else None, "stages": stages}
+
+
+# -----------------------------------
+# 执行方式
+# -----------------------------------
+def _count_task(task):
+    year, problem, pdf_path, contest_type = task
+    profile = lookup(year, contest_type, problem)
+    return count_page_range(pdf_path, 1, page_count(pdf_path), profile.award_pat, profile.clean, profile.normalize)
+
+
+def run_mode(mode: str, tasks, workers: int):
+    """返回 {路径: Counter}"""
+    if mode == "serial":
+        return {task[2]: _count_task(task) for task in tasks}
+    if mode == "per-pdf":
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return dict(zip((task[2] for task in tasks), executor.map(_count_task, tasks)))
+    if mode == "page-ranges":
+        rows = run_tasks(tasks, max_workers=workers)
+        paths = {(year, problem, contest_type): pdf_path for year, problem, pdf_path, contest_type in tasks}
+        short = {code: aw for aw, code in AWARD_SHORT.items()}
+        results = {}
+        for year, problem, contest_type, award, n in rows:
+            counter = results.setdefault(paths[(year, problem, contest_type)], Counter())
+            if n:
+                counter[short[award]] += n
+        return results
+    raise ValueError(f"未知的执行方式: {mode}")
+
+
+def _mode_child(conn, mode, tasks, workers, extractor, cache_dir, passes):
+    """子进程: 设置提取器和缓存目录, 运行 passes 次, 回传每次的用时和结果"""
+    os.environ["COMAP_EXTRACTOR"] = extractor
+    pagecache.CACHE_DIR = cache_dir
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)  # 工作进程的 [完成] 输出不干扰报告
+    timings = []
+    for _ in range(passes):
+        t0 = time.perf_counter()
+        results = run_mode(mode, tasks, workers)
+        timings.append((time.perf_counter() - t0, {path: dict(c) for path, c in results.items()}))
+    conn.send((timings, peak_rss_mb()))
+    conn.close()
+
+
+def mode_report(mode: str, tasks, truth, pages_per_pdf: int, workers: int, extractor: str) -> list:
+    """冷、热缓存各运行一次, 返回两条记录"""
+    cache_dir = tempfile.mkdtemp(prefix="bench_cache_")
+    ctx = multiprocessing.get_context("fork")
+    parent, child = ctx.Pipe()
+    proc = ctx.Process(target=_mode_child, args=(child, mode, tasks, workers, extractor, cache_dir, 2))
+    try:
+        proc.start()
+        timings, (rss_main, rss_workers) = parent.recv()
+        proc.join()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    n_pages = pages_per_pdf * len(tasks)
+    size_mb = corpus_mb(tasks)
+    records = []
+    for cache, (sec, results) in zip(["cold", "warm"], timings):
+        correct = all({aw: n for aw, n in results.get(path, {}).items() if aw in AWARDS} == dict(expected)
+                      for path, expected in truth.items())
+        records.append({
+            "mode": mode, "extractor": extractor, "cache": cache, "workers": workers,
+            "seconds": round(sec, 4),
+            "pages_per_s": round(n_pages / sec, 1),
+            "mb_per_s": round(size_mb / sec, 2),
+            "peak_rss_mb": {"main": rss_main, "workers": rss_workers},
+            "counts_match_truth": correct,
+        })
+    return records
+
+
+# -----------------------------------
+# 结果保存与对比
+# -----------------------------------
+def latest_result(results_dir: str):
+    if not os.path.isdir(results_dir):
+        return None
+    names = sorted(name for name in os.listdir(results_dir) if name.endswith(".json"))
+    if not names:
+        return None
+    with open(os.path.join(results_dir, names[-1]), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(previous: dict, current: dict):
+    """按 页/秒 对比两次结果"""
+    print(f"\n与上一次({previous['meta']['time']})对比 页/秒:")
+    for extractor, report in current["stages"].items():
+        old = previous.get("stages", {}).get(extractor)
+        if old is None:
+            continue
+        for name, stage in report["stages"].items():
+            before = old["stages"].get(name, {}).get("pages_per_s")
+            if before and stage["pages_per_s"]:
+                print(f"  阶段 {extractor:<7} {name:<8} {before:>10.1f} -> {stage['pages_per_s']:>10.1f} "
+                      f"({stage['pages_per_s'] / before - 1:+.0%})")
+    old_modes = {(r["mode"], r["extractor"], r["cache"]): r for r in previous.get("modes", [])}
+    for record in current["modes"]:
+        old = old_modes.get((record["mode"], record["extractor"], record["cache"]))
+        if old is not None:
+            print(f"  方式 {record['mode']:<12} {record['extractor']:<7} {record['cache']:<5} "
+                  f"{old['pages_per_s']:>10.1f} -> {record['pages_per_s']:>10.1f} "
+                  f"({record['pages_per_s'] / old['pages_per_s'] - 1:+.0%})")
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    results_dir = sys.argv[2] if len(sys.argv) > 2 else RESULTS_DIR
+    workers = os.cpu_count() or 4
+
+    root = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        tasks, truth = make_corpus(root, n_pages)
+        size_mb = corpus_mb(tasks)
+        print(f"🚀 合成语料: {len(tasks)} 个 PDF, 每个 {n_pages} 页, 共 {size_mb:.2f} MB")
+
+        report = {
+            "meta": {
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "pypdf2": PyPDF2.__version__,
+                "cpu_count": os.cpu_count(),
+                "pages_per_pdf": n_pages,
+                "corpus": [f"{y}-{t}-{p}" for y, t, p in CORPUS],
+                "corpus_mb": round(size_mb, 3),
+            },
+            "stages": {},
+            "modes": [],
+        }
+
+        print(f"\n{'提取器':<8} " + " ".join(f"{name:>10}" for name in STAGES) + f" {'MB/s':>8}   (页/秒)")
+        for extractor in EXTRACTORS:
+            stage = report["stages"][extractor] = stage_report(tasks, extractor)
+            print(f"{extractor:<8} " + " ".join(f"{s['pages_per_s'] or 0:>10.1f}" for s in stage["stages"].values())
+                  + f" {stage['mb_per_s_read'] or 0:>8.2f}")
+
+        print(f"\n{'方式':<12} {'提取器':<7} {'缓存':<5} {'秒':>8} {'页/秒':>9} {'MB/s':>8} "
+              f"{'RSS 主/子 MB':>14}  结果")
+        for extractor in list(EXTRACTORS) + [AUTO]:
+            for mode in MODES:
+                for record in mode_report(mode, tasks, truth, n_pages, workers, extractor):
+                    report["modes"].append(record)
+                    rss = record["peak_rss_mb"]
+                    print(f"{mode:<12} {extractor:<7} {record['cache']:<5} {record['seconds']:>8.3f} "
+                          f"{record['pages_per_s']:>9.1f} {record['mb_per_s']:>8.2f} "
+                          f"{rss['main']:>6.1f}/{rss['workers']:<6.1f}  "
+                          + ("✅" if record["counts_match_truth"] else "❌ 与真实数量不一致"))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    previous = latest_result(results_dir)
+    os.makedirs(results_dir, exist_ok=True)
+    out_path = os.path.join(results_dir, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n🎯 结果已写入 {out_path}")
+    if previous is not None:
+        compare(previous, report)
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
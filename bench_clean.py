@@ -0,0 +1,244 @@
+import re
+import sys
+import time
+import random
+import profiles
+'''
+清洗规则微基准:
+旧实现 = 各年份脚本原来的 clean_pdf_text(逐条 str.replace / re.sub, 2022-F 逐字符转半角), 原样保留在本文件中作对照;
+         各年份脚本现在直接使用 profiles.py 中的清洗规则
+新实现 = profiles.py 中合并后的清洗规则(str.translate + 预编译正则)
+
+先逐页核对两者输出完全一致, 再分别测速, 输出每秒处理页数
+用法: python bench_clean.py [页数]
+'''
+
+# 真实 PDF 中出现过的问题片段
+QUIRKS = [
+    "Honorab le Mention", "Honora b le Mention", "Merit orious Winner", "Suc cessful Participant",
+    "Parti cipant", "Outsta nding Winner", "Not Judg ed", "Disqua lified", "WinnerDisqualified",
+    "HonorableMention", "Honorable Mentionot Judged", "\x00", "\u00A0", "\u202F", "\u3000", "\u738B", "\uE01A",
+    "\uFF28\uFF4F\uFF4E\uFF4F\uFF52", "H\uFF0Co\uFF0Cn", "\x08", "\\x08", "Univ ersity", "Tech nology",
+]
+AWARD_TEXT = ["Outstanding Winner", "Finalist", "Meritorious Winner", "Honorable Mention",
+              "Successful Participant", "Unsuccessful", "Disqualified", "Not Judged"]
+
+
+# -----------------------------------
+# 旧实现(原 count2016-2018.py / count2018-D.py / count2019.py / count2022-F.py)
+# -----------------------------------
+def legacy_2016(text: str) -> str:
+    """清洗 PDF 文本 — 去除 Null 字节和空白混乱"""
+    # 去除所有 \x00 字符
+    text = text.replace("\x00", "")
+    
+    # 替换各种奇怪空格为普通空格
+    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
+        text = text.replace(ws, " ")
+
+    # 修复断词问题
+    text = text.replace("Honorab le", "Honorable")
+
+    # 合并多空格、去换行
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def legacy_2018_icm_d(raw_text: str) -> str:
+    """
+    清洗由 PDF 提取出的 ICM/MCM 比赛结果文本：
+    - 去掉退格符、控制符
+    - 修复断词、连续字母
+    - 标准化奖项名称
+    """
+    text = raw_text
+
+    # 🔹 1. 去掉退格符和多余控制符
+    text = re.sub(r'\\x08', '', text)           # 去除退格符显式转义
+    text = re.sub(r'\x08', '', text)            # 去除实际退格符
+    text = re.sub(r'[\r\n]+', ' ', text)        # 合并换行符为空格
+    text = re.sub(r'\s{2,}', ' ', text)         # 压缩多余空格
+
+    # 🔹 2. 修复字母之间多余空格 (例如 'H o n o r a b l e' → 'Honorable')
+    # 合并连续英文字符间的空格，只对大写或小写字母之间的空格
+    text = re.sub(r'(?<=\b[A-Za-z])\s+(?=[A-Za-z]\b)', '', text)
+
+    # 🔹 3. 统一空格
+    text = re.sub(r'\s{2,}', ' ', text).strip()
+
+    # 🔹 4. 替换反常断词
+    replacements = {
+        "Outsta nding": "Outstanding",
+        "Merit orious": "Meritorious",
+        "Honorab le": "Honorable",
+        "Su ccessful": "Successful",
+        "Parti cipant": "Participant",
+        "Not Judg ed": "Not Judged",
+        "Jud ged": "Judged",
+        "Disqua lified": "Disqualified",
+        "WinnerDisqualified": "Winner Disqualified",
+    }
+
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+
+    # 🔹 5. 标准化奖项短语 (去掉空格丢失的情况)
+    normalize_awards = {
+        "OutstandingWinner": "Outstanding Winner",
+        "MeritoriousWinner": "Meritorious Winner",
+        "HonorableMention": "Honorable Mention",
+        "SuccessfulParticipant": "Successful Participant",
+        "NotJudged": "Not Judged",
+        "Disqualified": "Disqualified",
+        "FinalistAward": "Finalist",
+        "FinalistWinner": "Finalist",
+    }
+    for k, v in normalize_awards.items():
+        text = text.replace(k, v)
+
+    # 🔹 6. 防止大小写混乱
+    # 把所有奖项关键字首字母统一大写
+    for word in [
+        "Outstanding Winner", "Meritorious Winner", "Honorable Mention",
+        "Successful Participant", "Not Judged", "Disqualified", "Finalist"
+    ]:
+        pattern = re.compile(word, re.I)
+        text = pattern.sub(word, text)
+
+    # 🔹 7. 再次去掉多余空格
+    text = re.sub(r'\s{2,}', ' ', text).strip()
+
+    return text
+
+
+def legacy_2019(text: str) -> str:
+    """清洗 PDF 抽取出的文本，处理 Null 字节和嵌字体污染、断词等"""
+    import re
+    # 去掉 Null 字节
+    text = text.replace("\x00", "")
+    
+    # 去掉所有 CJK 汉字和私用区符号（包括“王”之类）
+    text = re.sub(r"[\u4E00-\u9FFF\uE000-\uF8FF]", "", text)
+
+    # 替换各种奇怪的空格为普通空格
+    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
+        text = text.replace(ws, " ")
+
+    # === 🧩 修复断词问题 ===
+    # 常见的断词情况：Honorab le → Honorable
+    text = text.replace("Honorab le", "Honorable")
+    text = text.replace("Honora b le", "Honorable")
+    text = text.replace("Honor ab le", "Honorable")
+    text = text.replace("Merit orious", "Meritorious")
+    text = text.replace("Suc cessful", "Successful")
+    text = text.replace("Parti cipant", "Participant")
+
+    # 合并多余空格
+    text = re.sub(r"\s+", " ", text)
+
+    return text.strip()
+
+
+def legacy_2022_icm_f(text: str) -> str:
+    import re
+
+    # 1️⃣ 清理乱码字符
+    text = text.replace("\x00", "")
+    text = re.sub(r"[\u4E00-\u9FFF\uE000-\uF8FF]", "", text)
+    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
+        text = text.replace(ws, " ")
+
+    # 2️⃣ 全角转半角
+    def to_halfwidth(s: str):
+        res = []
+        for ch in s:
+            code = ord(ch)
+            if code == 0x3000:
+                res.append(' ')
+            elif 0xFF01 <= code <= 0xFF5E:
+                res.append(chr(code - 0xFEE0))
+            else:
+                res.append(ch)
+        return ''.join(res)
+    text = to_halfwidth(text)
+
+    # 3️⃣ 去掉字母组之间的逗号（更宽松匹配：只要是字母间的逗号或空格都删掉）
+    text = re.sub(r'(?<=[A-Za-z])[,\s]+(?=[A-Za-z])', '', text)
+
+    # 有时会出现 " , " → " "
+    text = text.replace(', ', ' ')
+    # 多余空格合并
+    text = re.sub(r'\s+', ' ', text)
+
+    # 4️⃣ 修正断词（根据常见错误）
+    replacements = {
+        "Honorab le": "Honorable",
+        "Honora ble": "Honorable",
+        "Merit orious": "Meritorious",
+        "Suc cessful": "Successful",
+        "Parti cipant": "Participant",
+        "Re sults": "Results",
+        "Univ ersity": "University",
+        "Informa tion": "Information",
+        "Tech nology": "Technology",
+    }
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+
+    return text.strip()
+
+
+# (规则, 旧实现)
+LEGACY = [
+    (profiles.P_2016, legacy_2016),
+    (profiles.P_2018_ICM_D, legacy_2018_icm_d),
+    (profiles.P_2019, legacy_2019),
+    (profiles.P_2022_ICM_F, legacy_2022_icm_f),
+]
+
+
+def make_pages(n_pages: int, rows: int = 40, seed: int = 2016):
+    """生成带各年份排版问题的结果页文本"""
+    rnd = random.Random(seed)
+    pages = []
+    for p in range(n_pages):
+        lines = []
+        for r in range(rows):
+            award = rnd.choice(AWARD_TEXT)
+            if rnd.random() < 0.3:
+                award = rnd.choice(QUIRKS) + " " + award
+            lines.append(f"{2400000 + p * rows + r} University of Science and Technology "
+                         f"Zhang Wei\n{award}")
+        pages.append("\n".join(lines))
+    return pages
+
+
+def pages_per_second(clean, pages, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for text in pages:
+            clean(text)
+        best = min(best, time.perf_counter() - t0)
+    return len(pages) / best
+
+
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    pages = make_pages(n_pages)
+
+    print(f"{'Profile':<12}  {'旧(页/秒)':>12}  {'新(页/秒)':>12}  {'加速':>6}")
+    print("-" * 50)
+    for profile, legacy in LEGACY:
+        for i, text in enumerate(pages):
+            if legacy(text) != profile.clean(text):
+                print(f"[错误] {profile.name} 第 {i} 页输出与 {legacy.__name__} 不一致")
+                sys.exit(1)
+        before = pages_per_second(legacy, pages)
+        after = pages_per_second(profile.clean, pages)
+        print(f"{profile.name:<12}  {before:>12.0f}  {after:>12.0f}  {after / before:>5.1f}x")
+    print("-" * 50)
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
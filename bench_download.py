@@ -0,0 +1,250 @@
+import os
+import io
+import sys
+import json
+import time
+import tempfile
+import threading
+import contextlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import hashlib
+import PyPDF2
+from download import download_contest_pdfs_concurrent, iter_jobs, fetch_pdf, make_session, HostLimiter
+from manifest import load_manifest, discover_pdfs
+'''
+并发下载检查: 不访问 COMAP 官网, 在 127.0.0.1 上起一个 http.server 线程, 用固定的字节提供一组单页 PDF,
+把 download.py 的地址模板指向它, 然后检查
+1. 除故意缺失的文件外全部保存, 内容与服务器上的一致, PyPDF2 能读出来
+2. 服务器同时处理的请求数从不超过 per_host
+3. 缺失的文件(404)报告为失败, 不留下文件或 .part
+4. 再运行一次时所有文件都按清单里的 ETag 做条件请求得到 304, 不再写入
+5. 断点续传: 只有前一半的 .part 用 Range 续传(206); 已经完整的 .part(上次在改名前中断)得到 416 后直接转正
+6. 清单之外的文件(旧版顺序下载或手工放入)也能被 discover_pdfs 找到
+
+有任何一项不满足时退出码为 1
+用法: python bench_download.py
+'''
+
+YEARS = (2016, 2017)
+MISSING = (2017, "ICM", "F")  # 服务器上没有这个文件, 请求返回 404
+MAX_WORKERS = 8
+PER_HOST = 2
+DELAY = 0.05  # 每个请求在服务器端停留的秒数, 让并发请求确实重叠
+
+
+def tiny_pdf(label: str) -> bytes:
+    """一页、页面上写着 label 的最小 PDF(带正确的 xref, 每个文件内容不同)"""
+    stream = f"BT /F1 12 Tf 72 720 Td ({label}) Tj ET".encode("latin-1")
+    objs = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+class FixedHandler(BaseHTTPRequestHandler):
+    """
+    按路径返回 files 里的固定字节, 没有的返回 404; 记录同时在处理的请求数(每个请求先停留 DELAY 秒)
+    支持 ETag / If-None-Match(304) 和 Range: bytes=N-(206, 超出文件长度时 416)
+    """
+    files = {}
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+    requests = 0
+    statuses = []
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.requests += 1
+            cls.peak = max(cls.peak, cls.in_flight)
+        try:
+            time.sleep(DELAY)
+        finally:
+            # 在发出响应之前减掉: 客户端收完最后一个字节就会放行下一个请求, 之后再减会把两者算成重叠
+            with cls.lock:
+                cls.in_flight -= 1
+        body = cls.files.get(self.path)
+        if body is None:
+            self._status(404)
+            self.send_error(404)
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self._status(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        start = 0
+        ranged = self.headers.get("Range", "")
+        if ranged.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            start = int(ranged[6:].rstrip("-"))
+            if start >= len(body):
+                self._status(416)
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(body)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        self._status(206 if start else 200)
+        self.send_response(206 if start else 200)
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(len(body) - start))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def _status(self, code: int):
+        with self.lock:
+            self.statuses.append(code)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve():
+    """在后台线程中运行服务器, 产出服务器地址"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_site():
+    """按 /<年份>/<年份>_<赛别>_Problem_<题号>_Results.pdf 登记服务器上的文件, 返回 {(年份, 赛别, 题号): 内容}"""
+    files = {}
+    for year in YEARS:
+        for contest_type, problems in (("MCM", "ABC"), ("ICM", "DEF")):
+            for problem in problems:
+                if (year, contest_type, problem) == MISSING:
+                    continue
+                name = f"{year}_{contest_type}_Problem_{problem}_Results.pdf"
+                body = tiny_pdf(name)
+                FixedHandler.files[f"/{year}/{name}"] = body
+                files[(year, contest_type, problem)] = body
+    return files
+
+
+def main():
+    errors = []
+
+    def check(ok: bool, message: str):
+        if not ok:
+            errors.append(message)
+            print(f"[错误] {message}")
+
+    files = make_site()
+    with tempfile.TemporaryDirectory() as tmp, serve() as origin:
+        save_root = os.path.join(tmp, "Contest_PDFs")
+        base_urls = {t: f"{origin}/{{year}}/{{year}}_{t}_Problem_{{problem}}_Results.pdf" for t in ("MCM", "ICM")}
+        jobs = list(iter_jobs(YEARS[0], YEARS[-1], base_urls, save_root))
+
+        log = io.StringIO()
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            done = download_contest_pdfs_concurrent(YEARS[0], YEARS[-1], base_urls, save_root,
+                                                    max_workers=MAX_WORKERS, per_host=PER_HOST)
+        wall = time.perf_counter() - t0
+        check(done == len(files), f"成功 {done} 个, 应为 {len(files)} 个")
+
+        # 1. 每个文件都保存且可读
+        for (year, contest_type, problem), body in files.items():
+            save_path = os.path.join(save_root, contest_type, f"{year}_{contest_type}_Problem_{problem}_Results.pdf")
+            if not os.path.exists(save_path):
+                check(False, f"未保存: {save_path}")
+                continue
+            with open(save_path, "rb") as f:
+                check(f.read() == body, f"内容与服务器不一致: {save_path}")
+            check(len(PyPDF2.PdfReader(save_path).pages) == 1, f"读不出页面: {save_path}")
+
+        # 2. 并发不超过 per_host
+        check(FixedHandler.peak <= PER_HOST,
+              f"服务器同时处理 {FixedHandler.peak} 个请求, 超过 per_host={PER_HOST}")
+
+        # 3. 404: 报告失败, 不留文件
+        year, contest_type, problem = MISSING
+        missing_path = os.path.join(save_root, contest_type, f"{year}_{contest_type}_Problem_{problem}_Results.pdf")
+        missing_url = base_urls[contest_type].format(year=year, problem=problem)
+        check(f"{missing_url} (状态码: 404)" in log.getvalue(), "404 没有报告为失败")
+        for path in (missing_path, missing_path + ".part", missing_path + ".part.json"):
+            check(not os.path.exists(path), f"404 后留下了 {path}")
+        check(not any(key.endswith(os.path.basename(missing_path)) for key in load_manifest(save_root)),
+              "404 的文件进了清单")
+
+        # 4. 再运行一次: 全部 304
+        before = {path: os.stat(path).st_mtime_ns for _, _, path in jobs if os.path.exists(path)}
+        FixedHandler.statuses.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            done = download_contest_pdfs_concurrent(YEARS[0], YEARS[-1], base_urls, save_root,
+                                                    max_workers=MAX_WORKERS, per_host=PER_HOST)
+        check(done == len(files), f"第二次运行成功 {done} 个, 应为 {len(files)} 个")
+        check(FixedHandler.statuses.count(304) == len(files),
+              f"第二次运行得到 {FixedHandler.statuses.count(304)} 个 304, 应为 {len(files)} 个")
+        for path, mtime in before.items():
+            check(os.stat(path).st_mtime_ns == mtime, f"未变化的文件被重写: {path}")
+
+        # 5. 续传: 把已保存的文件改回 .part(前一半 / 完整 / 比服务器上的还长), 不带清单记录再取一次
+        with make_session(1) as session:
+            for (year, contest_type, problem), body in list(files.items())[:2]:
+                name = f"{year}_{contest_type}_Problem_{problem}_Results.pdf"
+                save_path = os.path.join(save_root, contest_type, name)
+                url = base_urls[contest_type].format(year=year, problem=problem)
+                for part, want in ((body[:len(body) // 2], [206]), (body, [416]), (body + b"\n%%EOF\n", [416, 200])):
+                    os.remove(save_path)
+                    with open(save_path + ".part", "wb") as f:
+                        f.write(part)
+                    with open(save_path + ".part.json", "w", encoding="utf-8") as f:
+                        json.dump({"url": url, "etag": '"%s"' % hashlib.sha256(body).hexdigest()[:16],
+                                   "last_modified": None}, f)
+                    FixedHandler.statuses.clear()
+                    status, *_ = fetch_pdf(session, HostLimiter(1), url, save_path)
+                    check(status == "saved" and FixedHandler.statuses == want,
+                          f"{len(part)}/{len(body)} 字节的 .part: 状态 {status}, 服务器返回 {FixedHandler.statuses}")
+                    for path in (save_path + ".part", save_path + ".part.json"):
+                        check(not os.path.exists(path), f"续传后留下了 {path}")
+                    if not os.path.exists(save_path):
+                        break
+                    with open(save_path, "rb") as f:
+                        check(f.read() == body, f"续传后内容不一致: {save_path}")
+
+        # 6. 手工放入的文件
+        with open(missing_path, "wb") as f:
+            f.write(tiny_pdf(os.path.basename(missing_path)))
+        found = discover_pdfs(save_root)
+        check(found.get(MISSING) == missing_path, "清单之外的文件没有被 discover_pdfs 找到")
+        check(len(found) == len(files) + 1, f"discover_pdfs 找到 {len(found)} 个, 应为 {len(files) + 1} 个")
+
+    print(f"{len(jobs)} 个地址, 服务器共收到 {FixedHandler.requests} 个 GET, "
+          f"最大并发 {FixedHandler.peak} (per_host={PER_HOST}), 用时 {wall:.2f} 秒")
+    if errors:
+        print(f"[失败] {len(errors)} 项检查未通过")
+        sys.exit(1)
+    print("[完成] 全部检查通过")
+
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import sys
+import time
+import PyPDF2
+from pagecache import EXTRACTORS, _extract_page
+from awardcount import AwardMatcher, N_SLOTS
+from profiles import AWARDS, AWARD_SHORT, PAT_LOOSE, normalize_award
+from manifest import discover_pdfs
+'''
+提取器基准: 在同一批 PDF 上分别用各提取器逐页提取(不读写页面缓存), 输出每秒页数,
+并用同一套奖项匹配(PAT_LOOSE + normalize_award)核对两者统计结果是否一致
+
+用法: python bench_extract.py [PDF 路径 ...]    不给路径时使用 Contest_PDFs 下的全部文件
+'''
+
+
+def run_extractor(name: str, pdf_paths):
+    """返回 (页数, 用时秒, 各奖项计数)"""
+    _, make_extract = EXTRACTORS[name]
+    matcher = AwardMatcher(PAT_LOOSE, normalize_award)
+    counts = [0] * N_SLOTS
+    n_pages = 0
+    t0 = time.perf_counter()
+    for pdf_path in pdf_paths:
+        with open(pdf_path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            extract = make_extract(reader)
+            for i in range(1, len(reader.pages)):
+                matcher.count(_extract_page(reader, i, extract), counts)
+                n_pages += 1
+    return n_pages, time.perf_counter() - t0, counts
+
+
+def main():
+    pdf_paths = sys.argv[1:] or sorted(discover_pdfs().values())
+    if not pdf_paths:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+
+    print(f"{len(pdf_paths)} 个 PDF")
+    print(f"{'提取器':<8}  {'页数':>6}  {'秒':>7}  {'页/秒':>8}  " + " ".join(f"{AWARD_SHORT[a]:>6}" for a in AWARDS))
+    print("-" * 100)
+    results = {}
+    for name in EXTRACTORS:
+        n_pages, elapsed, counts = run_extractor(name, pdf_paths)
+        results[name] = counts
+        print(f"{name:<8}  {n_pages:>6}  {elapsed:>7.2f}  {n_pages / max(elapsed, 1e-9):>8.1f}  "
+              + " ".join(f"{n:>6}" for n in counts[:len(AWARDS)]))
+    print("-" * 100)
+
+    base = results.pop("pypdf2")
+    for name, counts in results.items():
+        if counts[:len(AWARDS)] != base[:len(AWARDS)]:
+            print(f"⚠️ {name} 的统计结果与 pypdf2 不一致")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
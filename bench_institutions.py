@@ -0,0 +1,83 @@
+import sys
+import time
+import random
+import string
+from institutions import Canonicalizer, name_key
+'''
+院校名归一检查: 对一组已知的写法核对 institutions.py 的合并结果, 再在合成的大批院校名上测 learn() 的用时
+- SAME: 同一院校的不同写法, 必须合并(断词、通用词错字、专名相邻字母颠倒)
+- DIFFERENT: 只差一两个字母的不同院校, 不得合并; 别名缓存只追加, 合错了以后的统计全都跟着错
+
+有任何一组判断错误时退出码为 1
+用法: python bench_institutions.py [合成院校名数量]
+'''
+
+SAME = [
+    ("Zhejiang University", "Zhejiang Univ ersity"),
+    ("Zhejiang University", "Zhejaing University"),
+    ("Tsinghua University", "Tsing Hua University"),
+    ("Tsinghua University", "Tsinghua Universty"),
+    ("Harbin Institute of Technology", "Harbin Institue of Technology"),
+    ("University of Science and Technology of China", "University of Science and Tech nology of China"),
+]
+DIFFERENT = [
+    ("Jianghan University", "Jiangnan University"),
+    ("Zhangzhou Institute of Technology", "Zhengzhou Institute of Technology"),
+    ("Hangzhou University", "Yangzhou University"),
+    ("Henan University", "Hunan University"),
+    ("Hebei University of Technology", "Hubei University of Technology"),
+    ("Shanxi Normal University", "Shaanxi Normal University"),
+    ("Beijing 101 Middle School", "Beijing 110 Middle School"),
+    ("Zhejiang University", "Zhejiang University of Technology"),
+]
+TEMPLATES = ["{} University", "{} University of Technology", "{} Institute of Technology",
+             "{} Normal University", "{} University of Science and Technology", "{} {} College"]
+
+
+def merged(a: str, b: str) -> bool:
+    """空缓存上一起学习 a、b 后是否解析为同一标准名"""
+    canon = Canonicalizer()
+    canon.learn([a, b])
+    return canon.resolve(a) == canon.resolve(b)
+
+
+def synthetic_names(n: int, seed: int = 0):
+    """n 个随机院校名, 再加上其中十分之一的断词写法"""
+    rnd = random.Random(seed)
+    word = lambda: "".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(4, 10))).capitalize()
+    names = [rnd.choice(TEMPLATES).format(word(), word()) for _ in range(n)]
+    for name in names[:n // 10]:
+        i = rnd.randrange(1, len(name))
+        names.append(name[:i] + " " + name[i:])
+    return names
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 15000
+    errors = []
+    for pairs, want in ((SAME, True), (DIFFERENT, False)):
+        for a, b in pairs:
+            got = merged(a, b)
+            print(f"{'合并' if got else '分开'}  {a}  /  {b}")
+            if got != want:
+                errors.append(f"{a} / {b} 应当{'合并' if want else '分开'}")
+
+    names = synthetic_names(n)
+    t0 = time.perf_counter()
+    canon = Canonicalizer()
+    canon.learn(names)
+    elapsed = time.perf_counter() - t0
+    keys = {name_key(name) for name in names}
+    print(f"\n{len(names)} 个合成院校名({len(keys)} 个键) -> {len(set(canon.aliases.values()))} 个标准名, "
+          f"learn 用时 {elapsed:.2f} 秒")
+
+    for message in errors:
+        print(f"[错误] {message}")
+    if errors:
+        sys.exit(1)
+    print("[完成] 全部判断正确")
+
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
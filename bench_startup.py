@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import tempfile
+import subprocess
+'''
+comap-prizes.py 启动耗时预算:
+每个探测在新解释器里运行若干次, 取中位数墙钟时间与预算比较; 同时用 python -X importtime
+检查不该出现的重模块(--help 与结果查询不应导入 PyPDF2 / requests / NumPy)
+查询在临时目录里进行(结果库从仓库的 MCM-ICM-Results.csv 导入), 不改动工作目录
+
+超出预算或导入了重模块时退出码为 1, 可以放进提交前检查
+用法: python bench_startup.py [运行次数]
+'''
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "comap-prizes.py")
+HEAVY = ("PyPDF2", "requests", "numpy")
+# (名称, 参数, 预算毫秒)
+PROBES = [
+    ("--help", ["--help"], 150),
+    ("query", ["query", "-y", "2024", "-p", "C"], 250),
+    ("query --years", ["query", "-y", "2016-2025", "-a", "O"], 250),
+    ("export", ["export", "-y", "2020-2025", "-o", "export.csv"], 300),
+]
+
+
+def run_once(args, cwd: str, importtime: bool = False):
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + [CLI] + args
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} 退出码 {proc.returncode}: {proc.stderr.strip()[-300:]}")
+    return elapsed, proc.stderr
+
+
+def heavy_imports(importtime_log: str):
+    """-X importtime 输出中出现的重模块(顶层包名)"""
+    found = set()
+    for line in importtime_log.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        module = line.rsplit("|", 1)[1].strip().split(".")[0]
+        if module in HEAVY:
+            found.add(module)
+    return sorted(found)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    run_once(["--help"], HERE)  # 先跑一次, 让 .pyc 与文件缓存就绪
+
+    # 空解释器的启动时间作参照
+    bare = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"])
+        bare.append((time.perf_counter() - t) * 1000)
+    bare.sort()
+    print(f"空解释器启动: {bare[len(bare) // 2]:.1f} ms")
+
+    failed = False
+    print(f"\n{'探测':<16} {'中位数 ms':>10} {'预算 ms':>8}  重模块")
+    with tempfile.TemporaryDirectory() as work:
+        # 结果库在临时目录里从 CSV 建立; 先建好, 计时只包含查询本身
+        csv_name = os.path.join(HERE, "MCM-ICM-Results.csv")
+        if os.path.exists(csv_name):
+            with open(csv_name, "rb") as src, open(os.path.join(work, "MCM-ICM-Results.csv"), "wb") as dst:
+                dst.write(src.read())
+        run_once(["query", "-y", "2016"], work)
+
+        for name, args, budget in PROBES:
+            times = sorted(run_once(args, work)[0] for _ in range(runs))
+            median = times[len(times) // 2]
+            heavy = heavy_imports(run_once(args, work, importtime=True)[1])
+            ok = median <= budget and not heavy
+            failed |= not ok
+            print(f"{name:<16} {median:>10.1f} {budget:>8}  {', '.join(heavy) or '-'}  {'✅' if ok else '❌'}")
+
+    if failed:
+        print("\n❌ 超出启动预算或导入了重模块")
+        sys.exit(1)
+    print("\n✅ 全部在预算内")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
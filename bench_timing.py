@@ -0,0 +1,78 @@
+import os
+import sys
+import glob
+import json
+import tempfile
+import subprocess
+from bench import CORPUS, make_corpus
+from pagesplit import page_ranges
+from profiles import lookup
+'''
+分阶段计时检查: 同一套合成 PDF 用不同的工作进程数各统计一次(每次新解释器、空页面缓存), 核对 timing.py 的合并报告
+- 逐页的阶段(cache / extract / clean / match)和计数(pages / cache_miss)与进程数无关
+  (clean 只计有清洗规则的 PDF, 2020-2025 不清洗)
+- open 次数 = PDF 数(主进程读页数) + 页段数(每个页段打开一次), 页段数随进程数变化, 按 page_ranges 算出
+
+工作进程是 fork 出来的, 若继承了主进程已累计的数据会被重复计入, 这里能查出来
+有任何一项不满足时退出码为 1
+用法: python bench_timing.py [每个 PDF 的页数]
+'''
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORKERS = (1, 2, 4)
+PER_PAGE_STAGES = ("cache", "extract", "clean", "match")
+
+
+def run_child(corpus_root: str, n_pages: int, workers: int, out_dir: str) -> dict:
+    """在新解释器里用 workers 个进程统计, 返回合并后的计时报告"""
+    env = dict(os.environ, COMAP_TIMING=out_dir, COMAP_PAGE_CACHE=os.path.join(out_dir, "cache"),
+               COMAP_EXTRACTOR="pypdf2")
+    env.pop("COMAP_TIMING_RUN", None)
+    code = ("import sys, bench, timing, countall; "
+            "tasks, _ = bench.make_corpus(sys.argv[1], int(sys.argv[2])); "
+            "countall.run_tasks(tasks, int(sys.argv[3])); timing.report()")
+    # 子进程在仓库目录里运行, 从哪里启动本脚本都能导入 bench / countall
+    proc = subprocess.run([sys.executable, "-c", code, corpus_root, str(n_pages), str(workers)],
+                          cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{workers} 个进程的统计退出码 {proc.returncode}: {proc.stderr.strip()[-300:]}")
+    with open(glob.glob(os.path.join(out_dir, "timing-*.json"))[0], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    n_pages = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    errors = []
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_root = os.path.join(tmp, "corpus")
+        make_corpus(corpus_root, n_pages)
+        reports = {w: run_child(corpus_root, n_pages, w, os.path.join(tmp, f"w{w}")) for w in WORKERS}
+
+    expected = {stage: n_pages * len(CORPUS) for stage in PER_PAGE_STAGES}
+    expected["clean"] = n_pages * sum(1 for task in CORPUS if lookup(*task).clean is not None)
+    expected_counters = {"pages": n_pages * len(CORPUS), "cache_miss": n_pages * len(CORPUS)}
+    print(f"{'进程数':>6}  " + "  ".join(f"{s:>8}" for s in ("open",) + PER_PAGE_STAGES) + f"  {'pages':>8}")
+    for workers, data in reports.items():
+        calls = {stage: entry[0] for stage, entry in data["stages"].items()}
+        # 页数加 1 是封面页: page_ranges 从第二页开始分段
+        n_ranges = len(page_ranges(n_pages + 1, workers))
+        want = dict(expected, open=len(CORPUS) * (1 + n_ranges))
+        print(f"{workers:>6}  " + "  ".join(f"{calls.get(s, 0):>8}" for s in ("open",) + PER_PAGE_STAGES)
+              + f"  {data['counters'].get('pages', 0):>8}")
+        for stage, n in want.items():
+            if calls.get(stage, 0) != n:
+                errors.append(f"{workers} 个进程: {stage} 计了 {calls.get(stage, 0)} 次, 应为 {n} 次")
+        for name, n in expected_counters.items():
+            if data["counters"].get(name, 0) != n:
+                errors.append(f"{workers} 个进程: 计数 {name} 为 {data['counters'].get(name, 0)}, 应为 {n}")
+
+    for message in errors:
+        print(f"[错误] {message}")
+    if errors:
+        sys.exit(1)
+    print("[完成] 各阶段计数与进程数无关")
+
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import os
+import re
+import sys
+import time
+import types
+import hashlib
+from contextlib import closing
+from pagecache import EXTRACTORS, pdf_sha256
+from pagesplit import count_page_range
+from extractors import extractor_chain
+from profiles import lookup
+from results_store import DB_PATH, CSV_NAME, connect, load_provenance, save_results
+'''
+增量构建:
+结果库里每个 (年份, 赛别, 题号) 单元都带一条来源记录(results_store 的 provenance 表):
+PDF 内容哈希、提取器版本、清洗/匹配规则(profile)的名称和内容哈希、计数代码的内容哈希
+构建时逐单元比较记录与当前输入, 只重算有变化的单元, 其余沿用库里的计数
+
+profile 与计数代码的"版本"由 fingerprint() 从代码本身算出, 不需要手动改版本号:
+函数的字节码、常量、默认值、闭包变量, 以及它引用的本仓库全局名(替换表、正则、被调用的函数...)都计入哈希,
+改一条替换表或一个正则只影响用到它的 profile; 只改注释或文档字符串的文字不会触发重算
+字节码随 Python 版本变化, 升级解释器后会全部重算一次
+
+用法: python build.py [起始年份 [结束年份]] [--force] [--dry-run]
+'''
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIELDS = ("pdf_sha256", "extractor", "profile", "profile_hash", "counter_hash")
+_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+
+# -----------------------------------
+# 代码与数据的内容哈希
+# -----------------------------------
+def _in_repo(obj) -> bool:
+    module = sys.modules.get(getattr(obj, "__module__", None) or "")
+    path = getattr(module, "__file__", None)
+    return bool(path) and os.path.dirname(os.path.abspath(path)) == REPO_DIR
+
+
+def _global_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _feed_code(h, code, seen, doc=None):
+    h.update(code.co_code)
+    _feed(h, code.co_names, seen)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _feed_code(h, const, seen)
+        elif doc is not None and const is doc:
+            h.update(b"<doc>")  # 只改文档字符串不改变哈希
+        else:
+            _feed(h, const, seen)
+
+
+def _feed_function(h, func, seen):
+    _feed_code(h, func.__code__, seen, func.__doc__)
+    _feed(h, func.__defaults__, seen)
+    _feed(h, func.__kwdefaults__, seen)
+    for cell in func.__closure__ or ():
+        try:
+            _feed(h, cell.cell_contents, seen)
+        except ValueError:  # 尚未赋值的闭包变量
+            h.update(b"<empty>")
+    for name in sorted(_global_names(func.__code__)):
+        if name in func.__globals__:
+            h.update(name.encode() + b"=")
+            _feed(h, func.__globals__[name], seen)
+
+
+def _feed(h, obj, seen):
+    if isinstance(obj, _SCALARS):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode("utf-8", "surrogatepass"))
+        return
+    if id(obj) in seen:
+        h.update(b"<seen>")
+        return
+    seen.add(id(obj))
+    if isinstance(obj, re.Pattern):
+        _feed(h, ("re", obj.pattern, obj.flags), seen)
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for key, value in obj.items():
+            _feed(h, key, seen)
+            _feed(h, value, seen)
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"(" if isinstance(obj, tuple) else b"[")
+        for item in obj:
+            _feed(h, item, seen)
+        h.update(b")")
+    elif isinstance(obj, (set, frozenset)):
+        h.update(b"<set>" + "".join(sorted(fingerprint(item) for item in obj)).encode())
+    elif isinstance(obj, types.FunctionType) and _in_repo(obj):
+        _feed_function(h, obj, seen)
+    elif isinstance(obj, type) and _in_repo(obj):
+        h.update(f"<class {obj.__qualname__}>".encode())
+        for name, value in obj.__dict__.items():
+            if name not in ("__module__", "__doc__", "__dict__", "__weakref__", "__qualname__"):
+                h.update(name.encode() + b"=")
+                _feed(h, value, seen)
+    elif hasattr(obj, "__func__"):  # staticmethod / classmethod / 绑定方法
+        _feed(h, obj.__func__, seen)
+    elif hasattr(obj, "__wrapped__"):  # functools 装饰过的函数
+        _feed(h, obj.__wrapped__, seen)
+    elif isinstance(obj, property):
+        _feed(h, (obj.fget, obj.fset, obj.fdel), seen)
+    else:
+        # 模块、内置函数、第三方类等只记名称(repr 可能含内存地址)
+        name = getattr(obj, "__qualname__", None) or getattr(obj, "__name__", None) or type(obj).__qualname__
+        h.update(f"<{getattr(obj, '__module__', None) or ''}.{name}>".encode())
+
+
+def fingerprint(obj) -> str:
+    """obj(函数 / 类 / profile / 表 ...)及其引用到的本仓库代码与数据的内容哈希"""
+    h = hashlib.sha256()
+    _feed(h, obj, set())
+    return h.hexdigest()
+
+
+# -----------------------------------
+# 单元的输入
+# -----------------------------------
+def extractor_version() -> str:
+    """本次运行的提取器链(COMAP_EXTRACTOR), 如 raw-v1+PyPDF2-3.0.1"""
+    return "+".join(EXTRACTORS[name][0] for name in extractor_chain())
+
+
+def counter_hash() -> str:
+    """统计一个页段的代码(逐页提取、校验回退、AwardMatcher 计数)"""
+    return fingerprint(count_page_range)[:16]
+
+
+_PROFILE_HASHES = {}
+
+
+def unit_inputs(task, extractor: str, counter: str) -> dict:
+    year, prob, pdf_path, contest_type = task
+    profile = lookup(year, contest_type, prob)
+    if profile.name not in _PROFILE_HASHES:
+        _PROFILE_HASHES[profile.name] = fingerprint(profile)[:16]
+    return {"pdf_sha256": pdf_sha256(pdf_path), "extractor": extractor, "profile": profile.name,
+            "profile_hash": _PROFILE_HASHES[profile.name], "counter_hash": counter}
+
+
+def plan(tasks, stored: dict, force: bool = False):
+    """[(任务, 当前输入, 需要重算的原因)]; 原因为空列表表示沿用库里的计数"""
+    extractor, counter = extractor_version(), counter_hash()
+    units = []
+    for task in tasks:
+        year, prob, _, contest_type = task
+        inputs = unit_inputs(task, extractor, counter)
+        old = stored.get((year, prob, contest_type))
+        if force:
+            reasons = ["--force"]
+        elif old is None:
+            reasons = ["无来源记录"]
+        else:
+            reasons = [field for field in FIELDS if old[field] != inputs[field]]
+        units.append((task, inputs, reasons))
+    return units
+
+
+def build(tasks, force: bool = False, dry_run: bool = False, max_workers=None,
+          db_path: str = DB_PATH, csv_name: str = CSV_NAME):
+    """只重算输入有变化的单元, 写入结果库并导出 CSV; 返回需要重算的单元 [(任务, 当前输入, 原因)]"""
+    t0 = time.perf_counter()
+    with closing(connect(db_path, csv_name)) as conn:
+        stored = load_provenance(conn)
+    units = plan(tasks, stored, force)
+    stale = [unit for unit in units if unit[2]]
+    for (year, prob, _, contest_type), inputs, reasons in stale:
+        print(f"[重算] {year}-{contest_type}-Problem {prob} (规则: {inputs['profile']}): {', '.join(reasons)}")
+    print(f"\n🎯 共 {len(units)} 个单元: 沿用 {len(units) - len(stale)} 个, 需要重算 {len(stale)} 个"
+          f"（比较用时 {time.perf_counter() - t0:.2f} 秒）")
+    if dry_run or not stale:
+        return stale
+
+    from countall import run_tasks
+    print(f"\n🚀 使用并行处理（进程数：{max_workers or os.cpu_count() or 4}）...")
+    rows = run_tasks([task for task, _, _ in stale], max_workers)
+    done = {(year, prob, contest_type) for year, prob, contest_type, _, _ in rows}
+    built_at = time.time()
+    provenance = [dict(inputs, year=year, problem=prob, type=contest_type, built_at=built_at)
+                  for (year, prob, _, contest_type), inputs, _ in stale if (year, prob, contest_type) in done]
+    if rows:
+        save_results(rows, db_path, csv_name, provenance=provenance)
+    print(f"\n⏱️ 重算 {len(provenance)} / {len(stale)} 个单元, 用时 {time.perf_counter() - t0:.1f} 秒")
+    return stale
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    from countall import build_tasks
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    years = [int(arg) for arg in sys.argv[1:] if not arg.startswith("--")]
+    start_year = years[0] if years else 2016
+    end_year = years[1] if len(years) > 1 else (start_year if years else 2025)
+
+    tasks = build_tasks(start_year, end_year)
+    if not tasks:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+    build(tasks, force="--force" in flags, dry_run="--dry-run" in flags)
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+import socket
+'''
+常驻提取服务(daemon.py)的客户端: 只用标准库, 不导入 PyPDF2, 启动只需几十毫秒
+协议: 每个连接发送一行 JSON 请求, 收到一行 JSON 响应 {"ok": true, ...} 或 {"ok": false, "error": ...}
+
+用法:
+    python client.py count 年份 赛别 题号 [提取器]       统计奖项(提取器: pypdf2 / raw / auto)
+    python client.py dump 年份 赛别 题号 [起始页 [结束页]]  打印原始文本与清洗后文本(页码从 1 开始)
+    python client.py stats                               缓存与任务统计
+    python client.py stop                                关闭服务
+'''
+
+SOCKET_PATH = os.environ.get("COMAP_DAEMON_SOCKET", ".comapd.sock")
+TIMEOUT = 600
+
+
+class DaemonError(Exception):
+    pass
+
+
+def request(payload: dict, path: str = SOCKET_PATH, timeout: float = TIMEOUT) -> dict:
+    """发送一个请求并返回响应; 服务未启动时抛出 ConnectionError, 服务端出错时抛出 DaemonError"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise DaemonError("服务端没有响应")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise DaemonError(response.get("error", "未知错误"))
+    return response
+
+
+def print_counts(response: dict):
+    print(f"\n=== {response['pdf']} ({response['profile']}) 统计结果 ===")
+    print(f"{'Award':<20}  {'Count':>5}")
+    print("-" * 30)
+    for aw, n in response["counts"]:
+        print(f"{aw:<20}  {n:>5}")
+    print("-" * 30)
+    if response.get("note"):
+        print(response["note"])
+
+
+def print_dump(response: dict):
+    for i, raw_text, text in response["pages"]:
+        print(f"\n=== 第 {i + 1} 页 原始提取文本（显式转义） ===")
+        print(raw_text.encode("unicode_escape").decode("utf-8"))
+        if text != raw_text:
+            print(f"--- 第 {i + 1} 页 清洗后 ---")
+            print(text.encode("unicode_escape").decode("utf-8"))
+        print("=" * 60)
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] not in ("count", "dump", "stats", "stop") or (args[0] in ("count", "dump") and len(args) < 4):
+        print("用法: python client.py count 年份 赛别 题号 [提取器]")
+        print("      python client.py dump 年份 赛别 题号 [起始页 [结束页]]")
+        print("      python client.py stats | stop")
+        sys.exit(1)
+
+    op = args[0]
+    payload = {"op": op}
+    if op in ("count", "dump"):
+        payload.update(year=int(args[1]), type=args[2].upper(), problem=args[3].upper())
+        if op == "count" and len(args) > 4:
+            payload["extractor"] = args[4]
+        if op == "dump":
+            # 命令行页码从 1 开始, 请求里是页下标
+            payload["start"] = int(args[4]) - 1 if len(args) > 4 else 1
+            if len(args) > 5:
+                payload["stop"] = int(args[5])
+
+    t0 = time.perf_counter()
+    try:
+        response = request(payload)
+    except (ConnectionError, FileNotFoundError):
+        print(f"[错误] 无法连接常驻服务 {SOCKET_PATH}, 请先运行 python daemon.py")
+        sys.exit(1)
+    except DaemonError as e:
+        print(f"[错误] {e}")
+        sys.exit(1)
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    if op == "count":
+        print_counts(response)
+    elif op == "dump":
+        print_dump(response)
+    elif op == "stats":
+        print(json.dumps(response["stats"], ensure_ascii=False, indent=2))
+    else:
+        print("[完成] 服务已关闭")
+    print(f"⏱️ {elapsed:.1f} ms")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+import os
+import sys
+import argparse
+'''
+统一命令行入口: 不必再改各脚本 main() 里写死的 start_year / end_year / problems_icm 再运行
+
+    python comap-prizes.py download [-y 年份] [-t 赛别] [-p 题号]     下载结果 PDF
+    python comap-prizes.py count    [-y 年份] [-t 赛别] [-p 题号]     统计并写入结果库 / CSV
+    python comap-prizes.py build    [-y 年份] [-t 赛别] [-p 题号]     增量构建: 只重算输入或规则有变化的单元
+    python comap-prizes.py dump     年份 赛别 题号 [--pages 3-5]     打印页面原始文本与清洗后文本
+    python comap-prizes.py scan     [-y 年份] [-t 赛别] [-p 题号]     全量扫描异常写法 / 码位 / 行不一致
+    python comap-prizes.py query    [-y 年份] [-t 赛别] [-p 题号] [-a 奖项] [--institution 名称]
+    python comap-prizes.py export   [-y 年份] [-t 赛别] [-p 题号] [-o 文件] [--format csv|json]
+
+年份: 2019 / 2016-2025 / 2019,2021; 赛别: MCM / ICM; 题号: D / DEF / A,B(给了题号可省略赛别)
+
+模块按子命令延迟导入: PyPDF2 只在 count / build / dump / scan、requests 只在 download、
+NumPy 只在 query --institution 时才导入; --help 与结果查询只需标准库和 sqlite3
+启动耗时预算见 bench_startup.py
+'''
+
+FIRST_YEAR = 2016
+LAST_YEAR = 2025
+PROBLEMS = {"MCM": "ABC", "ICM": "DEF"}
+
+
+# -----------------------------------
+# 选择器
+# -----------------------------------
+def parse_years(spec: str):
+    """'2019' / '2016-2025' / '2019,2021' -> 升序年份列表"""
+    years = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        try:
+            lo, hi = int(lo), int(hi or lo)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"无法识别的年份: {spec}")
+        if lo > hi:
+            raise argparse.ArgumentTypeError(f"年份范围颠倒: {part}")
+        years.update(range(lo, hi + 1))
+    if not years:
+        raise argparse.ArgumentTypeError(f"无法识别的年份: {spec}")
+    return sorted(years)
+
+
+def parse_problems(spec: str):
+    letters = [ch for ch in spec.upper() if ch not in ", "]
+    bad = [ch for ch in letters if ch not in "ABCDEF"]
+    if bad or not letters:
+        raise argparse.ArgumentTypeError(f"题号只能是 A-F: {spec}")
+    return letters
+
+
+def parse_type(spec: str) -> str:
+    spec = spec.upper()
+    if spec not in PROBLEMS:
+        raise argparse.ArgumentTypeError(f"赛别只能是 MCM / ICM: {spec}")
+    return spec
+
+
+def selected_problems(args) -> dict:
+    """{赛别: [题号, ...]}; 只给题号时赛别由题号决定"""
+    types = args.type or list(PROBLEMS)
+    chosen = {}
+    for contest_type in types:
+        problems = [p for p in PROBLEMS[contest_type] if args.problem is None or p in args.problem]
+        if problems:
+            chosen[contest_type] = problems
+    return chosen
+
+
+def selected(args):
+    """[(年份, 赛别, 题号), ...], 顺序与 CSV 一致(年份 / MCM→ICM / 题号)"""
+    problems = selected_problems(args)
+    return [(year, contest_type, problem)
+            for year in args.years for contest_type, letters in problems.items() for problem in letters]
+
+
+def year_runs(years):
+    """把年份列表拆成连续区间 [(起, 止), ...]"""
+    runs = []
+    for year in years:
+        if runs and runs[-1][1] == year - 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    return [tuple(run) for run in runs]
+
+
+# -----------------------------------
+# 子命令
+# -----------------------------------
+def cmd_download(args):
+    from download import download_contest_pdfs_concurrent
+    problems = selected_problems(args)
+    for start_year, end_year in year_runs(args.years):
+        download_contest_pdfs_concurrent(start_year, end_year, save_root=args.base_dir,
+                                         max_workers=args.workers or 8, problems=problems)
+
+
+def local_tasks(args):
+    """选中且本地存在的 PDF -> 任务列表 [(年份, 题号, 路径, 赛别), ...](与 countall.build_tasks 相同)"""
+    from manifest import discover_pdfs, pdf_path_for
+    available = discover_pdfs(args.base_dir)
+    tasks = []
+    for year, contest_type, problem in selected(args):
+        pdf_path = available.get((year, contest_type, problem))
+        if pdf_path is None:
+            if not args.quiet:
+                print(f"[错误] 文件不存在：{pdf_path_for(year, contest_type, problem, args.base_dir)}")
+            continue
+        tasks.append((year, problem, pdf_path, contest_type))
+    if not tasks:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+    return tasks
+
+
+def cmd_count(args):
+    if args.extractor:
+        os.environ["COMAP_EXTRACTOR"] = args.extractor  # 工作进程继承
+    import timing
+    tasks = local_tasks(args)
+
+    if args.daemon:
+        from client import request, DaemonError
+        from profiles import AWARD_SHORT
+        all_results = []
+        for year, problem, pdf_path, contest_type in tasks:
+            try:
+                response = request({"op": "count", "year": year, "type": contest_type, "problem": problem,
+                                    "pdf": pdf_path, "extractor": args.extractor})
+            except (ConnectionError, FileNotFoundError):
+                print("[错误] 无法连接常驻服务, 请先运行 python daemon.py")
+                sys.exit(1)
+            except DaemonError as e:
+                print(f"[错误] 处理失败 {year}-{contest_type}-Problem {problem}: {e}")
+                continue
+            if not any(n for _, n in response["counts"]):
+                print(f"[警告] 未提取到奖项: {year}-{contest_type}-Problem {problem}")
+                continue
+            all_results.extend([year, problem, contest_type, AWARD_SHORT[aw], n] for aw, n in response["counts"])
+            print(f"[完成] {year}-{contest_type}-Problem {problem} (规则: {response['profile']})")
+    else:
+        from countall import run_tasks
+        print(f"\n🚀 使用并行处理（进程数：{args.workers or os.cpu_count() or 4}）...")
+        all_results = run_tasks(tasks, args.workers)
+
+    if not all_results:
+        print("\n❌ 未提取到任何奖项")
+        sys.exit(1)
+    if args.dry_run:
+        print_rows(all_results)
+    else:
+        from results_store import save_results
+        save_results(all_results, csv_name=args.csv)
+        print(f"\n🎯 所有年份数据已写入文件：{args.csv}")
+    timing.report("comap-prizes count")
+
+
+def cmd_build(args):
+    if args.extractor:
+        os.environ["COMAP_EXTRACTOR"] = args.extractor
+    tasks = local_tasks(args)
+    from build import build
+    build(tasks, force=args.force, dry_run=args.dry_run, max_workers=args.workers, db_path=args.db,
+          csv_name=args.csv)
+
+
+def cmd_dump(args):
+    from manifest import pdf_path_for
+    from client import print_dump
+    pdf_path = pdf_path_for(args.year, args.type, args.problem, args.base_dir)
+    if not os.path.exists(pdf_path):
+        print(f"[错误] 文件不存在：{pdf_path}")
+        sys.exit(1)
+    start, stop = args.pages
+    if args.daemon:
+        from client import request
+        response = request({"op": "dump", "year": args.year, "type": args.type, "problem": args.problem,
+                            "pdf": pdf_path, "start": start, "stop": stop})
+    else:
+        from pagecache import iter_page_texts
+        from profiles import lookup
+        clean = lookup(args.year, args.type, args.problem).clean
+        pages = [[i, raw_text, raw_text if clean is None else clean(raw_text)]
+                 for i, raw_text in iter_page_texts(pdf_path, start, stop)]
+        response = {"pages": pages}
+    print_dump(response)
+
+
+def cmd_scan(args):
+    tasks = local_tasks(args)
+    from anomaly import scan, print_report, save_report
+    print(f"🚀 扫描 {len(tasks)} 个 PDF（{'原始' if args.raw else '清洗后'}文本）...")
+    entries = scan(tasks, args.raw, args.workers)
+    print_report(entries, args.top)
+    if args.output:
+        save_report(entries, args.output)
+        print(f"\n🎯 完整报告已写入文件：{args.output}")
+
+
+def query_rows(args):
+    """按选择器从结果库取行 [[年份, 题号, 赛别, 奖项, 数量], ...]"""
+    from contextlib import closing
+    from results_store import connect, query
+    # 只选了一个值的维度交给 SQL(走索引), 其余在这里过滤
+    one = lambda values: values[0] if values and len(values) == 1 else None
+    problems = selected_problems(args)
+    letters = {p for ps in problems.values() for p in ps}
+    with closing(connect(args.db, args.csv)) as conn:
+        rows = query(conn, year=one(args.years), problem=one(sorted(letters)),
+                     contest_type=one(list(problems)), award=args.award)
+    years = set(args.years)
+    return [row for row in rows if row[0] in years and row[1] in problems.get(row[2], ())]
+
+
+def print_rows(rows):
+    print(f"{'Year':<6}{'Type':<6}{'Problem':<9}{'Award':<7}{'Count':>7}")
+    for year, problem, contest_type, award, count in rows:
+        print(f"{year:<6}{contest_type:<6}{problem:<9}{award:<7}{count:>7}")
+
+
+def cmd_query(args):
+    if args.institution:
+        query_institution(args.institution)
+        return
+    rows = query_rows(args)
+    if not rows:
+        print("[提示] 没有符合条件的记录")
+        return
+    print_rows(rows)
+    print(f"共 {len(rows)} 行, 队伍合计 {sum(row[4] for row in rows)}")
+
+
+def query_institution(name: str):
+    from institution_index import InstitutionIndex, INDEX_DIR
+    index = InstitutionIndex.load(INDEX_DIR)
+    if index.scheme == "aliases":
+        from institutions import Canonicalizer
+        index.canonical = Canonicalizer.load().resolve
+    matches = [name] if index.id_of(name) is not None else index.prefix(name)
+    if not matches:
+        print(f"[提示] 索引中没有院校: {name}（先运行 teams.py 与 institution_index.py）")
+        return
+    for match in matches:
+        tally = index.tally(match)
+        print(f"🏆 {match}: " + ", ".join(f"{aw}: {n}" for aw, n in tally.items()))
+
+
+def cmd_export(args):
+    rows = query_rows(args)
+    from results_store import CSV_HEADER, AWARD_RANK
+    tmp = f"{args.output}.{os.getpid()}.tmp"
+    if args.format == "json":
+        import json
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([dict(zip(CSV_HEADER, (*row, AWARD_RANK.get(row[3], "")))) for row in rows],
+                      f, ensure_ascii=False, indent=1)
+    else:
+        import csv
+        with open(tmp, "w", newline='', encoding="utf-8-sig") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows((*row, AWARD_RANK.get(row[3], "")) for row in rows)
+    os.replace(tmp, args.output)
+    print(f"🎯 {len(rows)} 行已导出到：{args.output}")
+
+
+# -----------------------------------
+# 参数
+# -----------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="comap-prizes", description="MCM/ICM 获奖统计")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_selectors(p):
+        p.add_argument("-y", "--years", type=parse_years, default=list(range(FIRST_YEAR, LAST_YEAR + 1)),
+                       help=f"年份: 2019 / 2016-2025 / 2019,2021(默认 {FIRST_YEAR}-{LAST_YEAR})")
+        p.add_argument("-t", "--type", type=parse_type, action="append", help="赛别 MCM / ICM, 可重复")
+        p.add_argument("-p", "--problem", type=parse_problems, help="题号: D / DEF / A,B")
+
+    p = sub.add_parser("download", help="下载结果 PDF")
+    add_selectors(p)
+    p.add_argument("--workers", type=int, help="下载线程数(默认 8)")
+    p.add_argument("--base-dir", default="Contest_PDFs")
+    p.set_defaults(func=cmd_download)
+
+    p = sub.add_parser("count", help="统计奖项, 写入结果库并导出 CSV")
+    add_selectors(p)
+    p.add_argument("-e", "--extractor", choices=["pypdf2", "raw", "auto"], help="文本提取器(默认按 COMAP_EXTRACTOR)")
+    p.add_argument("--workers", type=int, help="进程数(默认 CPU 核数)")
+    p.add_argument("--daemon", action="store_true", help="交给常驻服务 daemon.py 统计")
+    p.add_argument("--dry-run", action="store_true", help="只打印结果, 不写结果库")
+    p.add_argument("-q", "--quiet", action="store_true", help="不提示缺失的文件")
+    p.add_argument("--base-dir", default="Contest_PDFs")
+    p.add_argument("--csv", default="MCM-ICM-Results.csv")
+    p.set_defaults(func=cmd_count)
+
+    p = sub.add_parser("build", help="增量构建: 按 PDF 哈希 / 提取器 / 规则版本只重算有变化的单元")
+    add_selectors(p)
+    p.add_argument("-e", "--extractor", choices=["pypdf2", "raw", "auto"], help="文本提取器(默认按 COMAP_EXTRACTOR)")
+    p.add_argument("--workers", type=int, help="进程数(默认 CPU 核数)")
+    p.add_argument("--force", action="store_true", help="忽略来源记录, 全部重算")
+    p.add_argument("--dry-run", action="store_true", help="只列出需要重算的单元及原因")
+    p.add_argument("-q", "--quiet", action="store_true", help="不提示缺失的文件")
+    p.add_argument("--base-dir", default="Contest_PDFs")
+    p.add_argument("--db", default="MCM-ICM-Results.db")
+    p.add_argument("--csv", default="MCM-ICM-Results.csv")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("dump", help="打印页面原始文本与清洗后文本(调试用, 代替 printstr.py)")
+    p.add_argument("year", type=int)
+    p.add_argument("type", type=parse_type)
+    p.add_argument("problem", type=lambda s: parse_problems(s)[0])
+    p.add_argument("--pages", type=parse_pages, default=(1, None), help="页码范围(从 1 开始): 3 / 3-5 / 3-")
+    p.add_argument("--daemon", action="store_true", help="从常驻服务读取")
+    p.add_argument("--base-dir", default="Contest_PDFs")
+    p.set_defaults(func=cmd_dump)
+
+    p = sub.add_parser("scan", help="全量扫描: 奖项词的近似写法、少见码位、队伍行与奖项不一致(代替 printstr.py)")
+    add_selectors(p)
+    p.add_argument("--raw", action="store_true", help="扫描原始文本(默认扫描按规则清洗后的文本)")
+    p.add_argument("--top", type=int, default=50, help="显示前 N 条(默认 50)")
+    p.add_argument("-o", "--output", help="完整报告写入 JSON 文件")
+    p.add_argument("--workers", type=int, help="进程数(默认 CPU 核数)")
+    p.add_argument("-q", "--quiet", action="store_true", help="不提示缺失的文件")
+    p.add_argument("--base-dir", default="Contest_PDFs")
+    p.set_defaults(func=cmd_scan)
+
+    for name, func, text in (("query", cmd_query, "查询结果库"), ("export", cmd_export, "按条件导出结果")):
+        p = sub.add_parser(name, help=text)
+        add_selectors(p)
+        p.add_argument("-a", "--award", type=str.upper, choices=list("OFMHSUDN"), help="奖项缩写")
+        p.add_argument("--db", default="MCM-ICM-Results.db")
+        p.add_argument("--csv", default="MCM-ICM-Results.csv", help="结果库不存在时从该 CSV 导入")
+        if name == "query":
+            p.add_argument("--institution", help="按院校名(或前缀)查询获奖情况, 需要先建院校索引")
+        else:
+            p.add_argument("-o", "--output", default="MCM-ICM-Export.csv")
+            p.add_argument("--format", choices=["csv", "json"], default="csv")
+        p.set_defaults(func=func)
+    return parser
+
+
+def parse_pages(spec: str):
+    """页码(从 1 开始, 含两端) -> 页下标范围 [起, 止)"""
+    lo, dash, hi = spec.partition("-")
+    try:
+        start = int(lo) - 1
+        stop = int(hi) if hi else (None if dash else start + 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法识别的页码: {spec}")
+    return max(start, 0), stop
+
+# -----------------------------------
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import re
 import sys
-import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
+from results_store import save_results
+import timing
+from profiles import clean_2016 as clean_pdf_text  # 清洗规则统一在 profiles.py, 原来的逐条实现留在 bench_clean.py 作对照
 '''
 奖项定义: 2020-2025 正常读取
 
@@ -80,41 +82,27 @@ def normalize_award(word: str):
     else:
         return None
     
-def clean_pdf_text(text: str) -> str:
-    """清洗 PDF 文本 — 去除 Null 字节和空白混乱"""
-    # 去除所有 \x00 字符
-    text = text.replace("\x00", "")
-    
-    # 替换各种奇怪空格为普通空格
-    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
-        text = text.replace(ws, " ")
-
-    # 修复断词问题
-    text = text.replace("Honorab le", "Honorable")
-
-    # 合并多空格、去换行
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
 # -----------------------------------
 # PDF 解析函数
 # -----------------------------------
 def extract_designations(pdf_path: str):
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for i, page in enumerate(reader.pages[1:], start=2):
-                raw_text = page.extract_text() or ""
-                text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
-                # 调试输出看看清洗后效果
-                # print(f"\n=== 第 {i} 页 清洗后文本 ===")
-                # print(text[:300])  # 打印前 300 个字符看是否干净
-                # print("=" * 60)
-                for m in award_pat.finditer(text):
-                    award_full = normalize_award(m.group(0))
-                    if award_full:
-                        designations.append(award_full)
-                        # print(f"[匹配成功] → {award_full}")
+        for i, raw_text in iter_page_texts(pdf_path):
+            t = timing.start()
+            text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
+            t = timing.lap("clean", t, pdf_path, i)
+            # 调试输出看看清洗后效果
+            # print(f"\n=== 第 {i} 页 清洗后文本 ===")
+            # print(text[:300])  # 打印前 300 个字符看是否干净
+            # print("=" * 60)
+            for m in award_pat.finditer(text):
+                award_full = normalize_award(m.group(0))
+                if award_full:
+                    designations.append(award_full)
+                    # print(f"[匹配成功] → {award_full}")
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
@@ -129,12 +117,14 @@ def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str):
     counter = Counter(designations)
 
     # 打印统计
+    t = timing.start()
     print(f"\n=== {pdf_path} ({contest_type}) 统计结果 ===")
     print(f"{'Award':<20}  {'Count':>5}")
     print("-" * 30)
     for aw in AWARDS:
         print(f"{aw:<20}  {counter.get(aw, 0):>5}")
     print("-" * 30)
+    timing.lap("print", t, pdf_path)
 
     # 拼接结果行
     result_rows = []
@@ -183,14 +173,12 @@ def main():
         print("\n未提取到任何奖项，请检查 PDF 文件内容")
         sys.exit(1)
 
-    # 输出 CSV 文件
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
     csv_name = "MCM-ICM-Results.csv"
-    with open(csv_name, "w", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.report("count2016-2018")
 
 # -----------------------------------
 if __name__ == "__main__":
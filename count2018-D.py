@@ -1,9 +1,12 @@
 import re
 import sys
-import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
+from pagesplit import count_pdf_by_pages
+from results_store import save_results
+import timing
+from profiles import clean_2018_icm_d as clean_pdf_text  # 清洗规则统一在 profiles.py, 原来的逐条实现留在 bench_clean.py 作对照
 '''
 奖项定义: 2020-2025 正常读取
 
@@ -87,112 +90,48 @@ def normalize_award(word: str):
     else:
         return None
     
-import re
-
-def clean_pdf_text(raw_text: str) -> str:
-    """
-    清洗由 PDF 提取出的 ICM/MCM 比赛结果文本：
-    - 去掉退格符、控制符
-    - 修复断词、连续字母
-    - 标准化奖项名称
-    """
-    text = raw_text
-
-    # 🔹 1. 去掉退格符和多余控制符
-    text = re.sub(r'\\x08', '', text)           # 去除退格符显式转义
-    text = re.sub(r'\x08', '', text)            # 去除实际退格符
-    text = re.sub(r'[\r\n]+', ' ', text)        # 合并换行符为空格
-    text = re.sub(r'\s{2,}', ' ', text)         # 压缩多余空格
-
-    # 🔹 2. 修复字母之间多余空格 (例如 'H o n o r a b l e' → 'Honorable')
-    # 合并连续英文字符间的空格，只对大写或小写字母之间的空格
-    text = re.sub(r'(?<=\b[A-Za-z])\s+(?=[A-Za-z]\b)', '', text)
-
-    # 🔹 3. 统一空格
-    text = re.sub(r'\s{2,}', ' ', text).strip()
-
-    # 🔹 4. 替换反常断词
-    replacements = {
-        "Outsta nding": "Outstanding",
-        "Merit orious": "Meritorious",
-        "Honorab le": "Honorable",
-        "Su ccessful": "Successful",
-        "Parti cipant": "Participant",
-        "Not Judg ed": "Not Judged",
-        "Jud ged": "Judged",
-        "Disqua lified": "Disqualified",
-        "WinnerDisqualified": "Winner Disqualified",
-    }
-
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-
-    # 🔹 5. 标准化奖项短语 (去掉空格丢失的情况)
-    normalize_awards = {
-        "OutstandingWinner": "Outstanding Winner",
-        "MeritoriousWinner": "Meritorious Winner",
-        "HonorableMention": "Honorable Mention",
-        "SuccessfulParticipant": "Successful Participant",
-        "NotJudged": "Not Judged",
-        "Disqualified": "Disqualified",
-        "FinalistAward": "Finalist",
-        "FinalistWinner": "Finalist",
-    }
-    for k, v in normalize_awards.items():
-        text = text.replace(k, v)
-
-    # 🔹 6. 防止大小写混乱
-    # 把所有奖项关键字首字母统一大写
-    for word in [
-        "Outstanding Winner", "Meritorious Winner", "Honorable Mention",
-        "Successful Participant", "Not Judged", "Disqualified", "Finalist"
-    ]:
-        pattern = re.compile(word, re.I)
-        text = pattern.sub(word, text)
-
-    # 🔹 7. 再次去掉多余空格
-    text = re.sub(r'\s{2,}', ' ', text).strip()
-
-    return text
-
-
 # -----------------------------------
 # PDF 解析函数
 # -----------------------------------
 def extract_designations(pdf_path: str):
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for i, page in enumerate(reader.pages[1:], start=2):
-                raw_text = page.extract_text() or ""
-                text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
-                # print(text)
-                for m in award_pat.finditer(text):
-                    award_full = normalize_award(m.group(0))
-                    if award_full:
-                        designations.append(award_full)
-                        # print(f"[匹配成功] → {award_full}")
+        for i, raw_text in iter_page_texts(pdf_path):
+            t = timing.start()
+            text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
+            t = timing.lap("clean", t, pdf_path, i)
+            # print(text)
+            for m in award_pat.finditer(text):
+                award_full = normalize_award(m.group(0))
+                if award_full:
+                    designations.append(award_full)
+                    # print(f"[匹配成功] → {award_full}")
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
 
-def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str):
+def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str, split_pages: bool = True):
     """处理单个PDF并返回统计结果"""
-    designations = extract_designations(pdf_path)
-    if not designations:
+    if split_pages:
+        # 按页段并行, 结果与 extract_designations 逐页统计一致
+        counter = count_pdf_by_pages(pdf_path, award_pat, clean_pdf_text, normalize_award)
+    else:
+        counter = Counter(extract_designations(pdf_path))
+    if not counter:
         print(f"[警告] 未提取到任何奖项：{pdf_path}")
         return []
 
-    counter = Counter(designations)
-
     # 打印统计
+    t = timing.start()
     print(f"\n=== {pdf_path} ({contest_type}) 统计结果 ===")
     print(f"{'Award':<20}  {'Count':>5}")
     print("-" * 30)
     for aw in AWARDS:
         print(f"{aw:<20}  {counter.get(aw, 0):>5}")
     print("-" * 30)
+    timing.lap("print", t, pdf_path)
 
     # 拼接结果行
     result_rows = []
@@ -240,16 +179,12 @@ def main():
         print("\n未提取到任何奖项，请检查 PDF 文件内容")
         sys.exit(1)
 
-    # 输出 CSV 文件（追加模式）
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
     csv_name = "MCM-ICM-Results.csv"
-    file_exists = os.path.exists(csv_name)
-    with open(csv_name, "a", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.report("count2018-D")
 
 # -----------------------------------
 if __name__ == "__main__":
@@ -1,9 +1,11 @@
 import re
 import sys
-import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
+from results_store import save_results
+import timing
+from profiles import clean_2019 as clean_pdf_text  # 清洗规则统一在 profiles.py, 原来的逐条实现留在 bench_clean.py 作对照
 '''
 奖项定义: 2020-2025 正常读取
 
@@ -82,50 +84,23 @@ def normalize_award(word: str):
     else:
         return None
     
-def clean_pdf_text(text: str) -> str:
-    """清洗 PDF 抽取出的文本，处理 Null 字节和嵌字体污染、断词等"""
-    import re
-    # 去掉 Null 字节
-    text = text.replace("\x00", "")
-    
-    # 去掉所有 CJK 汉字和私用区符号（包括“王”之类）
-    text = re.sub(r"[\u4E00-\u9FFF\uE000-\uF8FF]", "", text)
-
-    # 替换各种奇怪的空格为普通空格
-    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
-        text = text.replace(ws, " ")
-
-    # === 🧩 修复断词问题 ===
-    # 常见的断词情况：Honorab le → Honorable
-    text = text.replace("Honorab le", "Honorable")
-    text = text.replace("Honora b le", "Honorable")
-    text = text.replace("Honor ab le", "Honorable")
-    text = text.replace("Merit orious", "Meritorious")
-    text = text.replace("Suc cessful", "Successful")
-    text = text.replace("Parti cipant", "Participant")
-
-    # 合并多余空格
-    text = re.sub(r"\s+", " ", text)
-
-    return text.strip()
-
-
 # -----------------------------------
 # PDF 解析函数
 # -----------------------------------
 def extract_designations(pdf_path: str):
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for i, page in enumerate(reader.pages[1:], start=2):
-                raw_text = page.extract_text() or ""
-                text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
-                for m in award_pat.finditer(text):
-                    award_full = normalize_award(m.group(0))
-                    if award_full:
-                        designations.append(award_full)
-                        # print(f"[匹配成功] → {award_full}")
+        for i, raw_text in iter_page_texts(pdf_path):
+            t = timing.start()
+            text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
+            t = timing.lap("clean", t, pdf_path, i)
+            for m in award_pat.finditer(text):
+                award_full = normalize_award(m.group(0))
+                if award_full:
+                    designations.append(award_full)
+                    # print(f"[匹配成功] → {award_full}")
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
@@ -140,12 +115,14 @@ def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str):
     counter = Counter(designations)
 
     # 打印统计
+    t = timing.start()
     print(f"\n=== {pdf_path} ({contest_type}) 统计结果 ===")
     print(f"{'Award':<20}  {'Count':>5}")
     print("-" * 30)
     for aw in AWARDS:
         print(f"{aw:<20}  {counter.get(aw, 0):>5}")
     print("-" * 30)
+    timing.lap("print", t, pdf_path)
 
     # 拼接结果行
     result_rows = []
@@ -194,16 +171,12 @@ def main():
         print("\n未提取到任何奖项，请检查 PDF 文件内容")
         sys.exit(1)
 
-    # 输出 CSV 文件（追加模式）
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
     csv_name = "MCM-ICM-Results.csv"
-    file_exists = os.path.exists(csv_name)
-    with open(csv_name, "a", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.report("count2019")
 
 # -----------------------------------
 if __name__ == "__main__":
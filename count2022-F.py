@@ -1,9 +1,12 @@
 import re
 import sys
-import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
+from pagesplit import count_pdf_by_pages
+from results_store import save_results
+import timing
+from profiles import clean_2022_icm_f as clean_pdf_text  # 清洗规则统一在 profiles.py, 原来的逐条实现留在 bench_clean.py 作对照
 '''
 奖项定义: 2020-2025 正常读取
 
@@ -87,91 +90,48 @@ def normalize_award(word: str):
     else:
         return None
     
-def clean_pdf_text(text: str) -> str:
-    import re
-
-    # 1️⃣ 清理乱码字符
-    text = text.replace("\x00", "")
-    text = re.sub(r"[\u4E00-\u9FFF\uE000-\uF8FF]", "", text)
-    for ws in ["\u00A0", "\u202F", "\u3000", "\xa0"]:
-        text = text.replace(ws, " ")
-
-    # 2️⃣ 全角转半角
-    def to_halfwidth(s: str):
-        res = []
-        for ch in s:
-            code = ord(ch)
-            if code == 0x3000:
-                res.append(' ')
-            elif 0xFF01 <= code <= 0xFF5E:
-                res.append(chr(code - 0xFEE0))
-            else:
-                res.append(ch)
-        return ''.join(res)
-    text = to_halfwidth(text)
-
-    # 3️⃣ 去掉字母组之间的逗号（更宽松匹配：只要是字母间的逗号或空格都删掉）
-    text = re.sub(r'(?<=[A-Za-z])[,\s]+(?=[A-Za-z])', '', text)
-
-    # 有时会出现 " , " → " "
-    text = text.replace(', ', ' ')
-    # 多余空格合并
-    text = re.sub(r'\s+', ' ', text)
-
-    # 4️⃣ 修正断词（根据常见错误）
-    replacements = {
-        "Honorab le": "Honorable",
-        "Honora ble": "Honorable",
-        "Merit orious": "Meritorious",
-        "Suc cessful": "Successful",
-        "Parti cipant": "Participant",
-        "Re sults": "Results",
-        "Univ ersity": "University",
-        "Informa tion": "Information",
-        "Tech nology": "Technology",
-    }
-    for k, v in replacements.items():
-        text = text.replace(k, v)
-
-    return text.strip()
-
 # -----------------------------------
 # PDF 解析函数
 # -----------------------------------
 def extract_designations(pdf_path: str):
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for i, page in enumerate(reader.pages[1:], start=2):
-                raw_text = page.extract_text() or ""
-                text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
-                # print(text)
-                for m in award_pat.finditer(text):
-                    award_full = normalize_award(m.group(0))
-                    if award_full:
-                        designations.append(award_full)
-                        # print(f"[匹配成功] → {award_full}")
+        for i, raw_text in iter_page_texts(pdf_path):
+            t = timing.start()
+            text = clean_pdf_text(raw_text)  # 🧹 清洗关键步骤
+            t = timing.lap("clean", t, pdf_path, i)
+            # print(text)
+            for m in award_pat.finditer(text):
+                award_full = normalize_award(m.group(0))
+                if award_full:
+                    designations.append(award_full)
+                    # print(f"[匹配成功] → {award_full}")
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
 
-def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str):
+def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str, split_pages: bool = True):
     """处理单个PDF并返回统计结果"""
-    designations = extract_designations(pdf_path)
-    if not designations:
+    if split_pages:
+        # 按页段并行, 结果与 extract_designations 逐页统计一致
+        counter = count_pdf_by_pages(pdf_path, award_pat, clean_pdf_text, normalize_award)
+    else:
+        counter = Counter(extract_designations(pdf_path))
+    if not counter:
         print(f"[警告] 未提取到任何奖项：{pdf_path}")
         return []
 
-    counter = Counter(designations)
-
     # 打印统计
+    t = timing.start()
     print(f"\n=== {pdf_path} ({contest_type}) 统计结果 ===")
     print(f"{'Award':<20}  {'Count':>5}")
     print("-" * 30)
     for aw in AWARDS:
         print(f"{aw:<20}  {counter.get(aw, 0):>5}")
     print("-" * 30)
+    timing.lap("print", t, pdf_path)
 
     # 拼接结果行
     result_rows = []
@@ -220,16 +180,12 @@ def main():
         print("\n未提取到任何奖项，请检查 PDF 文件内容")
         sys.exit(1)
 
-    # 输出 CSV 文件（追加模式）
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
     csv_name = "MCM-ICM-Results.csv"
-    file_exists = os.path.exists(csv_name)
-    with open(csv_name, "a", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.report("count2022-F")
 
 # -----------------------------------
 if __name__ == "__main__":
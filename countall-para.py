@@ -1,10 +1,13 @@
 import re
 import sys
-import csv
-from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
+from awardcount import matcher_for, N_SLOTS
 import os
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from pagesplit import submit_pdf_ranges, merge_range_futures
+from manifest import discover_pdfs
+from results_store import save_results
+import timing
 
 # -----------------------------------
 # 奖项定义
@@ -37,32 +40,36 @@ award_pat = re.compile('|'.join(
 ), re.I)
 
 # -----------------------------------
-def extract_designations(pdf_path: str):
-    """读取 PDF 并提取奖项关键字"""
-    designations = []
+def count_designations(pdf_path: str):
+    """读取 PDF 并统计奖项关键字(计数核心见 awardcount.py)"""
+    matcher = matcher_for(award_pat)
+    counts = [0] * N_SLOTS
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages[1:]:  # 跳过第一页封面
-                text = page.extract_text() or ""
-                for m in award_pat.finditer(text):
-                    designations.append(m.group(0))
+        for i, text in iter_page_texts(pdf_path):  # 跳过第一页封面
+            t = timing.start()
+            matcher.count(text, counts)
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 读取失败: {pdf_path} - {e}")
-    return designations
+    return matcher.to_counter(counts)
 
 # -----------------------------------
 def process_pdf_worker(year, problem, pdf_path, contest_type):
     """工作进程：处理单个 PDF"""
-    designations = extract_designations(pdf_path)
-    if not designations:
+    counter = count_designations(pdf_path)
+    timing.flush()  # 工作进程退出时不会执行 atexit, 每个任务结束就写出计时数据
+    if not counter:
         return year, problem, contest_type, None  # None 表示无提取
 
-    counter = Counter(designations)
+    return year, problem, contest_type, counter_rows(year, problem, contest_type, counter)
+
+def counter_rows(year, problem, contest_type, counter):
+    """把统计结果拼接为 CSV 行"""
     rows = []
     for aw in AWARDS:
         rows.append([year, problem, contest_type, AWARD_SHORT[aw], counter.get(aw, 0)])
-    return year, problem, contest_type, rows
+    return rows
 
 # -----------------------------------
 def main():
@@ -71,18 +78,21 @@ def main():
     base_dir = "Contest_PDFs"
     problems_mcm = ["A", "B", "C"]
     problems_icm = ["D", "E", "F"]
+    # True: 每个 PDF 再按页段拆分, 所有页段共用一个进程池(大文件不再独占一个核心)
+    split_pages = True
 
     tasks = []
 
-    # 组装任务列表
+    # 组装任务列表(本地文件从 manifest 查找)
+    available = discover_pdfs(base_dir)
     for year in range(start_year, end_year + 1):
         for prob in problems_mcm:
-            pdf_path = os.path.join(base_dir, "MCM", f"{year}_MCM_Problem_{prob}_Results.pdf")
-            if os.path.exists(pdf_path):
+            pdf_path = available.get((year, "MCM", prob))
+            if pdf_path is not None:
                 tasks.append((year, prob, pdf_path, "MCM"))
         for prob in problems_icm:
-            pdf_path = os.path.join(base_dir, "ICM", f"{year}_ICM_Problem_{prob}_Results.pdf")
-            if os.path.exists(pdf_path):
+            pdf_path = available.get((year, "ICM", prob))
+            if pdf_path is not None:
                 tasks.append((year, prob, pdf_path, "ICM"))
 
     if not tasks:
@@ -96,31 +106,49 @@ def main():
     print(f"\n🚀 使用并行处理（进程数：{max_workers}）...")
 
     with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(process_pdf_worker, *task): task for task in tasks}
-        for fut in as_completed(futures):
-            year, prob, _, _ = futures[fut]
-            try:
-                result = fut.result()
-                if result[3] is None:
+        if split_pages:
+            # 先全部提交, 再按任务顺序合并, 结果与逐文件处理一致
+            pending = [
+                (task, submit_pdf_ranges(executor, task[2], award_pat, parts=max_workers))
+                for task in tasks
+            ]
+            for (year, prob, _, contest_type), futures in pending:
+                try:
+                    counter = merge_range_futures(futures)
+                except Exception as e:
+                    print(f"[错误] 处理失败 {year}-Problem {prob}: {e}")
+                    continue
+                if not counter:
                     print(f"[警告] 未提取到奖项: {year}-Problem {prob}")
                     continue
-                all_results.extend(result[3])
+                all_results.extend(counter_rows(year, prob, contest_type, counter))
                 print(f"[完成] {year}-Problem {prob}")
-            except Exception as e:
-                print(f"[错误] 处理失败 {year}-Problem {prob}: {e}")
+        else:
+            futures = {executor.submit(process_pdf_worker, *task): task for task in tasks}
+            for fut in as_completed(futures):
+                year, prob, _, _ = futures[fut]
+                try:
+                    result = fut.result()
+                    if result[3] is None:
+                        print(f"[警告] 未提取到奖项: {year}-Problem {prob}")
+                        continue
+                    all_results.extend(result[3])
+                    print(f"[完成] {year}-Problem {prob}")
+                except Exception as e:
+                    print(f"[错误] 处理失败 {year}-Problem {prob}: {e}")
 
     if not all_results:
         print("\n❌ 未提取到任何奖项")
         sys.exit(1)
 
-    # 输出 CSV
-    csv_name = f"{start_year}-{end_year}-MCM-ICM-Results.csv"
-    with open(csv_name, "w", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
+    t = timing.start()
+    csv_name = "MCM-ICM-Results.csv"
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.lap("print", t)
+    timing.report("countall-para")
 
 # -----------------------------------
 if __name__ == "__main__":
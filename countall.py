@@ -0,0 +1,103 @@
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pagesplit import submit_pdf_ranges, merge_range_futures
+from profiles import AWARDS, AWARD_SHORT, lookup
+from manifest import discover_pdfs, pdf_path_for
+from results_store import save_results
+import timing
+'''
+一次并行处理 2016-2025 全部 PDF:
+每个 (年份, 赛别, 题号) 从 profiles 注册表取对应的清洗/匹配规则,
+所有 PDF 的页段提交到同一个进程池, 结果写入 results_store 并导出完整的 MCM-ICM-Results.csv
+
+替代原来依次运行 count2016-2018.py / count2018-D.py / count2019.py /
+count2022-F.py / countall2020-2025.py 的流程
+'''
+
+CONTESTS = {
+    "MCM": ["A", "B", "C"],
+    "ICM": ["D", "E", "F"],
+}
+
+
+def build_tasks(start_year: int, end_year: int, contests=CONTESTS, base_dir: str = "Contest_PDFs"):
+    """组装任务列表 [(年份, 题号, 路径, 赛别), ...], 顺序即 CSV 行顺序; 本地文件从 manifest 查找"""
+    available = discover_pdfs(base_dir)
+    tasks = []
+    for year in range(start_year, end_year + 1):
+        for contest_type, problems in contests.items():
+            for prob in problems:
+                pdf_path = available.get((year, contest_type, prob))
+                if pdf_path is None:
+                    print(f"[错误] 文件不存在：{pdf_path_for(year, contest_type, prob, base_dir)}")
+                    continue
+                tasks.append((year, prob, pdf_path, contest_type))
+    return tasks
+
+
+def counter_rows(year, problem, contest_type, counter):
+    """把统计结果拼接为 CSV 行"""
+    rows = []
+    for aw in AWARDS:
+        rows.append([year, problem, contest_type, AWARD_SHORT[aw], counter.get(aw, 0)])
+    return rows
+
+
+def run_tasks(tasks, max_workers=None):
+    """并行统计所有任务, 按任务顺序返回结果行"""
+    max_workers = max_workers or os.cpu_count() or 4
+    all_results = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # 先全部提交, 大文件的页段与小文件交错执行
+        pending = []
+        for task in tasks:
+            year, prob, pdf_path, contest_type = task
+            profile = lookup(year, contest_type, prob)
+            futures = submit_pdf_ranges(executor, pdf_path, profile.award_pat,
+                                        profile.clean, profile.normalize, parts=max_workers)
+            pending.append((task, profile, futures))
+
+        for (year, prob, _, contest_type), profile, futures in pending:
+            try:
+                counter = merge_range_futures(futures)
+            except Exception as e:
+                print(f"[错误] 处理失败 {year}-{contest_type}-Problem {prob}: {e}")
+                continue
+            if not counter:
+                print(f"[警告] 未提取到奖项: {year}-{contest_type}-Problem {prob}")
+                continue
+            all_results.extend(counter_rows(year, prob, contest_type, counter))
+            print(f"[完成] {year}-{contest_type}-Problem {prob} (规则: {profile.name})")
+    return all_results
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    start_year = 2016
+    end_year = 2025
+
+    tasks = build_tasks(start_year, end_year)
+    if not tasks:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+
+    print(f"\n🚀 使用并行处理（进程数：{os.cpu_count() or 4}）...")
+    all_results = run_tasks(tasks)
+
+    if not all_results:
+        print("\n❌ 未提取到任何奖项")
+        sys.exit(1)
+
+    t = timing.start()
+    csv_name = "MCM-ICM-Results.csv"
+    save_results(all_results, csv_name=csv_name)
+    print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.lap("print", t)
+    timing.report("countall")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 import re
 import sys
-import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
+from results_store import save_results
+import timing
 '''
 奖项定义: 2020-2025 正常读取(MCM-ABC,ICM-DEF)
 
@@ -68,13 +69,13 @@ def extract_designations(pdf_path: str):
     """返回所有奖项关键字出现次数列表"""
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages[1:]:  # 通常第一页是封面，从第二页开始
-                text = page.extract_text() or ""
-                # print(text)
-                for m in award_pat.finditer(text):
-                    designations.append(m.group(0))
+        for i, text in iter_page_texts(pdf_path):  # 通常第一页是封面，从第二页开始
+            t = timing.start()
+            # print(text)
+            for m in award_pat.finditer(text):
+                designations.append(m.group(0))
+            timing.lap("match", t, pdf_path, i)
+            timing.count("pages")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
@@ -90,12 +91,14 @@ def process_pdf(year: int, problem: str, pdf_path: str, contest_type: str):
     counter = Counter(designations)
 
     # 打印统计
+    t = timing.start()
     print(f"\n=== {pdf_path} ({contest_type}) 统计结果 ===")
     print(f"{'Award':<20}  {'Count':>5}")
     print("-" * 30)
     for aw in AWARDS:
         print(f"{aw:<20}  {counter.get(aw, 0):>5}")
     print("-" * 30)
+    timing.lap("print", t, pdf_path)
 
     # 拼接结果行
     result_rows = []
@@ -146,14 +149,12 @@ def main():
         print("\n未提取到任何奖项，请检查 PDF 文件内容")
         sys.exit(1)
 
-    # 输出 CSV 文件
+    # 写入结果库(重复运行只覆盖本次统计的行), 再导出完整 CSV
     csv_name = "MCM-ICM-Results.csv"
-    with open(csv_name, "a", newline='', encoding="utf-8-sig") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Year", "Problem", "Type", "Award", "Count"])
-        writer.writerows(all_results)
+    save_results(all_results, csv_name=csv_name)
 
     print(f"\n🎯 所有年份数据已写入文件：{csv_name}")
+    timing.report("countall2020-2025")
 
 # -----------------------------------
 if __name__ == "__main__":
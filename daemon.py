@@ -0,0 +1,315 @@
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import socketserver
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pagecache import (AUTO, EXTRACTORS, current_extractor, pdf_sha256, page_count, open_pdf, _extract_page,
+                       load_page, store_page, iter_selected_pages)
+from pagesplit import FIRST_PAGE
+from extractors import CHAIN, count_checked, describe_fallback
+from awardcount import matcher_for, N_SLOTS
+from profiles import AWARDS, lookup
+from manifest import pdf_path_for
+from client import SOCKET_PATH
+'''
+常驻提取服务:
+调试时反复运行 countall-para.py / 各年份脚本, 大部分时间花在启动解释器、导入 PyPDF2、
+创建进程池和重新打开同一批 PDF 上, 真正的统计只占一小部分
+这里起一个常驻进程, 启动时预先创建好工作进程; 最近用过的 PdfReader 和页面文本放在
+按内存上限淘汰的 LRU 里, client.py 通过 Unix 套接字提交 count / dump 任务
+同一批 PDF 的重复查询全部命中内存, 几毫秒返回
+
+- 未命中的页: 先查页面缓存(.page_cache), 仍没有的少量页在本进程用缓存的 PdfReader 提取,
+  达到 PARALLEL_PAGES 页时分段交给预热的工作进程(工作进程经 xref 状态打开 PDF, 见 pdfmap.py)
+- 工作进程意外退出(内存不足、PyPDF2 内部崩溃)会让整个进程池失效: 重建进程池后重试一次,
+  仍然失败时本次请求报错, 服务继续运行
+- 内存上限 COMAP_DAEMON_MB(默认 512): 页面文本按字符串实际占用计, PdfReader 按 PDF 文件大小估算;
+  淘汰 PdfReader 时关闭其映射
+- 计数规则与 countall.py 相同(profiles 注册表), COMAP_EXTRACTOR / 请求里的 extractor 选择提取器
+
+用法: python daemon.py [PDF 路径 ...]    给出的 PDF 启动时预先载入
+'''
+
+MEMORY_MB = int(os.environ.get("COMAP_DAEMON_MB", "512"))
+PARALLEL_PAGES = 32  # 未命中的页达到该数量时交给工作进程
+
+
+class MemoryLRU:
+    """按估算字节数限制总量的 LRU; 淘汰条目时调用 on_evict(键, 值)"""
+
+    def __init__(self, cap_bytes: int, on_evict=None):
+        self.cap = cap_bytes
+        self.items = OrderedDict()  # 键 -> (值, 字节数)
+        self.size = 0
+        self.on_evict = on_evict
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        entry = self.items.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size: int):
+        old = self.items.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        self.items[key] = (value, size)
+        self.size += size
+        while self.size > self.cap and len(self.items) > 1:
+            old_key, (old_value, old_size) = self.items.popitem(last=False)
+            self.size -= old_size
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(old_key, old_value)
+
+
+def _warm(_):
+    """让进程池把工作进程全部创建出来(fork 时 PyPDF2 等模块已导入); 稍作停留, 每个任务落到不同的进程"""
+    time.sleep(0.1)
+    return os.getpid()
+
+
+def _worker_pages(pdf_path: str, indices, extractor: str):
+    """工作进程: 提取若干页, 返回 {页下标: 原始文本}"""
+    return dict(iter_selected_pages(pdf_path, indices, extractor))
+
+
+class Service:
+    def __init__(self, max_workers: int = None, cap_bytes: int = MEMORY_MB << 20):
+        self.max_workers = max_workers or os.cpu_count() or 4
+        self.lock = threading.Lock()  # 保护缓存; PdfReader 不是线程安全的, 本进程内的提取也在锁内进行
+        self.cache = MemoryLRU(cap_bytes, self._evict)
+        self.pool_lock = threading.Lock()  # 保护进程池的重建
+        self.started = time.time()
+        self.jobs = 0
+        self.pool_restarts = 0
+        self._start_pool()
+
+    def _start_pool(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.worker_pids = sorted(set(self.executor.map(_warm, range(self.max_workers))))
+
+    def _restart_pool(self, broken):
+        """进程池失效后重建; 多个线程同时发现时只重建一次"""
+        with self.pool_lock:
+            if self.executor is not broken:
+                return
+            broken.shutdown(wait=False)
+            self._start_pool()
+            self.pool_restarts += 1
+
+    @staticmethod
+    def _evict(key, value):
+        if key[0] == "reader":
+            value[0].close()
+
+    def _reader(self, pdf_path: str, digest: str, extractor: str):
+        """缓存的 (MappedPdf, PdfReader, 逐页提取函数); 调用方持有 self.lock"""
+        key = ("reader", digest, extractor)
+        entry = self.cache.get(key)
+        if entry is None:
+            pdf, reader = open_pdf(pdf_path, digest)
+            entry = (pdf, reader, EXTRACTORS[extractor][1](reader))
+            self.cache.put(key, entry, os.path.getsize(pdf_path))
+        return entry
+
+    def _fetch_local(self, pdf_path: str, digest: str, indices, extractor: str) -> dict:
+        version = EXTRACTORS[extractor][0]
+        texts = {}
+        with self.lock:
+            for i in indices:
+                text = load_page(digest, i, version)
+                if text is None:
+                    _, reader, extract = self._reader(pdf_path, digest, extractor)
+                    if i >= len(reader.pages):
+                        break
+                    text = _extract_page(reader, i, extract)
+                    store_page(digest, i, text, version)
+                texts[i] = text
+                self.cache.put(("page", digest, version, i), text, sys.getsizeof(text))
+        return texts
+
+    def _fetch_parallel(self, pdf_path: str, digest: str, indices, extractor: str) -> dict:
+        version = EXTRACTORS[extractor][0]
+        step = -(-len(indices) // self.max_workers)
+        for attempt in range(2):
+            executor = self.executor
+            try:
+                futures = [executor.submit(_worker_pages, pdf_path, indices[k:k + step], extractor)
+                           for k in range(0, len(indices), step)]
+                texts = {}
+                for fut in futures:
+                    texts.update(fut.result())
+                break
+            except BrokenProcessPool:
+                self._restart_pool(executor)
+                if attempt:
+                    raise RuntimeError(f"工作进程连续两次意外退出: {pdf_path}") from None
+        with self.lock:
+            for i, text in texts.items():
+                self.cache.put(("page", digest, version, i), text, sys.getsizeof(text))
+        return texts
+
+    def iter_pages(self, pdf_path: str, indices, extractor: str = None):
+        """逐页产出 (页下标, 原始文本), 接口与 pagecache.iter_selected_pages 相同"""
+        extractor = extractor or current_extractor()
+        version = EXTRACTORS[extractor][0]
+        digest = pdf_sha256(pdf_path)
+        indices = list(indices)
+        with self.lock:
+            texts = {i: self.cache.get(("page", digest, version, i)) for i in indices}
+        missing = [i for i in indices if texts[i] is None]
+        if missing:
+            if len(missing) >= PARALLEL_PAGES and self.max_workers > 1:
+                texts.update(self._fetch_parallel(pdf_path, digest, missing, extractor))
+            else:
+                texts.update(self._fetch_local(pdf_path, digest, missing, extractor))
+        for i in indices:
+            if texts.get(i) is not None:
+                yield i, texts[i]
+
+    # -----------------------------------
+    # 任务
+    # -----------------------------------
+    def count(self, pdf_path: str, year: int, contest_type: str, problem: str, extractor: str = None) -> dict:
+        profile = lookup(year, contest_type, problem)
+        matcher = matcher_for(profile.award_pat, profile.normalize)
+        n_pages = page_count(pdf_path)
+        extractor = extractor or os.environ.get("COMAP_EXTRACTOR") or current_extractor()
+        note = ""
+        if extractor == AUTO:
+            counts, used, inconsistent = count_checked(pdf_path, FIRST_PAGE, n_pages, matcher, profile.clean,
+                                                       CHAIN, pages=self.iter_pages)
+            note = describe_fallback(pdf_path, FIRST_PAGE, n_pages, used, inconsistent)
+        else:
+            if extractor not in EXTRACTORS:
+                raise ValueError(f"未知的提取器: {extractor}（可选: {', '.join(EXTRACTORS)}, {AUTO}）")
+            counts = [0] * N_SLOTS
+            for _, text in self.iter_pages(pdf_path, range(FIRST_PAGE, n_pages), extractor):
+                matcher.count(text if profile.clean is None else profile.clean(text), counts)
+        counter = matcher.to_counter(counts)
+        return {"pdf": pdf_path, "profile": profile.name, "counts": [[aw, counter.get(aw, 0)] for aw in AWARDS],
+                "note": note}
+
+    def dump(self, pdf_path: str, year: int, contest_type: str, problem: str, start: int = FIRST_PAGE,
+             stop: int = None) -> dict:
+        profile = lookup(year, contest_type, problem)
+        n_pages = page_count(pdf_path)
+        stop = n_pages if stop is None else min(stop, n_pages)
+        pages = []
+        for i, raw_text in self.iter_pages(pdf_path, range(max(start, 0), stop)):
+            pages.append([i, raw_text, raw_text if profile.clean is None else profile.clean(raw_text)])
+        return {"pdf": pdf_path, "profile": profile.name, "pages": pages}
+
+    def stats(self) -> dict:
+        with self.lock:
+            kinds = {}
+            for key in self.cache.items:
+                kinds[key[0]] = kinds.get(key[0], 0) + 1
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "jobs": self.jobs,
+                "workers": self.worker_pids,
+                "pool_restarts": self.pool_restarts,
+                "cache_mb": round(self.cache.size / (1 << 20), 2),
+                "cap_mb": round(self.cache.cap / (1 << 20), 2),
+                "entries": kinds,
+                "hits": self.cache.hits,
+                "misses": self.cache.misses,
+                "evictions": self.cache.evictions,
+            }
+
+    def handle(self, req: dict) -> dict:
+        op = req.get("op")
+        if op == "stats":
+            return {"stats": self.stats()}
+        if op not in ("count", "dump"):
+            raise ValueError(f"未知的请求: {op}")
+        year, contest_type, problem = int(req["year"]), req["type"], req["problem"]
+        pdf_path = req.get("pdf") or pdf_path_for(year, contest_type, problem)
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"文件不存在：{pdf_path}")
+        self.jobs += 1
+        if op == "count":
+            return self.count(pdf_path, year, contest_type, problem, req.get("extractor"))
+        return self.dump(pdf_path, year, contest_type, problem, req.get("start", FIRST_PAGE), req.get("stop"))
+
+    def close(self):
+        self.executor.shutdown()
+        with self.lock:
+            for key, (value, _) in self.cache.items.items():
+                self._evict(key, value)
+            self.cache.items.clear()
+
+
+# -----------------------------------
+# 套接字服务
+# -----------------------------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            req = json.loads(line)
+            if req.get("op") == "stop":
+                response = {"ok": True}
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                response = {"ok": True, **self.server.service.handle(req)}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _socket_in_use(path: str) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(path: str = SOCKET_PATH, preload=(), max_workers: int = None):
+    if os.path.exists(path):
+        if _socket_in_use(path):
+            print(f"[错误] 常驻服务已在运行: {path}")
+            sys.exit(1)
+        os.unlink(path)  # 上次异常退出留下的套接字文件
+
+    t0 = time.perf_counter()
+    service = Service(max_workers)
+    for pdf_path in preload:
+        list(service.iter_pages(pdf_path, range(FIRST_PAGE, page_count(pdf_path))))
+    server = _Server(path, _Handler)
+    server.service = service
+    print(f"🚀 常驻服务已启动: {path}（工作进程 {service.max_workers} 个, 内存上限 {MEMORY_MB} MB, "
+          f"预载 {len(preload)} 个 PDF, 用时 {time.perf_counter() - t0:.1f} 秒）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        if os.path.exists(path):
+            os.unlink(path)
+    print("[完成] 常驻服务已关闭")
+
+# -----------------------------------
+if __name__ == "__main__":
+    serve(preload=sys.argv[1:])
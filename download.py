@@ -2,8 +2,15 @@
 # -*- coding: utf-8 -*-
 
 import os
+import json
+import hashlib
+import threading
 import requests
-from time import sleep
+from time import sleep, perf_counter
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from manifest import load_manifest, save_manifest, entry_key, make_entry, local_copy_valid, file_sha256
 
 '''
 以下文件格式不统一，需要单独下载:
@@ -57,20 +64,381 @@ def download_contest_pdfs(start_year=2022, end_year=2022):
                 save_path = os.path.join(save_dir, filename)
 
                 print(f"正在下载: {url}")
+                part_path = save_path + ".part"
                 try:
-                    response = requests.get(url, timeout=20)
-                    # 判断返回内容是否为 PDF
-                    if response.status_code == 200 and response.content.startswith(b"%PDF"):
-                        with open(save_path, "wb") as f:
-                            f.write(response.content)
+                    with requests.get(url, timeout=20, stream=True) as response:
+                        error = "文件不存在或不是 PDF"
+                        if response.status_code == 200:
+                            # 分块写临时文件, 检查通过后再原子替换
+                            write_stream(response, part_path)
+                            error = pdf_structure_problem(part_path)
+                    if error is None:
+                        os.replace(part_path, save_path)
                         print(f"✅ 已保存: {save_path}")
                     else:
-                        print(f"⚠️ 文件不存在或不是 PDF: {url} (状态码: {response.status_code})")
+                        print(f"⚠️ {error}: {url} (状态码: {response.status_code})")
                 except requests.RequestException as e:
                     print(f"❌ 下载失败: {url}\n错误信息: {e}")
+                finally:
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
                 sleep(0.1)  # 避免请求过快
     
     print("\n🎯 所有年份题目文件下载完成！")
 
+
+BASE_URLS = {
+    "MCM": "https://www.contest.comap.com/undergraduate/contests/mcm/contests/{year}/results/{year}_MCM_Problem_{problem}_results.pdf",
+    "ICM": "https://www.contest.comap.com/undergraduate/contests/mcm/contests/{year}/results/{year}_ICM%20Problem_{problem}_Results.pdf"
+} # 2022
+
+PROBLEMS = {
+    "MCM": ["A", "B", "C"],
+    "ICM": ["D", "E", "F"]
+}
+
+
+def iter_targets(start_year, end_year, contest_types=PROBLEMS, save_root="Contest_PDFs", problems=PROBLEMS):
+    """产出 (年份, 赛别, 题号, 保存路径); 本地文件名统一为默认写法; problems 可只选部分题号"""
+    for contest_type in contest_types:
+        if not problems.get(contest_type):
+            continue
+        save_dir = os.path.join(save_root, contest_type)
+        os.makedirs(save_dir, exist_ok=True)
+        for year in range(start_year, end_year + 1):
+            for problem in problems[contest_type]:
+                filename = f"{year}_{contest_type}_Problem_{problem}_Results.pdf"
+                yield year, contest_type, problem, os.path.join(save_dir, filename)
+
+
+def iter_jobs(start_year, end_year, base_urls=BASE_URLS, save_root="Contest_PDFs", problems=PROBLEMS):
+    """产出 (赛别, 下载地址, 保存路径)"""
+    for year, contest_type, problem, save_path in iter_targets(start_year, end_year, base_urls, save_root, problems):
+        url = base_urls[contest_type].format(year=year, problem=problem)
+        yield contest_type, url, save_path
+
+
+# -----------------------------------
+# 地址探测: 文件名写法不统一(见文件头), 对所有已知写法并发发 HEAD 请求,
+# 命中的地址记入 Contest_PDFs/url_map.json, 以后直接使用, 不再手工改 base_urls
+# -----------------------------------
+URL_ROOT = "https://www.contest.comap.com/undergraduate/contests/mcm/contests/{year}/results/"
+# 命中多个时取靠前的
+URL_VARIANTS = [
+    "{year}_{type}_Problem_{problem}_Results.pdf",    # default
+    "{year}_{type}%20Problem_{problem}_Results.pdf",  # 2021/2022 ICM
+    "{year}_{type}_Problem_{problem}_results.pdf",    # 2022 MCM
+    "{year}-{type}_Problem-{problem}-Results.pdf",    # 2016 ICM
+]
+URL_MAP_NAME = "url_map.json"
+
+
+def url_key(year: int, contest_type: str, problem: str) -> str:
+    return f"{year}/{contest_type}/{problem}"
+
+
+def load_url_map(save_root: str = "Contest_PDFs") -> dict:
+    """读取 {"年份/赛别/题号": 地址}, 不存在或损坏时返回空字典"""
+    try:
+        with open(os.path.join(save_root, URL_MAP_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_url_map(url_map: dict, save_root: str = "Contest_PDFs"):
+    """原子写入地址表"""
+    os.makedirs(save_root, exist_ok=True)
+    path = os.path.join(save_root, URL_MAP_NAME)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(url_map, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def probe_url(session, limiter, url: str, timeout=10) -> bool:
+    """HEAD 请求判断文件是否存在, 不下载正文"""
+    try:
+        with limiter(url):
+            response = session.head(url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException:
+        return False
+    return response.status_code == 200 and "html" not in response.headers.get("Content-Type", "")
+
+
+def resolve_urls(session, limiter, executor, targets, url_map: dict,
+                 url_root=URL_ROOT, variants=URL_VARIANTS) -> dict:
+    """
+    为 targets [(年份, 赛别, 题号), ...] 中地址表里还没有的项探测地址, 结果写回 url_map
+    所有候选地址的 HEAD 请求一次性提交到线程池
+    """
+    probes = []
+    for year, contest_type, problem in targets:
+        key = url_key(year, contest_type, problem)
+        if key in url_map:
+            continue
+        candidates = [url_root.format(year=year) + v.format(year=year, type=contest_type, problem=problem)
+                      for v in variants]
+        futures = [executor.submit(probe_url, session, limiter, url) for url in candidates]
+        probes.append((key, candidates, futures))
+
+    for key, candidates, futures in probes:
+        found = [url for url, fut in zip(candidates, futures) if fut.result()]
+        if found:
+            url_map[key] = found[0]
+            print(f"🔍 {key}: {found[0].rsplit('/', 1)[-1]}")
+        else:
+            print(f"⚠️ 未找到可用地址: {key}")
+    return url_map
+
+
+# -----------------------------------
+# 并发下载
+# -----------------------------------
+class HostLimiter:
+    """按主机限制同时进行的请求数"""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._lock = threading.Lock()
+        self._sems = {}
+
+    def __call__(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            sem = self._sems.get(host)
+            if sem is None:
+                sem = self._sems[host] = threading.BoundedSemaphore(self.per_host)
+        return sem
+
+
+def make_session(pool_size: int) -> requests.Session:
+    """所有线程共用一个会话, 连接池大小与线程数一致, 复用 TCP/TLS 连接"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+CHUNK_SIZE = 1 << 16
+TRAILER_SIZE = 2048
+
+
+def write_stream(response, part_path: str, mode: str = "wb", hasher=None) -> int:
+    """把响应正文分块写入临时文件(内存占用与文件大小无关), 同时更新哈希, 返回写入字节数"""
+    written = 0
+    with open(part_path, mode) as f:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            f.write(chunk)
+            if hasher is not None:
+                hasher.update(chunk)
+            written += len(chunk)
+    return written
+
+
+def pdf_structure_problem(path: str):
+    """
+    廉价的结构检查: 文件头 %PDF, 末尾有 startxref 和 %%EOF
+    截断的文件过不了这一关, 不会混进统计进程池里才在 PdfReader 中报错; 通过时返回 None
+    """
+    with open(path, "rb") as f:
+        if f.read(4) != b"%PDF":
+            return "文件不存在或不是 PDF"
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - TRAILER_SIZE))
+        tail = f.read()
+    if b"%%EOF" not in tail or b"startxref" not in tail[:tail.rfind(b"%%EOF")]:
+        return "PDF 文件不完整(缺少 startxref / %%EOF)"
+    return None
+
+
+def _request_headers(url: str, part_path: str, entry):
+    """
+    构造请求头, 返回 (请求头, 续传起点)
+    - 本地已有完整文件: 用清单里的 ETag / Last-Modified 做条件请求, 未变化时服务器只回 304
+    - 有上次中断留下的 .part 文件: 用 Range 续传, If-Range 保证服务器文件未变
+    """
+    if entry and entry.get("url") == url and local_copy_valid(entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers, 0
+
+    try:
+        offset = os.path.getsize(part_path)
+        with open(part_path + ".json", encoding="utf-8") as f:
+            part_info = json.load(f)
+    except (OSError, ValueError):
+        return {}, 0
+    validator = part_info.get("etag") or part_info.get("last_modified")
+    if not offset or part_info.get("url") != url or not validator:
+        return {}, 0
+    return {"Range": f"bytes={offset}-", "If-Range": validator}, offset
+
+
+def fetch_pdf(session, limiter, url: str, save_path: str, entry=None, timeout=20):
+    """
+    下载单个文件, 返回 (状态, 本次写入字节数, 耗时秒, 提示信息, 清单记录)
+    状态: "saved" 已保存 / "unchanged" 服务器返回 304, 本地文件不动 / "failed"
+    """
+    t0 = perf_counter()
+    part_path = save_path + ".part"
+    headers, offset = _request_headers(url, part_path, entry)
+    written = 0
+    part_complete = None
+    try:
+        with limiter(url), session.get(url, headers=headers, timeout=timeout, stream=True) as response:
+            if response.status_code == 304:
+                return "unchanged", 0, perf_counter() - t0, f"⏭️ 未变化: {save_path}", entry
+            if response.status_code == 416 and offset:
+                # 从 .part 末尾续传的 Range 无法满足: 多半是上次已经收完、在改名前中断了; 出了 with 再处理
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                part_complete = not total.isdigit() or int(total) == offset
+            else:
+                if response.status_code == 206 and offset:
+                    mode = "ab"
+                elif response.status_code == 200:
+                    mode, offset = "wb", 0
+                    # 记录本次下载的校验信息, 中断后续传时用于 If-Range
+                    with open(part_path + ".json", "w", encoding="utf-8") as f:
+                        json.dump({"url": url,
+                                   "etag": response.headers.get("ETag"),
+                                   "last_modified": response.headers.get("Last-Modified")}, f)
+                else:
+                    return ("failed", 0, perf_counter() - t0,
+                            f"⚠️ 文件不存在或不是 PDF: {url} (状态码: {response.status_code})", None)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                # 续传时先把已有部分过一遍哈希, 之后边收边算
+                hasher = hashlib.sha256()
+                if mode == "ab":
+                    with open(part_path, "rb") as f:
+                        for chunk in iter(lambda: f.read(1 << 20), b""):
+                            hasher.update(chunk)
+                written = write_stream(response, part_path, mode, hasher)
+                expected = response.headers.get("Content-Length")
+                if expected and not response.headers.get("Content-Encoding") and written != int(expected):
+                    # 连接提前断开: 保留 .part, 下次运行续传
+                    return ("failed", written, perf_counter() - t0,
+                            f"❌ 下载不完整: {url} ({written}/{expected} 字节)", None)
+    except requests.RequestException as e:
+        # 已下载的部分保留在 .part 中, 下次运行续传
+        return "failed", written, perf_counter() - t0, f"❌ 下载失败: {url}\n错误信息: {e}", None
+    elapsed = perf_counter() - t0
+
+    if part_complete is not None:
+        return _settle_complete_part(session, limiter, url, save_path, part_complete, t0, timeout)
+
+    error = pdf_structure_problem(part_path)
+    if error:
+        os.remove(part_path)
+        os.remove(part_path + ".json")
+        return "failed", 0, elapsed, f"⚠️ {error}: {url} (状态码: {response.status_code})", None
+
+    os.replace(part_path, save_path)
+    os.remove(part_path + ".json")
+    size = os.path.getsize(save_path)
+    new_entry = make_entry(url, save_path, size, hasher.hexdigest(), etag, last_modified)
+    resumed = f", 续传自 {offset / 1024:.0f} KB" if offset else ""
+    return "saved", written, elapsed, f"✅ 已保存: {save_path}{resumed}", new_entry
+
+
+def _settle_complete_part(session, limiter, url: str, save_path: str, size_matches: bool, t0: float, timeout):
+    """
+    续传得到 416 时: 大小与服务器一致且结构检查通过的 .part 直接转正;
+    否则删掉 .part 和 .part.json, 不带 Range 重新下载一次
+    """
+    part_path = save_path + ".part"
+    if size_matches and pdf_structure_problem(part_path) is None:
+        with open(part_path + ".json", encoding="utf-8") as f:
+            part_info = json.load(f)
+        digest = file_sha256(part_path)
+        os.replace(part_path, save_path)
+        os.remove(part_path + ".json")
+        new_entry = make_entry(url, save_path, os.path.getsize(save_path), digest,
+                               part_info.get("etag"), part_info.get("last_modified"))
+        return "saved", 0, perf_counter() - t0, f"✅ 已保存: {save_path} (上次已下载完整)", new_entry
+    os.remove(part_path)
+    os.remove(part_path + ".json")
+    return fetch_pdf(session, limiter, url, save_path, None, timeout)
+
+
+def _fetch_and_hand_over(on_ready, session, limiter, url, save_path, entry):
+    result = fetch_pdf(session, limiter, url, save_path, entry)
+    if on_ready is not None and result[0] in ("saved", "unchanged"):
+        on_ready(save_path)
+    return result
+
+
+def download_contest_pdfs_concurrent(start_year=2016, end_year=2025, base_urls=None,
+                                     save_root="Contest_PDFs", max_workers=8, per_host=4, on_ready=None,
+                                     problems=PROBLEMS):
+    """
+    并发下载: 线程池 + 共享连接池会话
+    problems: {赛别: [题号, ...]}, 默认全部
+    per_host 限制对同一主机的并发请求数, 避免给 COMAP 服务器造成压力
+    已下载的文件按 manifest.json 做条件请求, 未变化的文件不会重新写入
+    base_urls 为 None 时按 url_map.json 取地址, 没有记录的先探测; 给定 base_urls 时按模板直接下载
+    on_ready(save_path): 每个文件通过检查(或确认未变化)后在下载线程中调用, 见 pipeline.py;
+    它阻塞时该下载线程也停下, 下游处理不过来时自然限速
+    """
+    os.makedirs(save_root, exist_ok=True)
+    entries = load_manifest(save_root)
+    url_map = load_url_map(save_root) if base_urls is None else None
+    limiter = HostLimiter(per_host)
+
+    total_bytes = ok_count = unchanged = 0
+    jobs = []
+    t0 = perf_counter()
+    try:
+        with make_session(max_workers) as session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            if url_map is None:
+                jobs = list(iter_jobs(start_year, end_year, base_urls, save_root, problems))
+            else:
+                targets = list(iter_targets(start_year, end_year, save_root=save_root, problems=problems))
+                # 以前下载过的文件, 清单里记着当时的地址, 不必再探测
+                for year, contest_type, problem, save_path in targets:
+                    entry = entries.get(entry_key(save_path, save_root))
+                    if entry and entry.get("url"):
+                        url_map.setdefault(url_key(year, contest_type, problem), entry["url"])
+                resolve_urls(session, limiter, executor, [t[:3] for t in targets], url_map)
+                jobs = [(contest_type, url_map[url_key(year, contest_type, problem)], save_path)
+                        for year, contest_type, problem, save_path in targets
+                        if url_key(year, contest_type, problem) in url_map]
+            print(f"\n🚀 并发下载 {len(jobs)} 个文件（线程数：{max_workers}，每主机并发：{per_host}）")
+
+            futures = {
+                executor.submit(_fetch_and_hand_over, on_ready, session, limiter, url, save_path,
+                                entries.get(entry_key(save_path, save_root))): (save_path, url)
+                for _, url, save_path in jobs
+            }
+            for fut in as_completed(futures):
+                status, nbytes, elapsed, message, entry = fut.result()
+                total_bytes += nbytes
+                if status == "saved":
+                    ok_count += 1
+                    entries[entry_key(futures[fut][0], save_root)] = entry
+                    message += f" ({nbytes / 1024:.0f} KB, {nbytes / 1024 / max(elapsed, 1e-6):.0f} KB/s)"
+                elif status == "unchanged":
+                    unchanged += 1
+                elif url_map is not None:
+                    # 地址失效(比如官网改了文件名), 下次运行重新探测
+                    url_map = {k: v for k, v in url_map.items() if v != futures[fut][1]}
+                print(message)
+    finally:
+        save_manifest(entries, save_root)
+        if url_map is not None:
+            save_url_map(url_map, save_root)
+    wall = perf_counter() - t0
+
+    print(f"\n🎯 新下载 {ok_count} 个、未变化 {unchanged} 个 / 共 {len(jobs)} 个文件, "
+          f"写入 {total_bytes / 1024 / 1024:.1f} MB, 用时 {wall:.1f} 秒, "
+          f"总吞吐 {total_bytes / 1024 / 1024 / max(wall, 1e-6):.2f} MB/s")
+    return ok_count + unchanged
+
+
 if __name__ == "__main__":
-    download_contest_pdfs()
+    download_contest_pdfs_concurrent()
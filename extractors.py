@@ -0,0 +1,84 @@
+import os
+import re
+from pagecache import AUTO, current_extractor, iter_selected_pages
+from awardcount import N_SLOTS, SKIP
+import timing
+'''
+提取器链与逐页自检:
+各年份曾因某种 提取器 + 清洗规则 的组合悄悄少计(见 count2019.py / count2018-D.py / count2022-F.py 中的说明),
+以前只能靠 printstr.py 的输出人工发现
+
+COMAP_EXTRACTOR=auto 时按 CHAIN 从快到慢尝试:
+每页清洗后做廉价的一致性检查 —— 队伍控制号的个数应等于奖项匹配数(每支队伍一行、一个奖项);
+检查不通过的页只把这些页交给下一个(更慢、更宽容的)提取器重新提取, 最后一个提取器的结果无条件采用
+绝大多数页面走快速路径, 只有问题页付出慢路径的代价
+
+其他取值(pypdf2 / raw)只使用该提取器, 不做检查, 与原流程一致
+'''
+
+CHAIN = ("raw", "pypdf2")  # 快的在前
+# 控制号: 2016-2018 为 5 位, 2019 起为 7 位; 前后不能紧挨数字或小数点(排除年份、页码、小数)
+CONTROL_PAT = re.compile(r"(?<![\d.])(?:\d{5}|\d{7})(?![\d.])")
+
+
+def extractor_chain():
+    """本次运行的提取器链"""
+    if os.environ.get("COMAP_EXTRACTOR") == AUTO:
+        return CHAIN
+    return (current_extractor(),)
+
+
+def page_consistent(text: str, page_counts) -> bool:
+    """
+    控制号个数与奖项匹配数一致, 且至少有一个奖项
+    (整段文本丢失时两者同为 0, 没有奖项的页也交给下一个提取器确认)
+    """
+    n_awards = sum(page_counts[:SKIP])
+    return n_awards > 0 and len(CONTROL_PAT.findall(text)) == n_awards
+
+
+def count_checked(pdf_path: str, lo: int, hi: int, matcher, clean=None, chain=CHAIN, pages=iter_selected_pages):
+    """
+    按提取器链统计 pages[lo:hi], 返回 (计数数组, {提取器: 采用的页数}, 最后仍不一致的页下标列表)
+    pages(pdf_path, 页下标, 提取器) 逐页产出 (页下标, 原始文本), 默认经页面缓存读取(常驻服务换成内存缓存)
+    """
+    counts = [0] * N_SLOTS
+    used = dict.fromkeys(chain, 0)
+    pending = range(lo, hi)
+    inconsistent = []
+    for level, name in enumerate(chain):
+        last = level == len(chain) - 1
+        failed = []
+        for i, raw_text in pages(pdf_path, pending, name):
+            t = timing.start()
+            text = raw_text if clean is None else clean(raw_text)
+            t = timing.lap("clean", t, pdf_path, i)
+            page_counts = matcher.count(text, [0] * N_SLOTS)
+            timing.lap("match", t, pdf_path, i)
+            if not page_consistent(text, page_counts):
+                if not last:
+                    failed.append(i)
+                    continue
+                inconsistent.append(i)
+            for k, n in enumerate(page_counts):
+                counts[k] += n
+            used[name] += 1
+            timing.count("pages")
+        timing.count(f"recheck_after_{name}", len(failed))
+        pending = failed
+        if not pending:
+            break
+    return counts, used, inconsistent
+
+
+def describe_fallback(pdf_path: str, lo: int, hi: int, used: dict, inconsistent) -> str:
+    """回退情况说明; 全部走快速路径时返回空字符串"""
+    fast = next(iter(used))
+    if used[fast] == hi - lo and not inconsistent:
+        return ""
+    parts = [f"{name} {n} 页" for name, n in used.items() if n]
+    msg = f"[提示] {pdf_path} 第 {lo + 1}-{hi} 页: " + ", ".join(parts)
+    if inconsistent:
+        msg += f"; 控制号与奖项数仍不一致: 第 {', '.join(str(i + 1) for i in inconsistent)} 页"
+    return msg
+
@@ -0,0 +1,265 @@
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import bisect
+import unicodedata
+import numpy as np
+from profiles import AWARDS
+from teams import TABLE_DIR, CONTESTS, PROBLEMS, UNKNOWN_AWARD, StringPool, TeamTable, parse_stamp_key
+'''
+院校倒排索引:
+标准化院校名 -> 倒排表 [(年份, 赛别, 题号, 奖项), ...], 数据来自 teams.py 的队伍表
+- 倒排表按院校 id 排序后以 CSR 形式存放(offsets + 各列数组), 一所院校的全部记录是连续切片
+- tallies[院校, 赛别, 奖项] 预先累计好, 单校统计和排行榜都不需要扫描倒排表
+- 名称另存一份排序列表, 前缀查询用二分
+- 增量更新: 只替换队伍表 stamps 有变化的 (年份, 赛别, 题号) 的记录
+
+目录结构(默认 institution_index/):
+    names.blob names_offsets.npy inst.npy year.npy contest.npy problem.npy award.npy offsets.npy tallies.npy meta.json
+'''
+
+INDEX_DIR = "institution_index"
+POSTING_COLUMNS = {
+    "year": np.uint16,
+    "contest": np.uint8,
+    "problem": np.uint8,
+    "award": np.uint8,
+}
+N_AWARD_SLOTS = UNKNOWN_AWARD + 1
+# 排行榜: 先比 O, 再比 F、M、H, 最后比队伍总数
+RANK_AWARDS = ["Outstanding Winner", "Finalist", "Meritorious Winner", "Honorable Mention"]
+_PUNCT = re.compile(r"[,.;:'\"()\[\]，、]")
+
+
+def normalize_institution(name: str) -> str:
+    """NFKC + 小写 + 去标点 + 合并空白; “Shandong University (Weihai)” -> “shandong university weihai”"""
+    name = unicodedata.normalize("NFKC", name).lower()
+    return " ".join(_PUNCT.sub(" ", name).split())
+
+
+class InstitutionIndex:
+    """
+    names: StringPool(标准化院校名, id 0 为空名)
+    postings: {列名: 数组}, 按院校 id 排序; inst: 每条记录的院校 id
+    offsets: (院校数 + 1,), 院校 i 的记录为 [offsets[i], offsets[i + 1])
+    tallies: (院校数, 赛别数, N_AWARD_SLOTS)
+    stamps: 建索引时队伍表的 stamps
+    scheme: 院校名归一方式, "normalize"(只做 normalize_institution)或 "aliases"(institutions.py 的别名缓存)
+    """
+
+    def __init__(self, names=None, inst=None, postings=None, stamps=None, canonical=normalize_institution):
+        self.names = names or StringPool()
+        self.canonical = canonical
+        self.stamps = dict(stamps or {})
+        self.scheme = "normalize"
+        if inst is None:
+            inst = np.zeros(0, dtype=np.uint32)
+            postings = {name: np.zeros(0, dtype=dtype) for name, dtype in POSTING_COLUMNS.items()}
+        self._build(np.asarray(inst), {name: np.asarray(col) for name, col in postings.items()})
+
+    def _build(self, inst, postings):
+        n = len(self.names)
+        if len(inst) and np.any(inst[1:] < inst[:-1]):
+            order = np.lexsort((postings["problem"], postings["contest"], postings["year"], inst))
+            inst = inst[order]
+            postings = {name: col[order] for name, col in postings.items()}
+        self.inst = inst
+        self.postings = postings
+        self.offsets = np.searchsorted(inst, np.arange(n + 1)).astype(np.int64)
+        self.tallies = np.zeros((n, len(CONTESTS), N_AWARD_SLOTS), dtype=np.int32)
+        np.add.at(self.tallies, (inst.astype(np.intp), postings["contest"].astype(np.intp),
+                                 postings["award"].astype(np.intp)), 1)
+        self._sorted = None
+        self._boards = {}
+
+    # -----------------------------------
+    # 构建与增量更新
+    # -----------------------------------
+    def _map_pool(self, pool: StringPool):
+        """队伍表院校字典 id -> 本索引的名称 id"""
+        return np.array([self.names.intern(self.canonical(s)) for s in pool.strings], dtype=np.uint32)
+
+    def update(self, table: TeamTable, keys=None):
+        """
+        用队伍表中 keys 的记录替换索引中的旧记录; keys 为 None 时按 stamps 找出有变化的键
+        (队伍表中已删除的键也会从索引中删除), 返回实际更新的键
+        """
+        if keys is None:
+            keys = {key for key, t in table.stamps.items() if self.stamps.get(key) != t}
+            keys |= set(self.stamps) - set(table.stamps)
+        keys = {key if isinstance(key, str) else "-".join(map(str, key)) for key in keys}
+        if not keys:
+            return keys
+        triples = [parse_stamp_key(key) for key in keys]
+
+        keep = np.ones(len(self.inst), dtype=bool)
+        for y, t, p in triples:
+            keep &= ~((self.postings["year"] == y) & (self.postings["contest"] == CONTESTS.index(t))
+                      & (self.postings["problem"] == PROBLEMS.index(p)))
+
+        rows = np.concatenate([table.select(year=y, contest_type=t, problem=p) for y, t, p in triples])
+        mapping = self._map_pool(table.pools["institution"])
+        new_inst = mapping[np.asarray(table.columns["institution"])[rows]]
+        inst = np.concatenate([self.inst[keep], new_inst])
+        postings = {name: np.concatenate([col[keep], np.asarray(table.columns[name])[rows].astype(col.dtype)])
+                    for name, col in self.postings.items()}
+        self._build(inst, postings)
+        for key in keys:
+            if key in table.stamps:
+                self.stamps[key] = table.stamps[key]
+            else:
+                self.stamps.pop(key, None)
+        return keys
+
+    # -----------------------------------
+    # 查询
+    # -----------------------------------
+    def id_of(self, name: str):
+        i = self.names.id_of(self.canonical(name))
+        return i if i else None
+
+    def postings_of(self, name: str):
+        """[(年份, 赛别, 题号, 奖项), ...], 按年份、赛别、题号排序"""
+        i = self.id_of(name)
+        if i is None:
+            return []
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        cols = self.postings
+        return [(y, CONTESTS[c], PROBLEMS[p], AWARDS[a] if a < len(AWARDS) else None)
+                for y, c, p, a in zip(cols["year"][lo:hi].tolist(), cols["contest"][lo:hi].tolist(),
+                                      cols["problem"][lo:hi].tolist(), cols["award"][lo:hi].tolist())]
+
+    def tally(self, name: str, contest_type=None) -> dict:
+        """{奖项: 数量}; contest_type 为 None 时合计 MCM 与 ICM"""
+        i = self.id_of(name)
+        if i is None:
+            return {}
+        row = self.tallies[i] if contest_type is None else self.tallies[i, CONTESTS.index(contest_type)][None]
+        counts = row.sum(axis=0)
+        return {aw: int(n) for aw, n in zip(AWARDS, counts) if n}
+
+    def prefix(self, prefix: str, limit: int = 20):
+        """以 prefix(标准化后)开头的院校名"""
+        if self._sorted is None:
+            self._sorted = sorted(s for s in self.names.strings if s)
+        prefix = self.canonical(prefix)
+        lo = bisect.bisect_left(self._sorted, prefix)
+        out = []
+        for s in self._sorted[lo:lo + limit]:
+            if not s.startswith(prefix):
+                break
+            out.append(s)
+        return out
+
+    def leaderboard(self, contest_type=None, top: int = 20):
+        """按 RANK_AWARDS 依次比较的排行榜, 返回 [(院校名, {奖项: 数量}), ...]; 排序结果按赛别缓存"""
+        order = self._boards.get(contest_type)
+        if order is None:
+            counts = self.tallies.sum(axis=1) if contest_type is None else self.tallies[:, CONTESTS.index(contest_type)]
+            keys = [counts.sum(axis=1)] + [counts[:, AWARDS.index(aw)] for aw in reversed(RANK_AWARDS)]
+            order = np.lexsort([-k for k in keys])
+            order = order[(order != 0) & (counts[order].sum(axis=1) > 0)]
+            self._boards[contest_type] = order
+        counts = self.tallies.sum(axis=1) if contest_type is None else self.tallies[:, CONTESTS.index(contest_type)]
+        return [(self.names[int(i)], {aw: int(n) for aw, n in zip(AWARDS, counts[i]) if n})
+                for i in order[:top]]
+
+    # -----------------------------------
+    # 持久化
+    # -----------------------------------
+    def save(self, path: str = INDEX_DIR):
+        """写入临时目录后整体替换"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        self.names.save(tmp, "names")
+        np.save(os.path.join(tmp, "inst.npy"), self.inst.astype(np.uint32))
+        for name, dtype in POSTING_COLUMNS.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), self.postings[name].astype(dtype))
+        np.save(os.path.join(tmp, "offsets.npy"), self.offsets)
+        np.save(os.path.join(tmp, "tallies.npy"), self.tallies)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"postings": len(self.inst), "names": len(self.names), "scheme": self.scheme,
+                       "stamps": self.stamps}, f, ensure_ascii=False)
+        old = f"{path}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str = INDEX_DIR, canonical=normalize_institution):
+        """读取已保存的索引(offsets / tallies 直接使用, 不重新计算); 不存在时返回空索引"""
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return cls(canonical=canonical)
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls.__new__(cls)
+        index.names = StringPool.load(path, "names")
+        index.canonical = canonical
+        index.stamps = meta.get("stamps", {})
+        index.scheme = meta.get("scheme", "normalize")
+        index.inst = np.load(os.path.join(path, "inst.npy"), mmap_mode="r")
+        index.postings = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in POSTING_COLUMNS}
+        index.offsets = np.load(os.path.join(path, "offsets.npy"))
+        index.tallies = np.load(os.path.join(path, "tallies.npy"))
+        index._sorted = None
+        index._boards = {}
+        return index
+
+
+def update_institution_index(table: TeamTable = None, path: str = INDEX_DIR, canon=None) -> InstitutionIndex:
+    """
+    按队伍表的 stamps 增量更新磁盘上的索引
+    canon: institutions.Canonicalizer, 给出时院校名按别名缓存归一; 归一方式与已有索引不同时整体重建
+    """
+    table = table if table is not None else TeamTable.load(TABLE_DIR)
+    canonical = canon.resolve if canon is not None else normalize_institution
+    scheme = "aliases" if canon is not None else "normalize"
+    index = InstitutionIndex.load(path, canonical)
+    if index.scheme != scheme:
+        index = InstitutionIndex(canonical=canonical)
+    index.scheme = scheme
+    keys = index.update(table)
+    if keys:
+        index.save(path)
+        print(f"[完成] 院校索引更新了 {len(keys)} 个题目: {', '.join(sorted(keys))}")
+    else:
+        print("[提示] 院校索引已是最新")
+    return index
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    table = TeamTable.load(TABLE_DIR)
+    if not len(table):
+        print(f"[错误] 队伍表 {TABLE_DIR}/ 为空, 请先运行 teams.py")
+        sys.exit(1)
+
+    # 先用本次的全部写法更新别名缓存, 再建索引
+    from institutions import ALIAS_PATH, Canonicalizer, learn_from_table
+    canon = Canonicalizer.load(ALIAS_PATH)
+    if learn_from_table(table, canon):
+        canon.save(ALIAS_PATH)
+    index = update_institution_index(table, canon=canon)
+    print(f"\n{len(index.names) - 1} 所院校, {len(index.inst)} 条记录")
+
+    for contest_type in [None] + CONTESTS:
+        title = contest_type or "MCM + ICM"
+        t0 = time.perf_counter()
+        board = index.leaderboard(contest_type, top=10)
+        elapsed = (time.perf_counter() - t0) * 1000
+        print(f"\n🏆 {title} 排行榜 ({elapsed:.2f} ms)")
+        for rank, (name, counts) in enumerate(board, 1):
+            print(f"{rank:>3}. {name:<60} " + ", ".join(f"{aw}: {n}" for aw, n in counts.items()))
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import os
+import re
+import sys
+import json
+import numpy as np
+from difflib import SequenceMatcher
+from institution_index import normalize_institution
+from teams import TABLE_DIR, TeamTable
+'''
+院校名归一(模糊合并):
+PDF 里的院校名有和奖项相同的提取损伤(“Univ ersity”“Informa tion”“Tech nology”, 见 count2022-F.py),
+也有大量拼写差异; 两两比较是平方级的, 这里分三步:
+1. 键: normalize_institution 后去掉全部空格, 断词类损伤直接落到同一个键上
+2. 分块: 键里的通用词(university / institute / technology ..., 允许一个字母的缺失或错误)全部删去,
+   剩下的专名骨架相同的键才成为候选对; 骨架里保留数字, 分校编号不同的不会同块
+   专名部分两个相邻字母颠倒(“Zhejaing”)是唯一允许的专名差异: 骨架字母不少于 FUZZY_MIN_LEN 个时,
+   按骨架的字母排序(颠倒前后不变)另分一次块
+3. 打分: 候选对的相似度(difflib ratio)不低于 THRESHOLD, 并且所有差异都落在通用词里才合并;
+   骨架不同的候选对, 整个键必须只差一处相邻字母颠倒(通用词部分完全一致)
+专名里的错字、多字、少字一律不合并: 汉语地名只差一个字母的不同院校太多
+(Jianghan / Jiangnan、Zhangzhou / Zhengzhou、Hangzhou / Yangzhou、Henan / Hunan、Shanxi / Shaanxi),
+而别名缓存只追加, 合错了以后的统计全都跟着错; 这类写法需要时手工写进别名缓存。对照见 bench_institutions.py
+n-gram / MinHash 分块在大量“X University of Technology”式的名字上会产生上百万候选对
+
+别名缓存(institution_aliases.json): 键 -> 标准名, 以后的年份遇到已知写法 O(1) 解析
+缓存只追加不改写: 已有键的标准名不变, 新写法要么并入已有标准名, 要么成为新的标准名,
+这样院校倒排索引里已有的记录不需要重建
+'''
+
+ALIAS_PATH = "institution_aliases.json"
+THRESHOLD = 0.9
+MAX_BLOCK = 200         # 骨架为空之类的超大块不做两两比较
+FUZZY_MIN_LEN = 8       # 骨架字母少于这个数时不允许专名部分有差异
+GENERIC_WORDS = ["universities", "university", "technological", "technology", "engineering", "polytechnic",
+                 "institute", "sciences", "science", "college", "academy", "school"]
+
+
+def _fuzzy_generic():
+    """
+    通用词及其缺一个字母、错一个字母的写法; 长的在前
+    错字只放在词中间: 首尾的通配符会吞掉相邻专名的一个字母
+    """
+    variants = []
+    for word in GENERIC_WORDS:
+        variants.append(word)
+        for i in range(1, len(word) - 1):
+            variants.append(word[:i] + "." + word[i + 1:])
+        for i in range(len(word)):
+            variants.append(word[:i] + word[i + 1:])
+    variants.sort(key=len, reverse=True)
+    return re.compile("|".join(dict.fromkeys(variants)))
+
+
+_GENERIC = _fuzzy_generic()
+
+
+def name_key(name: str) -> str:
+    """别名缓存的键: 标准化后去掉全部空格"""
+    return normalize_institution(name).replace(" ", "")
+
+
+def skeleton(key: str) -> str:
+    """
+    分块键: 删去通用词后剩下的专名部分
+    “jiangsuuiversity” 里最左匹配会把 “uuiversity” 当作错一个字母的 university:
+    匹配的前两个字母相同、去掉首字母后仍是通用词时从后一个字母开始删, 专名末尾的字母得以保留
+    """
+    parts = []
+    pos = 0
+    for m in _GENERIC.finditer(key):
+        start = m.start()
+        if key[start] == key[start + 1] and _GENERIC.fullmatch(key, start + 1, m.end()):
+            start += 1
+        parts.append(key[pos:start])
+        pos = m.end()
+    parts.append(key[pos:])
+    return "".join(parts)
+
+
+def transposed(a: str, b: str) -> bool:
+    """a、b 只差一处相邻两个字母互换(数字不算)"""
+    if len(a) != len(b) or a == b:
+        return False
+    i = 0
+    while a[i] == b[i]:
+        i += 1
+    return (i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i].isalpha() and b[i].isalpha()
+            and a[i + 2:] == b[i + 2:])
+
+
+def transposition_block_key(skel: str):
+    """骨架的字母排序, 相邻颠倒前后相同; 字母太少时为 None(不做模糊比较)"""
+    if sum(ch.isalpha() for ch in skel) < FUZZY_MIN_LEN:
+        return None
+    return "".join(sorted(skel))
+
+
+def _inside(spans, lo: int, hi: int) -> bool:
+    return lo < hi and any(s <= lo and hi <= e for s, e in spans)
+
+
+def similarity(a: str, b: str) -> float:
+    """两个键作为同一院校不同写法的得分; 不可能是同一院校时返回 0"""
+    if 2 * min(len(a), len(b)) < THRESHOLD * (len(a) + len(b)):
+        return 0.0
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    score = matcher.ratio()
+    if score < THRESHOLD:
+        return 0.0
+    skel_a, skel_b = skeleton(a), skeleton(b)
+    if skel_a != skel_b:
+        # 专名部分只允许一处相邻字母颠倒, 通用词部分必须完全一致
+        if transposition_block_key(skel_a) is None or transposition_block_key(skel_b) is None:
+            return 0.0
+        return score if transposed(a, b) else 0.0
+    spans_a = [m.span() for m in _GENERIC.finditer(a)]
+    spans_b = [m.span() for m in _GENERIC.finditer(b)]
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != "equal" and not (_inside(spans_a, i1, i2) or _inside(spans_b, j1, j2)):
+            return 0.0
+    return score
+
+
+class Canonicalizer:
+    """aliases: {键: 标准名}"""
+
+    def __init__(self, aliases=None):
+        self.aliases = dict(aliases or {})
+
+    def resolve(self, name: str) -> str:
+        """已知写法返回标准名, 否则返回 normalize_institution 的结果"""
+        canonical = self.aliases.get(name_key(name))
+        return canonical if canonical is not None else normalize_institution(name)
+
+    def learn(self, names, counts=None) -> int:
+        """
+        把缓存里没有的写法归入已有标准名或新的标准名, 返回新增的键数
+        counts: 与 names 对应的队伍数, 新组的标准名取队伍数最多的写法
+        """
+        counts = counts if counts is not None else [1] * len(names)
+        weight = {}
+        shown = {}
+        for name, n in zip(names, counts):
+            key = name_key(name)
+            if not key or key in self.aliases:
+                continue
+            weight[key] = weight.get(key, 0) + n
+            form = normalize_institution(name)
+            shown.setdefault(key, {})
+            shown[key][form] = shown[key].get(form, 0) + n
+        if not weight:
+            return 0
+
+        new_keys = list(weight)
+        old_keys = list(self.aliases)
+        keys = new_keys + old_keys
+        n_new = len(new_keys)
+        blocks = {}
+        for i, key in enumerate(keys):
+            blocks.setdefault(skeleton(key), []).append(i)
+
+        # 已有的键排在后面, 它们之间不重新比较
+        scored = {}
+        for members in blocks.values():
+            if len(members) < 2 or len(members) > MAX_BLOCK or members[0] >= n_new:
+                continue
+            for a, i in enumerate(members):
+                if i >= n_new:
+                    break
+                for j in members[a + 1:]:
+                    score = similarity(keys[i], keys[j])
+                    if score:
+                        scored[(i, j)] = score
+
+        # 骨架只差一处相邻字母颠倒的块两两配对
+        fuzzy = {}
+        for skel in blocks:
+            block_key = transposition_block_key(skel)
+            if block_key is not None:
+                fuzzy.setdefault(block_key, []).append(skel)
+        close = []
+        for skels in fuzzy.values():
+            if len(skels) > MAX_BLOCK:
+                continue
+            for a, sa in enumerate(skels):
+                for sb in skels[a + 1:]:
+                    if transposed(sa, sb):
+                        close.append((sa, sb))
+        for sa, sb in close:
+            for x in blocks[sa]:
+                for y in blocks[sb]:
+                    i, j = min(x, y), max(x, y)
+                    if i >= n_new:
+                        continue
+                    score = similarity(keys[i], keys[j])
+                    if score:
+                        scored[(i, j)] = score
+
+        # 并查集: 按得分从高到低合并, 一个组里最多含一个已有标准名
+        parent = list(range(len(keys)))
+        anchor = {i: self.aliases[keys[i]] for i in range(n_new, len(keys))}
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for (i, j), _ in sorted(scored.items(), key=lambda item: -item[1]):
+            ri, rj = find(i), find(j)
+            if ri == rj:
+                continue
+            ai, aj = anchor.get(ri), anchor.get(rj)
+            if ai is not None and aj is not None and ai != aj:
+                continue
+            parent[rj] = ri
+            if ai is None and aj is not None:
+                anchor[ri] = aj
+
+        groups = {}
+        for i in range(n_new):
+            groups.setdefault(find(i), []).append(new_keys[i])
+        for root, members in groups.items():
+            canonical = anchor.get(root)
+            if canonical is None:
+                forms = {}
+                for key in members:
+                    for form, n in shown[key].items():
+                        forms[form] = forms.get(form, 0) + n
+                # 队伍数最多的写法; 相同时取词数少的(断词会多出词)
+                canonical = max(forms, key=lambda form: (forms[form], -form.count(" "), form))
+            for key in members:
+                self.aliases[key] = canonical
+        return n_new
+
+    def save(self, path: str = ALIAS_PATH):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.aliases, f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = ALIAS_PATH):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+
+def learn_from_table(table: TeamTable, canon: Canonicalizer) -> int:
+    """用队伍表里的全部院校写法(按队伍数加权)更新别名缓存"""
+    pool = table.pools["institution"]
+    counts = np.bincount(np.asarray(table.columns["institution"]), minlength=len(pool))
+    return canon.learn(pool.strings, counts.tolist())
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    table = TeamTable.load(TABLE_DIR)
+    if not len(table):
+        print(f"[错误] 队伍表 {TABLE_DIR}/ 为空, 请先运行 teams.py")
+        sys.exit(1)
+
+    canon = Canonicalizer.load()
+    n_before = len(set(canon.aliases.values()))
+    added = learn_from_table(table, canon)
+    canon.save()
+    groups = {}
+    for key, canonical in canon.aliases.items():
+        groups.setdefault(canonical, []).append(key)
+    print(f"[完成] 新增 {added} 种写法, 标准名 {n_before} -> {len(groups)}, 别名缓存: {ALIAS_PATH}")
+
+    merged = sorted((keys for keys in groups.values() if len(keys) > 1), key=len, reverse=True)
+    print(f"\n🔍 合并了多种写法的院校: {len(merged)}")
+    for keys in merged[:20]:
+        print(f"{canon.aliases[keys[0]]:<60} <- " + ", ".join(sorted(keys)))
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import re
+import json
+import hashlib
+'''
+Contest_PDFs/manifest.json: 已下载文件清单
+每个文件一条记录(键为相对 Contest_PDFs 的路径):
+    url, etag, last_modified, size, sha256, path, year, type, problem
+
+download.py 用它做条件请求(If-None-Match / If-Modified-Since)和断点续传,
+统计脚本用它查找本地 PDF, 不再逐个路径 os.path.exists
+'''
+
+MANIFEST_NAME = "manifest.json"
+PDF_NAME_PAT = re.compile(r"(\d{4})_(MCM|ICM)_Problem_([A-F])_Results\.pdf$")
+
+
+def manifest_path(save_root: str = "Contest_PDFs") -> str:
+    return os.path.join(save_root, MANIFEST_NAME)
+
+
+def load_manifest(save_root: str = "Contest_PDFs") -> dict:
+    """读取清单, 不存在或损坏时返回空字典"""
+    try:
+        with open(manifest_path(save_root), encoding="utf-8") as f:
+            return json.load(f)["files"]
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_manifest(entries: dict, save_root: str = "Contest_PDFs"):
+    """原子写入清单"""
+    os.makedirs(save_root, exist_ok=True)
+    path = manifest_path(save_root)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"files": entries}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def entry_key(save_path: str, save_root: str = "Contest_PDFs") -> str:
+    return os.path.relpath(save_path, save_root).replace(os.sep, "/")
+
+
+def make_entry(url: str, save_path: str, size: int, sha256: str, etag=None, last_modified=None):
+    entry = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "size": size,
+        "sha256": sha256,
+        "path": save_path,
+    }
+    m = PDF_NAME_PAT.search(save_path)
+    if m:
+        entry.update(year=int(m.group(1)), type=m.group(2), problem=m.group(3))
+    return entry
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def local_copy_valid(entry: dict) -> bool:
+    """本地文件存在且大小与清单一致"""
+    try:
+        return os.path.getsize(entry["path"]) == entry["size"]
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+# -----------------------------------
+# 统计脚本使用: 查找本地 PDF
+# -----------------------------------
+def pdf_path_for(year: int, contest_type: str, problem: str, base_dir: str = "Contest_PDFs"):
+    """本地文件的默认路径"""
+    return os.path.join(base_dir, contest_type, f"{year}_{contest_type}_Problem_{problem}_Results.pdf")
+
+
+def discover_pdfs(save_root: str = "Contest_PDFs") -> dict:
+    """
+    返回 {(年份, 赛别, 题号): 路径}
+    先按文件名扫描目录, 再用清单覆盖: 清单里有的以清单为准(大小不一致的文件不用),
+    旧版顺序下载或手工放入、清单里没有的文件按扫描结果使用
+    """
+    found = {}
+    for contest_type in ("MCM", "ICM"):
+        try:
+            names = os.listdir(os.path.join(save_root, contest_type))
+        except OSError:
+            continue
+        for name in names:
+            m = PDF_NAME_PAT.fullmatch(name)
+            if m and m.group(2) == contest_type:
+                found[(int(m.group(1)), contest_type, m.group(3))] = os.path.join(save_root, contest_type, name)
+
+    for entry in load_manifest(save_root).values():
+        if "year" not in entry:
+            continue
+        key = (entry["year"], entry["type"], entry["problem"])
+        if local_copy_valid(entry):
+            found[key] = entry["path"]
+        else:
+            found.pop(key, None)
+    return found
@@ -0,0 +1,263 @@
+import os
+import json
+import zlib
+import hashlib
+import PyPDF2
+import rawtext
+import timing
+from pdfmap import XREF_VERSION, MappedPdf, open_reader
+'''
+页面文本持久缓存:
+page.extract_text() 是整个流程最慢的一步, 而调整 clean_pdf_text / award_pat 时原始文本并不会变
+缓存键 = PDF 内容的 SHA-256 + 页码 + 提取器版本, 用 zlib 压缩存放
+
+页面按需逐页读取: 每页提取后立即丢弃该页解析出的对象(内容流及其解码缓存、字体等),
+一个工作进程的内存占用不随 PDF 页数增长
+
+目录结构:
+.page_cache/<sha 前两位>/<sha>/pages.json          页数(与提取器无关)
+.page_cache/<sha 前两位>/<sha>/xref-PyPDF2-*.pickle 解析好的 xref / trailer(见 pdfmap.py), 各工作进程共用
+.page_cache/<sha 前两位>/<sha>/<提取器版本>/00001.z  第 2 页(下标 1)的原始文本
+
+提取器按次运行选择: 环境变量 COMAP_EXTRACTOR=pypdf2(默认, page.extract_text())
+或 raw(rawtext.py, 直接解析内容流), 两者的缓存分开存放
+'''
+
+CACHE_DIR = os.environ.get("COMAP_PAGE_CACHE", ".page_cache")
+EXTRACTOR_VERSION = f"PyPDF2-{PyPDF2.__version__}"
+DEFAULT_EXTRACTOR = "pypdf2"
+AUTO = "auto"  # 快的提取器优先, 校验不通过的页改用慢的, 见 extractors.py
+
+
+def _pypdf2_extractor(reader):
+    return lambda page: page.extract_text() or ""
+
+
+# 名称 -> (缓存版本, 按 PdfReader 创建逐页提取函数)
+EXTRACTORS = {
+    "pypdf2": (EXTRACTOR_VERSION, _pypdf2_extractor),
+    "raw": (f"{rawtext.VERSION}-PyPDF2-{PyPDF2.__version__}", rawtext.make_extractor),
+}
+
+
+def current_extractor() -> str:
+    """本次运行使用的提取器(在调用时读取环境变量, 工作进程继承主进程的设置)"""
+    name = os.environ.get("COMAP_EXTRACTOR", DEFAULT_EXTRACTOR)
+    if name == AUTO:
+        return DEFAULT_EXTRACTOR  # 只取文本、不做校验的调用方使用默认提取器
+    if name not in EXTRACTORS:
+        raise ValueError(f"未知的提取器: {name}（可选: {', '.join(EXTRACTORS)}, {AUTO}）")
+    return name
+
+
+_digests = {}  # (路径, 大小, 修改时间) -> sha256, 同一进程内只哈希一次
+
+
+def pdf_sha256(pdf_path: str) -> str:
+    """计算 PDF 内容的 SHA-256"""
+    st = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), st.st_size, st.st_mtime_ns)
+    digest = _digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with MappedPdf(pdf_path, sequential=True) as pdf:
+            h.update(pdf.buffer if pdf.buffer is not pdf.file else pdf.file.read())  # 直接哈希映射, 不经过读缓冲
+        digest = _digests[key] = h.hexdigest()
+    return digest
+
+
+def _pdf_dir(digest: str) -> str:
+    return os.path.join(CACHE_DIR, digest[:2], digest)
+
+
+def _page_file(digest: str, index: int, version: str = EXTRACTOR_VERSION) -> str:
+    return os.path.join(_pdf_dir(digest), version, f"{index:05d}.z")
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)  # 并行进程同时写同一页也不会读到半个文件
+
+
+# -----------------------------------
+# 读写单页
+# -----------------------------------
+def load_page(digest: str, index: int, version: str = EXTRACTOR_VERSION):
+    """读取缓存的页面文本, 未命中返回 None"""
+    try:
+        with open(_page_file(digest, index, version), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8", "surrogatepass")
+    except (OSError, zlib.error):
+        return None
+
+
+def store_page(digest: str, index: int, text: str, version: str = EXTRACTOR_VERSION):
+    # surrogatepass: 个别 PDF 会提取出孤立代理字符
+    _atomic_write(_page_file(digest, index, version), zlib.compress(text.encode("utf-8", "surrogatepass")))
+
+
+def load_page_count(digest: str):
+    try:
+        with open(os.path.join(_pdf_dir(digest), "pages.json"), encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store_page_count(digest: str, n_pages: int):
+    _atomic_write(os.path.join(_pdf_dir(digest), "pages.json"),
+                  json.dumps({"pages": n_pages}).encode("utf-8"))
+
+
+_xref_states = {}  # sha256 -> xref 状态, 同一进程内只读一次
+
+
+def _xref_file(digest: str) -> str:
+    return os.path.join(_pdf_dir(digest), f"{XREF_VERSION}.pickle")
+
+
+def load_xref(digest: str):
+    state = _xref_states.get(digest)
+    if state is None:
+        try:
+            with open(_xref_file(digest), "rb") as f:
+                state = _xref_states[digest] = f.read()
+        except OSError:
+            return None
+    return state
+
+
+def open_pdf(pdf_path: str, digest: str):
+    """
+    以只读映射打开 PDF, 返回 (MappedPdf, PdfReader); 用完由调用方 close()
+    缓存里有 xref 状态时跳过解析, 否则解析一次并存入缓存
+    """
+    pdf = MappedPdf(pdf_path)
+    try:
+        reader, state = open_reader(pdf, load_xref(digest))
+    except Exception:
+        pdf.close()
+        raise
+    if state is not None:
+        _xref_states[digest] = state
+        _atomic_write(_xref_file(digest), state)
+    return pdf, reader
+
+
+# -----------------------------------
+# 逐页提取
+# -----------------------------------
+def _extract_page(reader, index: int, extract) -> str:
+    """提取一页文本, 随后释放本页解析出的全部对象"""
+    resolved = reader.resolved_objects
+    n_before = len(resolved)
+    page = reader.pages[index]
+    try:
+        return extract(page)
+    finally:
+        # resolved_objects 按插入顺序保存, 本页新解析的对象都在末尾
+        for key in list(resolved)[n_before:]:
+            del resolved[key]
+        reader.flattened_pages[index] = None
+
+
+# -----------------------------------
+# 对外接口
+# -----------------------------------
+def page_count(pdf_path: str) -> int:
+    """PDF 页数, 优先读缓存"""
+    digest = pdf_sha256(pdf_path)
+    n_pages = load_page_count(digest)
+    if n_pages is None or load_xref(digest) is None:
+        # 主进程在分发页段前调用: 顺便把 xref 解析好存入缓存, 各工作进程不再重复解析
+        t = timing.start()
+        pdf, reader = open_pdf(pdf_path, digest)
+        try:
+            n_pages = len(reader.pages)
+        finally:
+            pdf.close()
+        timing.lap("open", t, pdf_path)
+        store_page_count(digest, n_pages)
+    return n_pages
+
+
+def iter_page_texts(pdf_path: str, start: int = 1, stop: int = None, extractor: str = None):
+    """
+    逐页产出 (页下标, 原始文本), 页范围为 [start, stop), 默认跳过第一页封面
+    extractor 为 None 时按 COMAP_EXTRACTOR 选择; 全部命中缓存时不会打开 PdfReader
+    """
+    version, make_extract = EXTRACTORS[extractor or current_extractor()]
+    digest = pdf_sha256(pdf_path)
+    pdf = reader = extract = None
+    try:
+        if stop is None:
+            stop = load_page_count(digest)
+        i = start
+        while stop is None or i < stop:
+            t = timing.start()
+            text = load_page(digest, i, version)
+            t = timing.lap("cache", t, pdf_path, i)
+            if text is None:
+                if reader is None:
+                    pdf, reader = open_pdf(pdf_path, digest)
+                    extract = make_extract(reader)
+                    n_pages = len(reader.pages)
+                    store_page_count(digest, n_pages)
+                    stop = n_pages if stop is None else min(stop, n_pages)
+                    t = timing.lap("open", t, pdf_path)
+                    if i >= stop:
+                        break
+                text = _extract_page(reader, i, extract)
+                store_page(digest, i, text, version)
+                timing.lap("extract", t, pdf_path, i)
+                timing.count("cache_miss")
+            else:
+                timing.count("cache_hit")
+            yield i, text
+            i += 1
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def iter_selected_pages(pdf_path: str, indices, extractor: str = None):
+    """按给定页下标(升序)逐页产出 (页下标, 原始文本), 超出页数的下标忽略"""
+    version, make_extract = EXTRACTORS[extractor or current_extractor()]
+    digest = pdf_sha256(pdf_path)
+    pdf = reader = extract = None
+    try:
+        for i in indices:
+            t = timing.start()
+            text = load_page(digest, i, version)
+            t = timing.lap("cache", t, pdf_path, i)
+            if text is None:
+                if reader is None:
+                    pdf, reader = open_pdf(pdf_path, digest)
+                    extract = make_extract(reader)
+                    store_page_count(digest, len(reader.pages))
+                    t = timing.lap("open", t, pdf_path)
+                if i >= len(reader.pages):
+                    break
+                text = _extract_page(reader, i, extract)
+                store_page(digest, i, text, version)
+                timing.lap("extract", t, pdf_path, i)
+                timing.count("cache_miss")
+            else:
+                timing.count("cache_hit")
+            yield i, text
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def iter_clean_pages(pdf_path: str, clean=None, start: int = 1, stop: int = None, extractor: str = None):
+    """逐页产出 (页下标, 清洗后文本), clean 为 None 时不清洗"""
+    for i, text in iter_page_texts(pdf_path, start, stop, extractor):
+        if clean is not None:
+            t = timing.start()
+            text = clean(text)
+            timing.lap("clean", t, pdf_path, i)
+        yield i, text
@@ -0,0 +1,96 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pagecache import iter_clean_pages, page_count
+from awardcount import matcher_for, N_SLOTS
+from extractors import extractor_chain, count_checked, describe_fallback
+import timing
+'''
+单个 PDF 内部按页并行:
+把 reader.pages[1:] 切成若干连续页段, 每段交给一个工作进程独立统计(页面文本经 pagecache 读取),
+最后按页段顺序合并各段的 Counter, 各奖项计数与逐页顺序统计完全一致
+
+大文件(如 2018 ICM D 题)不再只占用一个核心
+'''
+
+# 第一页通常是封面, 从第二页(下标 1)开始
+FIRST_PAGE = 1
+
+
+def page_ranges(n_pages: int, parts: int, start: int = FIRST_PAGE):
+    """把 [start, n_pages) 均分为不超过 parts 段, 返回 [(起, 止), ...]"""
+    total = n_pages - start
+    if total <= 0:
+        return []
+    parts = max(1, min(parts, total))
+    step, extra = divmod(total, parts)
+    ranges = []
+    lo = start
+    for k in range(parts):
+        hi = lo + step + (1 if k < extra else 0)
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges
+
+
+# -----------------------------------
+# 工作进程: 统计一个页段
+# -----------------------------------
+def count_page_range(pdf_path: str, lo: int, hi: int, award_pat, clean=None, normalize=None):
+    """
+    统计 pages[lo:hi] 中的奖项
+    clean/normalize 为 None 时与 countall 系列脚本一致: 不清洗, 直接以匹配原文计数
+    """
+    matcher = matcher_for(award_pat, normalize)
+    counts = [0] * N_SLOTS
+    try:
+        chain = extractor_chain()
+        if len(chain) > 1:
+            # 快速提取器优先, 控制号与奖项数不一致的页改用下一个提取器
+            counts, used, inconsistent = count_checked(pdf_path, lo, hi, matcher, clean, chain)
+            msg = describe_fallback(pdf_path, lo, hi, used, inconsistent)
+            if msg:
+                print(msg)
+        else:
+            for i, text in iter_clean_pages(pdf_path, clean, lo, hi):
+                t = timing.start()
+                matcher.count(text, counts)
+                timing.lap("match", t, pdf_path, i)
+                timing.count("pages")
+    except Exception as e:
+        print(f"[错误] 无法读取 PDF: {pdf_path} 第 {lo + 1}-{hi} 页 - {e}")
+    timing.flush()
+    return matcher.to_counter(counts)
+
+
+# -----------------------------------
+# 提交与合并
+# -----------------------------------
+def submit_pdf_ranges(executor, pdf_path: str, award_pat, clean=None, normalize=None, parts=None):
+    """把一个 PDF 拆成页段提交到 executor, 返回按页段顺序排列的 future 列表"""
+    try:
+        n_pages = page_count(pdf_path)
+    except Exception as e:
+        print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
+        return []
+    parts = parts or os.cpu_count() or 4
+    return [
+        executor.submit(count_page_range, pdf_path, lo, hi, award_pat, clean, normalize)
+        for lo, hi in page_ranges(n_pages, parts)
+    ]
+
+
+def merge_range_futures(futures):
+    """按页段顺序合并, 保证结果确定"""
+    counter = Counter()
+    for fut in futures:
+        counter.update(fut.result())
+    return counter
+
+
+def count_pdf_by_pages(pdf_path: str, award_pat, clean=None, normalize=None, max_workers=None):
+    """单文件脚本使用: 自建进程池, 按页并行统计一个 PDF"""
+    max_workers = max_workers or os.cpu_count() or 4
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = submit_pdf_ranges(executor, pdf_path, award_pat, clean, normalize, parts=max_workers)
+        return merge_range_futures(futures)
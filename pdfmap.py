@@ -0,0 +1,173 @@
+import io
+import mmap
+import pickle
+import PyPDF2
+from PyPDF2 import PageObject
+from PyPDF2.generic import IndirectObject
+'''
+内存映射的 PDF 输入:
+以前每个工作进程 open(pdf_path, "rb") 后由 PyPDF2 逐段 read() 到自己的缓冲区,
+按页段拆分或重复运行(统计 + printstr.py 导出)时同一份字节被一遍遍读取、复制
+这里用只读 mmap 打开 PDF 交给 PdfReader: 各进程映射同一个文件, 数据页直接来自操作系统的页缓存,
+没有额外的 read() 系统调用, 也没有每个进程一份的文件缓冲
+
+交叉引用表(xref)、trailer 和页面树只解析一次:
+PdfReader 构造时要从文件末尾找 startxref、读完整个 xref 表; 第一次访问 reader.pages 时还要
+解析页面树里的全部页对象(_flatten), 每个只统计一个页段的工作进程都要为整个文件付这笔代价
+第一次打开时把 xref / trailer 和各页的对象号序列化(dump_state), 存入页面缓存目录(见 pagecache.py),
+其他工作进程和以后的运行直接载入: 构造 PdfReader 时跳过 read(), 页对象在第一次访问时才解析
+序列化结果与 PyPDF2 版本绑定(XREF_VERSION); 加密的 PDF 不走这条路径
+'''
+
+XREF_VERSION = f"xref-PyPDF2-{PyPDF2.__version__}"
+# PdfReader.read() 设置的属性
+STATE_ATTRS = ("xref", "xref_objStm", "xref_free_entry", "xref_index", "trailer")
+# 页面从上级 /Pages 节点继承的属性(与 PdfReader._flatten 一致)
+INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+class MappedPdf:
+    """
+    只读映射一个 PDF 文件; 空文件无法映射, 退回普通文件对象(PdfReader 会报 EmptyFileError)
+    sequential: 从头到尾读一遍(计算哈希)时为 True, 让内核预读; 默认按 PdfReader 的随机访问提示
+    """
+
+    def __init__(self, pdf_path: str, sequential: bool = False):
+        self.file = open(pdf_path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.buffer = self.file
+        else:
+            if hasattr(self.buffer, "madvise"):
+                # PdfReader 按 xref 偏移跳着读, 不需要预读; 顺序读时关掉预读, 每 4 KiB 都要单独缺页一次
+                self.buffer.madvise(mmap.MADV_SEQUENTIAL if sequential else mmap.MADV_RANDOM)
+
+    def close(self):
+        if self.buffer is not self.file:
+            self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# -----------------------------------
+# xref 状态的序列化
+# -----------------------------------
+class _StatePickler(pickle.Pickler):
+    # trailer 里的间接引用指向原来的 PdfReader, 只保存对象号
+    def persistent_id(self, obj):
+        if isinstance(obj, IndirectObject):
+            return (obj.idnum, obj.generation)
+        return None
+
+
+class _StateUnpickler(pickle.Unpickler):
+    def __init__(self, data: bytes, reader):
+        super().__init__(io.BytesIO(data))
+        self.reader = reader
+
+    def persistent_load(self, pid):
+        idnum, generation = pid
+        return IndirectObject(idnum, generation, self.reader)
+
+
+def page_refs(reader):
+    """
+    按页序返回 [((对象号, 代号), 继承的属性)]; 遍历方式与 PdfReader._flatten 相同
+    (包括继承字典在兄弟节点之间共用这一点); 有页面不是间接对象时返回 None
+    """
+    refs = []
+
+    def walk(node, inherit, ref):
+        node_type = node.get("/Type", "/Pages")
+        if node_type == "/Pages":
+            for attr in INHERITABLE:
+                if attr in node:
+                    inherit[attr] = node[attr]
+            for kid in node["/Kids"]:
+                if not walk(kid.get_object(), inherit, kid if isinstance(kid, IndirectObject) else None):
+                    return False
+        elif node_type == "/Page":
+            if ref is None:
+                return False
+            refs.append(((ref.idnum, ref.generation),
+                         {attr: value for attr, value in inherit.items() if attr not in node}))
+        return True
+
+    root = reader.trailer["/Root"].get_object()
+    return refs if walk(root["/Pages"].get_object(), {}, None) else None
+
+
+class _LazyPages(list):
+    """代替 reader.flattened_pages: 页对象在第一次按下标访问时才解析"""
+    _UNRESOLVED = object()
+
+    def __init__(self, reader, refs):
+        super().__init__([self._UNRESOLVED] * len(refs))
+        self._reader = reader
+        self._refs = refs
+
+    def __getitem__(self, index):
+        page = super().__getitem__(index)
+        if page is self._UNRESOLVED:
+            (idnum, generation), inherit = self._refs[index]
+            ref = IndirectObject(idnum, generation, self._reader)
+            obj = ref.get_object()
+            for attr, value in inherit.items():
+                if attr not in obj:
+                    obj[attr] = value
+            page = PageObject(self._reader, ref)
+            page.update(obj)
+            self[index] = page
+        return page
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def dump_state(reader) -> bytes:
+    """序列化 reader 解析出的 xref / trailer / 页对象号; 加密的 PDF 返回 None"""
+    if reader.is_encrypted:
+        return None
+    state = {name: getattr(reader, name) for name in STATE_ATTRS}
+    state["pages"] = page_refs(reader)
+    out = io.BytesIO()
+    _StatePickler(out, pickle.HIGHEST_PROTOCOL).dump(state)
+    return out.getvalue()
+
+
+def reader_from_state(stream, data: bytes):
+    """用序列化的 xref 状态构造 PdfReader, 属性与 PdfReader.__init__ 一致, 只是不再调用 read()"""
+    reader = PyPDF2.PdfReader.__new__(PyPDF2.PdfReader)
+    reader.strict = False
+    reader.flattened_pages = None
+    reader.resolved_objects = {}
+    reader._page_id2num = None
+    state = _StateUnpickler(data, reader).load()
+    for name in STATE_ATTRS:
+        setattr(reader, name, state[name])
+    if state["pages"] is not None:
+        reader.flattened_pages = _LazyPages(reader, state["pages"])
+    reader.stream = stream
+    reader._override_encryption = False
+    reader._encryption = None
+    return reader
+
+
+def open_reader(pdf: MappedPdf, state: bytes = None):
+    """
+    返回 (PdfReader, 新解析出的 xref 状态)
+    给了 state 时直接使用, 第二项为 None; 否则正常解析, 第二项供调用方保存
+    """
+    if state is not None:
+        try:
+            return reader_from_state(pdf.buffer, state), None
+        except Exception:
+            pass  # 状态损坏或与当前 PyPDF2 不兼容, 重新解析
+    reader = PyPDF2.PdfReader(pdf.buffer)
+    return reader, dump_state(reader)
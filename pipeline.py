@@ -0,0 +1,111 @@
+import os
+import sys
+import queue
+import threading
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from download import download_contest_pdfs_concurrent
+from manifest import PDF_NAME_PAT
+from pagesplit import submit_pdf_ranges, merge_range_futures
+from profiles import lookup
+from countall import CONTESTS, counter_rows
+from results_store import save_results
+import timing
+'''
+下载与统计重叠执行:
+download.py 的下载线程每完成一个文件(已通过 PDF 结构检查, 或服务器确认未变化)就把路径放进有界队列,
+主线程从队列取出后立即按页段提交到 countall 同款的进程池(按 profiles 注册表选清洗/匹配规则)
+
+两级限流:
+- 进程池中未完成的页段超过上限时, 主线程先等待, 不再从队列取文件
+- 队列满时下载线程阻塞在 put 上, 不再开始新的下载
+新一年的结果发布后, 总耗时接近 max(下载, 统计) 而不是两者之和
+'''
+
+
+def parse_pdf_name(save_path: str):
+    """从保存路径取 (年份, 赛别, 题号)"""
+    m = PDF_NAME_PAT.search(save_path)
+    return int(m.group(1)), m.group(2), m.group(3)
+
+
+def run_pipeline(start_year: int, end_year: int, save_root: str = "Contest_PDFs",
+                 max_workers=None, download_workers: int = 8, per_host: int = 4, queue_size=None):
+    """下载并统计 start_year-end_year 的全部 PDF, 按 CSV 行顺序返回结果行"""
+    max_workers = max_workers or os.cpu_count() or 4
+    ready = queue.Queue(maxsize=queue_size or max_workers)
+    max_inflight = 2 * max_workers  # 进程池中最多排队的页段数
+
+    def download_stage():
+        try:
+            download_contest_pdfs_concurrent(start_year, end_year, save_root=save_root,
+                                             max_workers=download_workers, per_host=per_host,
+                                             on_ready=ready.put)
+        except Exception as e:
+            print(f"[错误] 下载阶段失败: {e}")
+        finally:
+            ready.put(None)  # 结束标记
+
+    pending = {}
+    inflight = set()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        downloader = threading.Thread(target=download_stage, daemon=True)
+        downloader.start()
+        while True:
+            while len(inflight) >= max_inflight:
+                _, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+            save_path = ready.get()
+            if save_path is None:
+                break
+            year, contest_type, prob = parse_pdf_name(save_path)
+            profile = lookup(year, contest_type, prob)
+            futures = submit_pdf_ranges(executor, save_path, profile.award_pat,
+                                        profile.clean, profile.normalize, parts=max_workers)
+            pending[(year, contest_type, prob)] = (profile, futures)
+            inflight.update(futures)
+            print(f"📄 开始统计: {year}-{contest_type}-Problem {prob}")
+        downloader.join()
+
+        all_results = []
+        for year in range(start_year, end_year + 1):
+            for contest_type, problems in CONTESTS.items():
+                for prob in problems:
+                    if (year, contest_type, prob) not in pending:
+                        continue
+                    profile, futures = pending[(year, contest_type, prob)]
+                    try:
+                        counter = merge_range_futures(futures)
+                    except Exception as e:
+                        print(f"[错误] 处理失败 {year}-{contest_type}-Problem {prob}: {e}")
+                        continue
+                    if not counter:
+                        print(f"[警告] 未提取到奖项: {year}-{contest_type}-Problem {prob}")
+                        continue
+                    all_results.extend(counter_rows(year, prob, contest_type, counter))
+                    print(f"[完成] {year}-{contest_type}-Problem {prob} (规则: {profile.name})")
+    return all_results
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    start_year = 2016
+    end_year = 2025
+
+    t0 = perf_counter()
+    all_results = run_pipeline(start_year, end_year)
+    if not all_results:
+        print("\n❌ 未提取到任何奖项")
+        sys.exit(1)
+
+    t = timing.start()
+    csv_name = "MCM-ICM-Results.csv"
+    save_results(all_results, csv_name=csv_name)
+    print(f"\n🎯 所有年份数据已写入文件：{csv_name}（下载 + 统计共用时 {perf_counter() - t0:.1f} 秒）")
+    timing.lap("print", t)
+    timing.report("pipeline")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
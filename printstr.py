@@ -2,7 +2,7 @@ import re
 import sys
 import csv
 from collections import Counter
-import PyPDF2
+from pagecache import iter_page_texts
 import os
 '''
 奖项定义: 2020-2025 正常读取
@@ -87,22 +87,18 @@ def normalize_award(word: str):
 def extract_designations(pdf_path: str):
     designations = []
     try:
-        with open(pdf_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for i, page in enumerate(reader.pages[60:], start=2):
-                text = page.extract_text() or ""
-
-                # 👇 打印文本调试信息（显示不可见字符）
-                print(f"\n=== 第 {i} 页 原始提取文本（显式转义） ===")
-                print(text.encode("unicode_escape").decode("utf-8"))
-                print("=" * 60)
-
-                # 正常匹配逻辑
-                for m in award_pat.finditer(text):
-                    award_full = normalize_award(m.group(0))
-                    if award_full:
-                        designations.append(award_full)
-                        print(f"[匹配成功] → {award_full}")
+        for i, text in iter_page_texts(pdf_path, start=60):
+            # 👇 打印文本调试信息（显示不可见字符）
+            print(f"\n=== 第 {i + 1} 页 原始提取文本（显式转义） ===")
+            print(text.encode("unicode_escape").decode("utf-8"))
+            print("=" * 60)
+
+            # 正常匹配逻辑
+            for m in award_pat.finditer(text):
+                award_full = normalize_award(m.group(0))
+                if award_full:
+                    designations.append(award_full)
+                    print(f"[匹配成功] → {award_full}")
     except Exception as e:
         print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
     return designations
@@ -0,0 +1,306 @@
+import re
+from collections import namedtuple
+from itertools import chain
+'''
+清洗/匹配规则注册表:
+各年份 PDF 的排版问题不同, 原先分散在 count2016-2018.py / count2018-D.py / count2019.py /
+count2022-F.py / countall2020-2025.py 中, 这里按 (年份, 赛别, 题号) 统一登记
+
+查找顺序: (年份, 赛别, 题号) -> (年份, 赛别) -> (年份)
+规则本身与原脚本逐字一致, 统计结果不变
+'''
+
+AWARDS = [
+    "Outstanding Winner",
+    "Finalist",
+    "Meritorious Winner",
+    "Honorable Mention",
+    "Successful Participant",
+    "Unsuccessful",
+    "Disqualified",
+    "Not Judged"
+] # 2020-2025
+
+AWARD_SHORT = {
+    "Outstanding Winner": "O",
+    "Finalist": "F",
+    "Meritorious Winner": "M",
+    "Honorable Mention": "H",
+    "Successful Participant": "S",
+    "Unsuccessful": "U",
+    "Disqualified": "D",
+    "Not Judged": "N"
+} # 2020-2025
+
+# clean 为 None 表示不清洗; normalize 为 None 表示直接以匹配原文计数(与 countall2020-2025.py 一致)
+Profile = namedtuple("Profile", "name clean award_pat normalize")
+
+
+def normalize_award(word: str):
+    word_low = word.lower()
+    if "outstanding" in word_low:
+        return "Outstanding Winner"
+    elif "finalist" in word_low:
+        return "Finalist"
+    elif "meritorious" in word_low:
+        return "Meritorious Winner"
+    elif "honora" in word_low:
+        return "Honorable Mention"
+    elif "successful" in word_low and "un" not in word_low:
+        return "Successful Participant"
+    elif "unsuccessful" in word_low:
+        return "Unsuccessful"
+    elif "disqualified" in word_low:
+        return "Disqualified"
+    elif "not" in word_low and "judged" in word_low:
+        return "Not Judged"
+    else:
+        return None
+
+
+# -----------------------------------
+# 匹配规则
+# -----------------------------------
+PAT_PLAIN = re.compile('|'.join(AWARDS), re.I)  # 2016-2019
+PAT_ESCAPED = re.compile('|'.join(map(re.escape, AWARDS)), re.I)  # 2020-2025
+PAT_LOOSE = re.compile(
+    r'(Outstanding\s*Winner|Meritorious\s*Winner|Honorable\s*Mention|Successful\s*Participant|Finalist|Not\s*Judged|Disqualified|Unsuccessful)',
+    re.I
+)  # 2018 ICM D / 2022 ICM F, 允许奖项名中间缺空格
+
+
+# -----------------------------------
+# 清洗规则
+# 逐字符替换(空白/全角/NUL/CJK/私用区字符)合并为一张 str.translate 表, 断词修复表合并为一个
+# 预编译多选正则, 合并空白用 " ".join(text.split()) 代替 re.sub(r"\s+", " ", text).strip()
+# (两者的空白定义相同); 输出与原各年份脚本中的 clean_pdf_text 逐字一致, 对照与测速见 bench_clean.py
+# -----------------------------------
+_NUL = {0x00: None}
+_WS = {0x00A0: " ", 0x202F: " ", 0x3000: " "}
+_CJK_PUA = dict.fromkeys(chain(range(0x4E00, 0xA000), range(0xE000, 0xF900)))
+_FULLWIDTH = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+
+
+
+def char_mapper(table: dict):
+    """
+    按 str.translate 表做逐字符替换
+    - 纯 ASCII 文本: str.translate 有快速路径, 没有要替换的字符时直接返回
+    - 含非 ASCII 字符时 str.translate 会逐字符查表, 很慢:
+      表很小时逐个 str.replace, 表较大(CJK/私用区)时先用字符类正则找出需要替换的片段再 translate
+    """
+    trans = str.maketrans(table)
+    ascii_keys = [chr(code) for code in trans if code < 0x80]
+    if len(trans) <= 16:
+        pairs = [(chr(code), "" if v is None else chr(v) if isinstance(v, int) else v)
+                 for code, v in trans.items()]
+
+        def replace_chars(text: str) -> str:
+            for ch, rep in pairs:
+                if ch in text:
+                    text = text.replace(ch, rep)
+            return text
+        slow = replace_chars
+    else:
+        ranges = []
+        for code in sorted(trans):
+            if ranges and ranges[-1][1] == code - 1:
+                ranges[-1][1] = code
+            else:
+                ranges.append([code, code])
+        char_class = "".join(
+            re.escape(chr(lo)) if lo == hi else f"{re.escape(chr(lo))}-{re.escape(chr(hi))}"
+            for lo, hi in ranges
+        )
+        pat = re.compile(f"[{char_class}]+")
+        repl = lambda m: m.group().translate(trans)
+        slow = lambda text: pat.sub(repl, text)
+
+    def mapper(text: str) -> str:
+        if text.isascii():
+            return text.translate(trans) if any(ch in text for ch in ascii_keys) else text
+        return slow(text)
+    return mapper
+
+
+def word_fixer(table: dict, chained: bool = False):
+    """
+    把按顺序执行的 str.replace 替换表合并成一个预编译的多选正则
+    chained=True: 替换结果会与前后文组成新的待替换词(如 Outsta nding → OutstandingWinner),
+    此时正则只用来判断本页是否需要修复, 命中后仍按原顺序逐条替换, 保证结果与原脚本一致
+    """
+    pat = re.compile("|".join(map(re.escape, table)))
+    if chained:
+        items = list(table.items())
+
+        def fix(text: str) -> str:
+            if pat.search(text) is None:
+                return text
+            for k, v in items:
+                text = text.replace(k, v)
+            return text
+        return fix
+
+    repl = lambda m: table[m.group()]
+    return lambda text: pat.sub(repl, text)
+
+
+# 2016-2018: 去除 Null 字节和空白混乱
+_MAP_2016 = char_mapper({**_NUL, **_WS})
+
+
+def clean_2016(text: str) -> str:
+    return " ".join(_MAP_2016(text).replace("Honorab le", "Honorable").split())
+
+
+# 2018 ICM D: 去掉退格符、控制符, 修复断词、连续字母, 标准化奖项名称
+# 与先 [\r\n]+ → ' ' 再 \s{2,} → ' ' 结果相同; 文本中没有单独的其他空白字符时可直接 split/join
+_RE_NEWLINE_WS = re.compile(r"\s{2,}|[\r\n]")
+_RE_OTHER_WS = re.compile(r"[^\S \r\n]")
+_RE_SINGLE_LETTERS = re.compile(r'(?<=\b[A-Za-z])\s+(?=[A-Za-z]\b)')  # 'H o n o r' → 'Honor'
+_FIX_2018_ICM_D = word_fixer({
+    "Outsta nding": "Outstanding",
+    "Merit orious": "Meritorious",
+    "Honorab le": "Honorable",
+    "Su ccessful": "Successful",
+    "Parti cipant": "Participant",
+    "Not Judg ed": "Not Judged",
+    "Jud ged": "Judged",
+    "Disqua lified": "Disqualified",
+    "WinnerDisqualified": "Winner Disqualified",
+    "OutstandingWinner": "Outstanding Winner",
+    "MeritoriousWinner": "Meritorious Winner",
+    "HonorableMention": "Honorable Mention",
+    "SuccessfulParticipant": "Successful Participant",
+    "NotJudged": "Not Judged",
+    "FinalistAward": "Finalist",
+    "FinalistWinner": "Finalist",
+}, chained=True)
+_CASE_WORDS = [
+    "Outstanding Winner", "Meritorious Winner", "Honorable Mention",
+    "Successful Participant", "Not Judged", "Disqualified", "Finalist"
+]
+# 与原脚本一样逐个关键字替换: 关键字首尾重叠时(如 'Mentionot Judged')后面的覆盖前面的
+_RE_CASE = [(re.compile(w, re.I), w) for w in _CASE_WORDS]
+_CASE_LOWER = [(w, w.lower()) for w in _CASE_WORDS]
+# re.I 下能匹配 ASCII 字母的非 ASCII 字符('İ' 转小写后还会变成两个字符)
+CASE_SPECIAL = ("\u0130", "\u0131", "\u017F", "\u212A")
+
+
+def _fix_case(text: str) -> str:
+    """把奖项关键字统一为标准大小写, 输出与原脚本逐个 re.sub 完全一致"""
+    if not text.isascii() and any(ch in text for ch in CASE_SPECIAL):
+        for pattern, word in _RE_CASE:
+            text = pattern.sub(word, text)
+        return text
+    # 其余情况下在小写副本上用 str.find 查找(位置一一对应), 比 re.I 快得多;
+    # 替换只改大小写, 前面的关键字替换完后小写副本不变, 各关键字可以都在同一副本上查
+    lower = text.lower()
+    spans = []
+    for word, key in _CASE_LOWER:
+        i = lower.find(key)
+        while i != -1:
+            spans.append((i, word))
+            i = lower.find(key, i + len(key))
+    if not spans:
+        return text
+    ordered = sorted(spans)
+    end = 0
+    for start, word in ordered:
+        if start < end:
+            # 有重叠: 按关键字顺序逐个覆盖
+            chars = list(text)
+            for start, word in spans:
+                chars[start:start + len(word)] = word
+            return "".join(chars)
+        end = start + len(word)
+    parts = []
+    last = 0
+    for start, word in ordered:
+        parts.append(text[last:start])
+        parts.append(word)
+        last = start + len(word)
+    parts.append(text[last:])
+    return "".join(parts)
+
+
+def clean_2018_icm_d(raw_text: str) -> str:
+    text = raw_text.replace("\\x08", "").replace("\x08", "")
+    if _RE_OTHER_WS.search(text) is None:
+        text = " ".join(text.split())
+    else:
+        text = _RE_NEWLINE_WS.sub(" ", text)
+    text = _RE_SINGLE_LETTERS.sub("", text).strip()
+    # 断词修复和大小写统一都不会产生连续空白或首尾空白, 原脚本最后一步的空白合并可以省去
+    return _fix_case(_FIX_2018_ICM_D(text))
+
+
+# 2019: 处理 Null 字节和嵌字体污染(CJK 汉字、私用区符号, 包括“王”之类)、断词等
+_MAP_2019 = char_mapper({**_CJK_PUA, **_NUL, **_WS})
+_FIX_2019 = word_fixer({
+    "Honorab le": "Honorable",
+    "Honora b le": "Honorable",
+    "Honor ab le": "Honorable",
+    "Merit orious": "Meritorious",
+    "Suc cessful": "Successful",
+    "Parti cipant": "Participant",
+})
+
+
+def clean_2019(text: str) -> str:
+    return " ".join(_FIX_2019(_MAP_2019(text)).split())
+
+
+# 2022 ICM F: 乱码字符、全角字符、字母间逗号
+_MAP_2022_ICM_F = char_mapper({**_CJK_PUA, **_FULLWIDTH, **_NUL, **_WS})
+_RE_LETTER_GAPS = re.compile(r'(?<=[A-Za-z])[,\s]+(?=[A-Za-z])')
+_FIX_2022_ICM_F = word_fixer({
+    "Honorab le": "Honorable",
+    "Honora ble": "Honorable",
+    "Merit orious": "Meritorious",
+    "Suc cessful": "Successful",
+    "Parti cipant": "Participant",
+    "Re sults": "Results",
+    "Univ ersity": "University",
+    "Informa tion": "Information",
+    "Tech nology": "Technology",
+})
+
+
+def clean_2022_icm_f(text: str) -> str:
+    text = _RE_LETTER_GAPS.sub("", _MAP_2022_ICM_F(text)).replace(", ", " ")
+    return _FIX_2022_ICM_F(" ".join(text.split()))
+
+
+# -----------------------------------
+# 注册表
+# -----------------------------------
+_REGISTRY = {}
+
+
+def register(profile: Profile, years, contest_type: str = None, problems=(None,)):
+    for year in years:
+        for prob in problems:
+            _REGISTRY[(year, contest_type, prob)] = profile
+
+
+def lookup(year: int, contest_type: str, problem: str) -> Profile:
+    """按 (年份, 赛别, 题号) 查找规则, 越具体越优先"""
+    for key in ((year, contest_type, problem), (year, contest_type, None), (year, None, None)):
+        profile = _REGISTRY.get(key)
+        if profile is not None:
+            return profile
+    raise KeyError(f"没有登记 {year} {contest_type} {problem} 的清洗规则")
+
+
+P_2016 = Profile("2016-2018", clean_2016, PAT_PLAIN, normalize_award)
+P_2018_ICM_D = Profile("2018-ICM-D", clean_2018_icm_d, PAT_LOOSE, normalize_award)
+P_2019 = Profile("2019", clean_2019, PAT_PLAIN, normalize_award)
+P_2020 = Profile("2020-2025", None, PAT_ESCAPED, None)
+P_2022_ICM_F = Profile("2022-ICM-F", clean_2022_icm_f, PAT_LOOSE, normalize_award)
+
+register(P_2016, range(2016, 2019))
+register(P_2018_ICM_D, [2018], "ICM", ["D"])
+register(P_2019, [2019])
+register(P_2020, range(2020, 2026))
+register(P_2022_ICM_F, [2022], "ICM", ["F"])
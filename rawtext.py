@@ -0,0 +1,260 @@
+import re
+import sys
+from array import array
+'''
+原始内容流文本提取(提取器 "raw"):
+统计奖项不需要 PyPDF2 extract_text() 的版面重建, 奖项名就是页面内容流里 Tj/TJ 显示的字符串
+这里直接解压内容流, 只解析文本相关的操作符, 字符串经字体的 ToUnicode 表解码后拼接:
+- Tj / ' / " / TJ: 输出文本(TJ 中较大的负间距视为空格)
+- Tf: 切换字体
+- Td / TD / Tm / T* / TL: 只跟踪文本行的纵坐标, 换行输出 "\n", 同一行上重新定位输出空格
+- Do: 进入带文本的表单 XObject
+不处理 cm 变换、字宽和字间距, 也不做版面排序
+
+字体没有 ToUnicode 时: 单字节字体按 latin-1 解码, 双字节字体(Type0)无法解码, 输出为空
+(extractors.py 的逐页校验会发现这类页面并改用 PyPDF2)
+'''
+
+VERSION = "raw-1"
+
+# 1 字面字符串(最多一层嵌套括号) 2 十六进制字符串 3 [ 4 ] 5 名称 6 数字 7 操作符; 注释和 << >> 不分组
+_TOKEN = re.compile(rb"""
+    (\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\))
+  | <([0-9A-Fa-f\s]*)>
+  | (\[) | (\])
+  | /([^\s/\[\]()<>{}%]*)
+  | ([+-]?(?:\d+\.?\d*|\.\d+))
+  | ([A-Za-z'"][A-Za-z0-9*'"]*)
+  | %[^\r\n]*
+  | <<|>>
+""", re.S | re.X)
+_INLINE_IMAGE = re.compile(rb"\bBI\b.*?\bID\b.*?\bEI\b", re.S)
+_ESCAPE = re.compile(rb"\\(\r\n|[0-7]{1,3}|.)", re.S)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f",
+            b"\r\n": b"", b"\r": b"", b"\n": b""}
+TJ_SPACE = -250  # TJ 数组中小于该值(千分之一字号)的间距输出为空格
+_MAX_FORM_DEPTH = 4
+
+
+def _unescape(m) -> bytes:
+    esc = m.group(1)
+    if esc in _ESCAPES:
+        return _ESCAPES[esc]
+    if esc[:1].isdigit():
+        return bytes([int(esc, 8) & 0xFF])
+    return esc  # \( \) \\ 以及无意义的转义
+
+
+def literal_bytes(token: bytes) -> bytes:
+    body = token[1:-1]
+    return _ESCAPE.sub(_unescape, body) if b"\\" in body else body
+
+
+def hex_bytes(digits: bytes) -> bytes:
+    digits = re.sub(rb"\s+", b"", digits)
+    if len(digits) % 2:
+        digits += b"0"  # 奇数位时末尾补 0
+    return bytes.fromhex(digits.decode("ascii"))
+
+
+# -----------------------------------
+# 字体: ToUnicode 解码
+# -----------------------------------
+_CODESPACE = re.compile(rb"begincodespacerange\s*<([0-9A-Fa-f]+)>")
+_BFCHAR = re.compile(rb"beginbfchar(.*?)endbfchar", re.S)
+_BFRANGE = re.compile(rb"beginbfrange(.*?)endbfrange", re.S)
+_HEX_PAIR = re.compile(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>")
+_RANGE = re.compile(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(?:<([0-9A-Fa-f]*)>|\[([^\]]*)\])")
+_HEX = re.compile(rb"<([0-9A-Fa-f]*)>")
+
+
+def _utf16(hex_digits: bytes) -> str:
+    return bytes.fromhex(hex_digits.decode("ascii")).decode("utf-16-be", "surrogatepass")
+
+
+def parse_cmap(data: bytes):
+    """解析 ToUnicode CMap, 返回 (编码字节数, {编码: 文本})"""
+    m = _CODESPACE.search(data)
+    width = len(m.group(1)) // 2 if m else None
+    cmap = {}
+    for block in _BFCHAR.findall(data):
+        for src, dst in _HEX_PAIR.findall(block):
+            cmap[int(src, 16)] = _utf16(dst)
+            width = width or len(src) // 2
+    for block in _BFRANGE.findall(data):
+        for lo, hi, dst, dst_list in _RANGE.findall(block):
+            lo_code, hi_code = int(lo, 16), int(hi, 16)
+            width = width or len(lo) // 2
+            if dst_list:
+                for code, item in zip(range(lo_code, hi_code + 1), _HEX.findall(dst_list)):
+                    cmap[code] = _utf16(item)
+            else:
+                # 目标值的最后一个 UTF-16 单元逐个递增
+                base = int(dst, 16)
+                n_bytes = len(dst) // 2
+                for k in range(min(hi_code - lo_code, 0xFFFF) + 1):
+                    cmap[lo_code + k] = (base + k).to_bytes(n_bytes, "big").decode("utf-16-be", "surrogatepass")
+    return width or 1, cmap
+
+
+_BYTESWAP = sys.byteorder == "little"
+
+
+def make_decoder(font):
+    """返回 bytes -> str 的解码函数"""
+    two_byte = font.get("/Subtype") == "/Type0"
+    to_unicode = font.get("/ToUnicode")
+    if to_unicode is None:
+        if two_byte:
+            return lambda data: ""
+        return lambda data: data.decode("latin-1")
+
+    width, cmap = parse_cmap(to_unicode.get_object().get_data())
+    if width == 1:
+        table = str.maketrans({chr(code): text for code, text in cmap.items() if code < 256})
+        return lambda data: data.decode("latin-1").translate(table)
+
+    get = cmap.get
+
+    def decode2(data: bytes) -> str:
+        codes = array("H", data[:len(data) & ~1])
+        if _BYTESWAP:
+            codes.byteswap()
+        return "".join([get(c, "") for c in codes])
+    return decode2
+
+
+def _font_decoder(font_dict, name: str, cache: dict):
+    key_name = "/" + name
+    ref = font_dict.raw_get(key_name) if key_name in font_dict else None
+    if ref is None:
+        return None
+    key = getattr(ref, "idnum", None)
+    decoder = cache.get(key) if key is not None else None
+    if decoder is None:
+        decoder = make_decoder(ref.get_object())
+        if key is not None:
+            cache[key] = decoder
+    return decoder
+
+
+# -----------------------------------
+# 内容流
+# -----------------------------------
+def content_bytes(obj) -> bytes:
+    """页面 /Contents 可以是单个流或流数组"""
+    contents = obj.get("/Contents")
+    if contents is None:
+        return b""
+    contents = contents.get_object()
+    if isinstance(contents, list):
+        return b"\n".join(part.get_object().get_data() for part in contents)
+    return contents.get_data()
+
+
+def _run(data: bytes, resources, out: list, cache: dict, depth: int = 0):
+    resources = resources.get_object() if resources is not None else {}
+    fonts = resources.get("/Font")
+    fonts = fonts.get_object() if fonts is not None else {}
+    if b"ID" in data and b"BI" in data:
+        data = _INLINE_IMAGE.sub(b" ", data)
+
+    decoder = None
+    operands = []
+    arrays = []
+    line_y = 0.0
+    leading = 0.0
+    last_y = None
+    moved = False
+
+    def emit(text):
+        nonlocal last_y, moved
+        if last_y is not None:
+            if abs(line_y - last_y) > 0.01:
+                out.append("\n")
+            elif moved:
+                out.append(" ")
+        out.append(text)
+        last_y = line_y
+        moved = False
+
+    for m in _TOKEN.finditer(data):
+        kind = m.lastindex
+        if kind is None:
+            continue
+        if kind == 7:
+            op = m.group(7)
+            if op == b"Tj":
+                if operands and decoder is not None and isinstance(operands[-1], bytes):
+                    emit(decoder(operands[-1]))
+            elif op == b"TJ":
+                if operands and decoder is not None and isinstance(operands[-1], list):
+                    parts = []
+                    for item in operands[-1]:
+                        if isinstance(item, bytes):
+                            parts.append(decoder(item))
+                        elif item < TJ_SPACE:
+                            parts.append(" ")
+                    emit("".join(parts))
+            elif op == b"Tf":
+                if len(operands) >= 2 and isinstance(operands[-2], str):
+                    decoder = _font_decoder(fonts, operands[-2], cache)
+            elif op == b"Td" or op == b"TD":
+                if len(operands) >= 2:
+                    ty = float(operands[-1])
+                    line_y += ty
+                    if op == b"TD":
+                        leading = -ty
+                    moved = True
+            elif op == b"Tm":
+                if len(operands) >= 6:
+                    line_y = float(operands[-1])
+                    moved = True
+            elif op == b"T*" or op == b"'" or op == b'"':
+                line_y -= leading or 1.0
+                moved = True
+                if op != b"T*" and operands and decoder is not None and isinstance(operands[-1], bytes):
+                    emit(decoder(operands[-1]))
+            elif op == b"TL":
+                if operands:
+                    leading = float(operands[-1])
+            elif op == b"BT":
+                line_y = 0.0
+            elif op == b"Do" and depth < _MAX_FORM_DEPTH:
+                if operands and isinstance(operands[-1], str):
+                    xobjects = resources.get("/XObject")
+                    xobject = xobjects.get_object().get("/" + operands[-1]) if xobjects is not None else None
+                    if xobject is not None and xobject.get("/Subtype") == "/Form":
+                        _run(xobject.get_data(), xobject.get("/Resources", resources), out, cache, depth + 1)
+            operands = []
+            continue
+
+        if kind == 1:
+            value = literal_bytes(m.group(1))
+        elif kind == 2:
+            value = hex_bytes(m.group(2))
+        elif kind == 6:
+            value = float(m.group(6)) if arrays else m.group(6)
+        elif kind == 5:
+            value = m.group(5).decode("latin-1")
+        elif kind == 3:
+            arrays.append([])
+            continue
+        else:  # ]
+            if not arrays:
+                continue
+            value = arrays.pop()
+        (arrays[-1] if arrays else operands).append(value)
+
+
+def extract_text(page, cache: dict = None) -> str:
+    """提取一页文本; cache 为同一 PDF 内共用的字体解码器缓存"""
+    out = []
+    _run(content_bytes(page), page.get("/Resources"), out, {} if cache is None else cache)
+    return "".join(out)
+
+
+def make_extractor(reader):
+    """pagecache 使用: 同一个 PdfReader 的各页共用字体缓存"""
+    cache = {}
+    return lambda page: extract_text(page, cache)
@@ -0,0 +1,133 @@
+import os
+import csv
+import sqlite3
+from contextlib import closing
+'''
+统计结果库(SQLite): MCM-ICM-Results.db
+表 results 以 (Year, Problem, Type, Award) 为主键, 写入为 upsert:
+重复运行任意年份的脚本只会覆盖对应的行, 不会再像追加 CSV 那样出现重复行和重复表头
+
+MCM-ICM-Results.csv 改为从库中导出(按 年份 / MCM→ICM / 题号 / 奖项等级 排序)
+表 provenance 记录每个 (Year, Problem, Type) 单元的来源(PDF 哈希、提取器、规则版本), 供 build.py 增量构建;
+写入某个单元的结果而不附带来源记录时, 该单元原有的记录作废
+库不存在而旧 CSV 存在时, 首次打开会先把旧 CSV 导入(重复行以后出现的为准)
+'''
+
+DB_PATH = "MCM-ICM-Results.db"
+CSV_NAME = "MCM-ICM-Results.csv"
+CSV_HEADER = ["Year", "Problem", "Type", "Award", "Count", "Rank"]
+AWARD_ORDER = "OFMHSUDN"
+# README 中的 Rank 列: O-1, F-2, M-3, H-4, S-5, U/D/N-6
+AWARD_RANK = {"O": 1, "F": 2, "M": 3, "H": 4, "S": 5, "U": 6, "D": 6, "N": 6}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    year    INTEGER NOT NULL,
+    problem TEXT    NOT NULL,
+    type    TEXT    NOT NULL,
+    award   TEXT    NOT NULL,
+    count   INTEGER NOT NULL,
+    PRIMARY KEY (year, problem, type, award)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_problem ON results (problem, year);
+CREATE INDEX IF NOT EXISTS idx_results_award ON results (award, year);
+CREATE INDEX IF NOT EXISTS idx_results_type ON results (type, year);
+CREATE TABLE IF NOT EXISTS provenance (
+    year         INTEGER NOT NULL,
+    problem      TEXT    NOT NULL,
+    type         TEXT    NOT NULL,
+    pdf_sha256   TEXT    NOT NULL,
+    extractor    TEXT    NOT NULL,
+    profile      TEXT    NOT NULL,
+    profile_hash TEXT    NOT NULL,
+    counter_hash TEXT    NOT NULL,
+    built_at     REAL    NOT NULL,
+    PRIMARY KEY (year, problem, type)
+) WITHOUT ROWID;
+"""
+PROVENANCE_FIELDS = ("year", "problem", "type", "pdf_sha256", "extractor", "profile", "profile_hash",
+                     "counter_hash", "built_at")
+
+_UPSERT = """
+INSERT INTO results (year, problem, type, award, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (year, problem, type, award) DO UPDATE SET count = excluded.count
+"""
+
+_ORDER_BY = (f"ORDER BY year, CASE type WHEN 'MCM' THEN 0 ELSE 1 END, problem, "
+             f"instr('{AWARD_ORDER}', award)")
+
+
+def connect(db_path: str = DB_PATH, seed_csv: str = CSV_NAME) -> sqlite3.Connection:
+    """打开(必要时创建)结果库"""
+    is_new = not os.path.exists(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    if is_new and seed_csv and os.path.exists(seed_csv):
+        n = upsert_rows(conn, read_csv_rows(seed_csv))
+        print(f"[完成] 已从 {seed_csv} 导入 {n} 行到 {db_path}")
+    return conn
+
+
+def read_csv_rows(csv_name: str):
+    """读取旧 CSV(有无 Rank 列均可), 跳过中途重复出现的表头"""
+    with open(csv_name, newline='', encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            if len(row) < 5 or row[0] == "Year":
+                continue
+            yield int(row[0]), row[1], row[2], row[3], int(row[4])
+
+
+def upsert_rows(conn: sqlite3.Connection, rows, provenance=()) -> int:
+    """
+    rows: [[年份, 题号, 赛别, 奖项, 数量], ...], 整批在一个事务内写入
+    provenance: 同一事务内写入的来源记录 [{字段: 值}, ...]; rows 涉及而没有新记录的单元, 旧记录删除
+    """
+    rows = [(int(y), p, t, a, int(c)) for y, p, t, a, c in rows]
+    records = [tuple(record[field] for field in PROVENANCE_FIELDS) for record in provenance]
+    recorded = {record[:3] for record in records}
+    with conn:
+        conn.executemany(_UPSERT, rows)
+        conn.executemany("DELETE FROM provenance WHERE year = ? AND problem = ? AND type = ?",
+                         {row[:3] for row in rows} - recorded)
+        conn.executemany(f"INSERT OR REPLACE INTO provenance ({', '.join(PROVENANCE_FIELDS)}) "
+                         f"VALUES ({', '.join('?' * len(PROVENANCE_FIELDS))})", records)
+    return len(rows)
+
+
+def load_provenance(conn: sqlite3.Connection) -> dict:
+    """{(年份, 题号, 赛别): {字段: 值}}; 只返回库里还有结果行的单元"""
+    sql = (f"SELECT {', '.join(PROVENANCE_FIELDS)} FROM provenance p WHERE EXISTS "
+           f"(SELECT 1 FROM results r WHERE r.year = p.year AND r.problem = p.problem AND r.type = p.type)")
+    return {row[:3]: dict(zip(PROVENANCE_FIELDS, row)) for row in conn.execute(sql)}
+
+
+def query(conn: sqlite3.Connection, year=None, problem=None, contest_type=None, award=None):
+    """按条件查询(走主键或索引), 参数为 None 表示不限"""
+    conds, args = [], []
+    for column, value in (("year", year), ("problem", problem), ("type", contest_type), ("award", award)):
+        if value is not None:
+            conds.append(f"{column} = ?")
+            args.append(value)
+    where = f"WHERE {' AND '.join(conds)} " if conds else ""
+    sql = f"SELECT year, problem, type, award, count FROM results {where}{_ORDER_BY}"
+    return [list(row) for row in conn.execute(sql, args)]
+
+
+def export_csv(conn: sqlite3.Connection, csv_name: str = CSV_NAME):
+    """导出完整 CSV(先写临时文件再替换)"""
+    tmp = f"{csv_name}.{os.getpid()}.tmp"
+    with open(tmp, "w", newline='', encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for row in conn.execute(f"SELECT year, problem, type, award, count FROM results {_ORDER_BY}"):
+            writer.writerow((*row, AWARD_RANK.get(row[3], "")))
+    os.replace(tmp, csv_name)
+
+
+def save_results(rows, db_path: str = DB_PATH, csv_name: str = CSV_NAME, provenance=()):
+    """各统计脚本使用: upsert 本次结果, 再导出 CSV; build.py 同时写入来源记录"""
+    with closing(connect(db_path, csv_name)) as conn:
+        n = upsert_rows(conn, rows, provenance)
+        export_csv(conn, csv_name)
+    return n
@@ -0,0 +1,222 @@
+import sys
+import zlib
+import random
+from collections import Counter
+from profiles import AWARDS, lookup
+'''
+合成结果 PDF 生成器(基准测试用, 不依赖真实的 COMAP 文件):
+版式与结果 PDF 相同 —— 第一页封面, 之后每行一支队伍 “控制号 院校 指导教师 奖项”;
+字体为带 ToUnicode 表的双字节 Type0 字体, 因此 CJK / 私用区 / 全角字符都能原样提取出来
+
+按年份的清洗规则(profiles.py)复现各年脚本说明中记录的排版问题:
+- 2016-2018: “Honorab le” 断词、NUL 字节、不换行空格、奖项名中的双空格
+- 2018 ICM D: “Outsta nding” 等断词、缺空格(OutstandingWinner)、退格符、逐字母分开、大小写混乱
+- 2019: CJK 汉字 / 私用区乱码字形、“Honora b le” 断词、“Unsuccessful - W” 之类的后缀
+- 2022 ICM F: 全角字母、字母之间的全角逗号、“Univ ersity” 断词
+- 2020-2025: 无问题
+
+生成时返回每个奖项的真实队伍数, 可以核对统计结果
+用法: python synthpdf.py 输出路径 年份 赛别 题号 [页数]
+'''
+
+ROWS_PER_PAGE = 40
+QUIRK_RATE = 0.25
+INSTITUTIONS = [
+    "University of Science and Technology of China", "Shandong University", "Zhejiang University",
+    "Georgia Institute of Technology", "Harbin Institute of Technology (Weihai)", "Tsinghua University",
+    "North China Electric Power University", "Beijing University of Posts and Telecommunications",
+]
+ADVISORS = ["Zhang Wei", "Wang Fang", "Li Na", "John A. Smith", "Maria Garcia", "Chen Jing"]
+GARBAGE = ["王", "中", "\uE01A", "\uF8F0"]  # CJK 汉字、私用区符号
+SUFFIX_2019 = {"Unsuccessful": [" - W", " - I"], "Disqualified": [" - P"]}
+
+# 2016 起各年份不存在的奖项(与 count 系列脚本的说明一致)
+MISSING_AWARDS = {
+    2016: {"Disqualified", "Not Judged"},
+    2017: {"Not Judged"},
+    2018: {"Not Judged"},
+    2019: {"Not Judged"},
+}
+
+
+# 2018 ICM D 中出现过的断词(见 count2018-D.py)
+BREAKS_2018_ICM_D = {
+    "Outstanding": "Outsta nding", "Meritorious": "Merit orious", "Honorable": "Honorab le",
+    "Successful": "Su ccessful", "Participant": "Parti cipant", "Judged": "Judg ed", "Disqualified": "Disqua lified",
+}
+
+
+def _break_word(rnd, award: str) -> str:
+    words = [w for w in award.split(" ") if w in BREAKS_2018_ICM_D]
+    if not words:
+        return award
+    word = rnd.choice(words)
+    return award.replace(word, BREAKS_2018_ICM_D[word], 1)
+
+
+def quirk_2016(rnd, award: str) -> str:
+    choice = rnd.random()
+    if award == "Honorable Mention" and choice < 0.6:
+        return "Honorab le Mention"
+    if choice < 0.3:
+        return award.replace(" ", "  ")
+    if choice < 0.6:
+        return award.replace(" ", "\u00A0")
+    return "\x00" + award
+
+
+def quirk_2018_icm_d(rnd, award: str) -> str:
+    choice = rnd.random()
+    if choice < 0.25:
+        return _break_word(rnd, award)
+    if choice < 0.45:
+        return award.replace(" ", "")
+    if choice < 0.6:
+        return award.replace("i", "i\x08", 1)
+    if choice < 0.75 and " " not in award:
+        return " ".join(award)  # F i n a l i s t
+    return award.upper() if choice < 0.9 else award.lower()
+
+
+def quirk_2019(rnd, award: str) -> str:
+    choice = rnd.random()
+    if award in SUFFIX_2019 and choice < 0.4:
+        return award + rnd.choice(SUFFIX_2019[award])
+    if award == "Honorable Mention" and choice < 0.7:
+        return rnd.choice(["Honorab le Mention", "Honora b le Mention", "Honor ab le Mention"])
+    i = rnd.randrange(1, len(award))
+    return award[:i] + rnd.choice(GARBAGE) + award[i:]
+
+
+def quirk_2022_icm_f(rnd, award: str) -> str:
+    choice = rnd.random()
+    if choice < 0.35:
+        return "".join(chr(ord(ch) + 0xFEE0) if "!" <= ch <= "~" else ch for ch in award)
+    if choice < 0.7:
+        return "，".join(award)  # H，o，n，o，r ...
+    if award == "Honorable Mention":
+        return "Honora ble Mention"
+    return rnd.choice(GARBAGE) + award
+
+
+# 规则名 -> (奖项名的问题, 院校名的问题)
+QUIRKS = {
+    "2016-2018": (quirk_2016, None),
+    "2018-ICM-D": (quirk_2018_icm_d, None),
+    "2019": (quirk_2019, None),
+    "2022-ICM-F": (quirk_2022_icm_f, lambda name: name.replace("University", "Univ ersity")
+                   .replace("Technology", "Tech nology")),
+    "2020-2025": (None, None),
+}
+
+
+def make_rows(year: int, contest_type: str, problem: str, n_pages: int, rows: int = ROWS_PER_PAGE, seed: int = 0):
+    """返回 (各页的行文本列表, 各奖项真实数量)"""
+    profile = lookup(year, contest_type, problem)
+    award_quirk, inst_quirk = QUIRKS.get(profile.name, (None, None))
+    rnd = random.Random(f"{year}-{contest_type}-{problem}-{seed}")
+    awards = [aw for aw in AWARDS if aw not in MISSING_AWARDS.get(year, ())]
+    weights = [1, 1, 6, 12, 20, 6, 1, 1][:len(awards)]
+    truth = Counter()
+    pages = [[f"{year} {contest_type} Problem {problem} Results"]]
+    control = 10000 if year <= 2018 else 2000000 + (year % 100) * 100000
+    for _ in range(n_pages):
+        lines = []
+        for _ in range(rows):
+            award = rnd.choices(awards, weights)[0]
+            truth[award] += 1
+            institution = rnd.choice(INSTITUTIONS)
+            if award_quirk is not None and rnd.random() < QUIRK_RATE:
+                award = award_quirk(rnd, award)
+            if inst_quirk is not None and rnd.random() < QUIRK_RATE:
+                institution = inst_quirk(institution)
+            control += rnd.randint(1, 9)
+            lines.append(f"{control} {institution} {rnd.choice(ADVISORS)} {award}")
+        pages.append(lines)
+    return pages, truth
+
+
+# -----------------------------------
+# PDF 写出
+# -----------------------------------
+def _cmap(codes: dict) -> bytes:
+    entries = sorted(codes.items(), key=lambda item: item[1])
+    body = []
+    for k in range(0, len(entries), 100):  # bfchar 每段最多 100 项
+        chunk = entries[k:k + 100]
+        body.append(f"{len(chunk)} beginbfchar\n")
+        body.extend(f"<{code:04X}> <{ch.encode('utf-16-be').hex().upper()}>\n" for ch, code in chunk)
+        body.append("endbfchar\n")
+    return ("/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            "/CMapName /Synth-UCS def /CMapType 2 def\n"
+            "1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+            + "".join(body) + "endcmap CMapName currentdict /CMap defineresource pop end end").encode("ascii")
+
+
+def write_pdf(path: str, pages):
+    """pages: 各页的行文本列表; 返回文件字节数"""
+    chars = sorted({ch for lines in pages for line in lines for ch in line})
+    codes = {ch: k + 1 for k, ch in enumerate(chars)}
+    objs = []
+
+    def add(data: bytes) -> int:
+        objs.append(data)
+        return len(objs)
+
+    def stream(data: bytes) -> bytes:
+        data = zlib.compress(data)
+        return b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream"
+
+    to_unicode = add(stream(_cmap(codes)))
+    descendant = add(b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Synth /CIDSystemInfo "
+                     b"<< /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 500 >>")
+    font = add(b"<< /Type /Font /Subtype /Type0 /BaseFont /Synth /Encoding /Identity-H "
+               b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (descendant, to_unicode))
+    pages_id = add(b"")
+    kids = []
+    for lines in pages:
+        ops = [b"BT /F1 9 Tf"]
+        y = 780
+        for line in lines:
+            hex_text = "".join(f"{codes[ch]:04X}" for ch in line).encode("ascii")
+            ops.append(b"1 0 0 1 36 %d Tm <%s> Tj" % (y, hex_text))
+            y -= 18
+        ops.append(b"ET")
+        content = add(stream(b"\n".join(ops)))
+        kids.append(add(b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                        b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (pages_id, font, content)))
+    objs[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+    catalog = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for k, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % k + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, catalog, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+    return len(out)
+
+
+def make_results_pdf(path: str, year: int, contest_type: str, problem: str, n_pages: int,
+                     rows: int = ROWS_PER_PAGE, seed: int = 0) -> Counter:
+    """生成一个结果 PDF(封面 + n_pages 页队伍), 返回各奖项的真实数量"""
+    pages, truth = make_rows(year, contest_type, problem, n_pages, rows, seed)
+    write_pdf(path, pages)
+    return truth
+
+
+# -----------------------------------
+if __name__ == "__main__":
+    if len(sys.argv) < 5:
+        print("用法: python synthpdf.py 输出路径 年份 赛别 题号 [页数]")
+        sys.exit(1)
+    truth = make_results_pdf(sys.argv[1], int(sys.argv[2]), sys.argv[3], sys.argv[4],
+                             int(sys.argv[5]) if len(sys.argv) > 5 else 50)
+    print(f"[完成] {sys.argv[1]}: " + ", ".join(f"{aw}: {n}" for aw, n in truth.items()))
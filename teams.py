@@ -0,0 +1,352 @@
+import os
+import sys
+import json
+import time
+import shutil
+import numpy as np
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pagecache import iter_page_texts
+from profiles import AWARDS, lookup
+from extractors import CONTROL_PAT
+from countall import build_tasks
+'''
+队伍级结果表(列式存储):
+每支队伍一行: 控制号、年份、赛别、题号、奖项、院校、指导教师、所在页
+- 院校 / 指导教师等重复字符串做字典编码, 行里只存整数 id
+- 构建时各列是 array.array 定长类型数组, 保存为 .npy, 读取时 np.load(mmap_mode="r") 直接映射, 不需要重新提取
+- 字典保存为 UTF-8 拼接块 + 偏移数组, 加载时一次性解码
+
+目录结构(默认 team_table/):
+    control.npy year.npy contest.npy problem.npy award.npy institution.npy advisor.npy page.npy
+    institution.blob institution_offsets.npy advisor.blob advisor_offsets.npy meta.json
+meta.json 里的 stamps 记录每个 (年份, 赛别, 题号) 最后一次写入的时间, 下游索引据此做增量更新
+
+行的切分: 页面文本按控制号切段, 段内最后一个奖项之前的文字为 “院校 指导教师”,
+两者的分界按院校关键词推断(见 split_institution_advisor), 院校名的进一步归一化见后续模块
+'''
+
+TABLE_DIR = "team_table"
+CONTESTS = ["MCM", "ICM"]
+PROBLEMS = "ABCDEF"
+UNKNOWN_AWARD = len(AWARDS)  # 段内没有找到奖项
+
+# 列名 -> (array 类型码, numpy 类型)
+COLUMNS = {
+    "control": ("I", np.uint32),
+    "year": ("H", np.uint16),
+    "contest": ("B", np.uint8),
+    "problem": ("B", np.uint8),
+    "award": ("B", np.uint8),
+    "institution": ("I", np.uint32),
+    "advisor": ("I", np.uint32),
+    "page": ("H", np.uint16),
+}
+STRING_COLUMNS = ("institution", "advisor")
+
+INSTITUTION_WORDS = {
+    "university", "college", "institute", "school", "academy", "polytechnic", "conservatory",
+    "universidad", "université", "universität", "universiti", "universitas", "campus", "department",
+}
+CONNECTORS = {"of", "and", "&", "for", "in", "the", "de", "at", "-", "du", "la"}
+
+
+# -----------------------------------
+# 字典编码
+# -----------------------------------
+class StringPool:
+    """字符串 <-> 整数 id; id 0 固定为空字符串"""
+
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self, strings=None):
+        self.strings = list(strings) if strings else [""]
+        self._ids = None
+
+    def intern(self, s: str) -> int:
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self.strings)}
+        i = self._ids.get(s)
+        if i is None:
+            i = self._ids[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def id_of(self, s: str):
+        if self._ids is None:
+            self._ids = {v: i for i, v in enumerate(self.strings)}
+        return self._ids.get(s)
+
+    def __getitem__(self, i: int) -> str:
+        return self.strings[i]
+
+    def __len__(self):
+        return len(self.strings)
+
+    def save(self, path: str, name: str):
+        data = [s.encode("utf-8") for s in self.strings]
+        offsets = np.zeros(len(data) + 1, dtype=np.uint64)
+        np.cumsum([len(b) for b in data], out=offsets[1:])
+        with open(os.path.join(path, f"{name}.blob"), "wb") as f:
+            f.write(b"".join(data))
+        np.save(os.path.join(path, f"{name}_offsets.npy"), offsets)
+
+    @classmethod
+    def load(cls, path: str, name: str):
+        offsets = np.load(os.path.join(path, f"{name}_offsets.npy"), mmap_mode="r")
+        with open(os.path.join(path, f"{name}.blob"), "rb") as f:
+            blob = f.read()
+        bounds = offsets.tolist()
+        return cls(blob[bounds[k]:bounds[k + 1]].decode("utf-8") for k in range(len(bounds) - 1))
+
+
+# -----------------------------------
+# 行解析
+# -----------------------------------
+def split_institution_advisor(text: str):
+    """
+    “院校 指导教师” -> (院校, 指导教师)
+    院校取到最后一个院校关键词为止, 其后 “of X / and X / (X)” 之类的连接部分也算院校;
+    找不到关键词时末尾两个词视为指导教师
+    """
+    tokens = text.split()
+    last = -1
+    for k, tok in enumerate(tokens):
+        if tok.strip(",.()").lower() in INSTITUTION_WORDS:
+            last = k
+    if last < 0:
+        cut = max(len(tokens) - 2, 0)
+    else:
+        cut = last + 1
+        while cut < len(tokens):
+            tok = tokens[cut]
+            if tok.startswith("("):
+                # 括号里的校区名, 如 (Weihai)
+                while cut < len(tokens) and not tokens[cut].endswith(")"):
+                    cut += 1
+                cut += 1
+            elif tok.lower() in CONNECTORS and cut + 1 < len(tokens):
+                cut += 2
+            else:
+                break
+        cut = min(cut, len(tokens))
+    return " ".join(tokens[:cut]).strip(" ,"), " ".join(tokens[cut:]).strip(" ,")
+
+
+def award_code(word: str, normalize=None) -> int:
+    """匹配原文 -> 奖项下标(规则与 awardcount 相同), 不计数的返回 UNKNOWN_AWARD"""
+    award = normalize(word) if normalize is not None else word
+    try:
+        return AWARDS.index(award)
+    except ValueError:
+        return UNKNOWN_AWARD
+
+
+def parse_team_rows(text: str, award_pat, normalize=None):
+    """从一页清洗后的文本中切出队伍行, 产出 (控制号, 院校, 指导教师, 奖项下标)"""
+    starts = list(CONTROL_PAT.finditer(text))
+    for k, m in enumerate(starts):
+        end = starts[k + 1].start() if k + 1 < len(starts) else len(text)
+        segment = text[m.end():end]
+        code, names = UNKNOWN_AWARD, segment
+        for hit in award_pat.finditer(segment):
+            c = award_code(hit.group(), normalize)
+            if c != UNKNOWN_AWARD:
+                code, names = c, segment[:hit.start()]
+        institution, advisor = split_institution_advisor(" ".join(names.split()))
+        yield int(m.group()), institution, advisor, code
+
+
+def extract_pdf_rows(year: int, contest_type: str, problem: str, pdf_path: str):
+    """工作进程: 提取一个 PDF 的全部队伍行, 返回 [(页下标, 控制号, 院校, 指导教师, 奖项下标), ...]"""
+    profile = lookup(year, contest_type, problem)
+    rows = []
+    try:
+        for i, raw_text in iter_page_texts(pdf_path):
+            text = raw_text if profile.clean is None else profile.clean(raw_text)
+            for control, institution, advisor, code in parse_team_rows(text, profile.award_pat, profile.normalize):
+                rows.append((i, control, institution, advisor, code))
+    except Exception as e:
+        print(f"[错误] 无法读取 PDF: {pdf_path} - {e}")
+    return rows
+
+
+# -----------------------------------
+# 表
+# -----------------------------------
+def stamp_key(year: int, contest_type: str, problem: str) -> str:
+    return f"{year}-{contest_type}-{problem}"
+
+
+def parse_stamp_key(key: str):
+    year, contest_type, problem = key.split("-")
+    return int(year), contest_type, problem
+
+
+class TeamRow:
+    __slots__ = ("control", "year", "contest", "problem", "award", "institution", "advisor", "page")
+
+    def __init__(self, control, year, contest, problem, award, institution, advisor, page):
+        self.control = control
+        self.year = year
+        self.contest = contest
+        self.problem = problem
+        self.award = award
+        self.institution = institution
+        self.advisor = advisor
+        self.page = page
+
+    def __repr__(self):
+        return (f"TeamRow({self.control}, {self.year}, {self.contest}, {self.problem}, "
+                f"{self.award!r}, {self.institution!r}, {self.advisor!r}, page={self.page})")
+
+
+class TeamTable:
+    """
+    columns: {列名: numpy 数组}(从磁盘加载时是只读内存映射)
+    pools: {"institution": StringPool, "advisor": StringPool}
+    stamps: {"年份-赛别-题号": 写入时间}
+    """
+
+    def __init__(self, columns=None, pools=None, stamps=None):
+        self.columns = columns or {name: array(code) for name, (code, _) in COLUMNS.items()}
+        self.pools = pools or {name: StringPool() for name in STRING_COLUMNS}
+        self.stamps = stamps or {}
+
+    def __len__(self):
+        return len(self.columns["control"])
+
+    def append_pdf(self, year: int, contest_type: str, problem: str, rows):
+        """追加一个 PDF 的行(构建阶段, 列为 array.array)"""
+        cols = self.columns
+        contest = CONTESTS.index(contest_type)
+        prob = PROBLEMS.index(problem)
+        inst_pool, adv_pool = self.pools["institution"], self.pools["advisor"]
+        self.stamps[stamp_key(year, contest_type, problem)] = time.time()
+        for page, control, institution, advisor, code in rows:
+            cols["control"].append(control)
+            cols["year"].append(year)
+            cols["contest"].append(contest)
+            cols["problem"].append(prob)
+            cols["award"].append(code)
+            cols["institution"].append(inst_pool.intern(institution))
+            cols["advisor"].append(adv_pool.intern(advisor))
+            cols["page"].append(page)
+
+    def row(self, i: int) -> TeamRow:
+        cols = self.columns
+        award = int(cols["award"][i])
+        return TeamRow(int(cols["control"][i]), int(cols["year"][i]), CONTESTS[int(cols["contest"][i])],
+                       PROBLEMS[int(cols["problem"][i])], AWARDS[award] if award < len(AWARDS) else None,
+                       self.pools["institution"][int(cols["institution"][i])],
+                       self.pools["advisor"][int(cols["advisor"][i])], int(cols["page"][i]))
+
+    def select(self, year=None, contest_type=None, problem=None, award=None):
+        """返回满足条件的行号数组"""
+        cols = {name: np.asarray(col) for name, col in self.columns.items()}
+        mask = np.ones(len(self), dtype=bool)
+        if year is not None:
+            mask &= np.isin(cols["year"], year)
+        if contest_type is not None:
+            mask &= cols["contest"] == CONTESTS.index(contest_type)
+        if problem is not None:
+            mask &= cols["problem"] == PROBLEMS.index(problem)
+        if award is not None:
+            mask &= cols["award"] == AWARDS.index(award)
+        return np.flatnonzero(mask)
+
+    def keys(self):
+        """表中已有的 (年份, 赛别, 题号)"""
+        year = np.asarray(self.columns["year"])
+        contest = np.asarray(self.columns["contest"])
+        problem = np.asarray(self.columns["problem"])
+        combined = np.unique(year.astype(np.int64) * 100 + contest.astype(np.int64) * 10 + problem)
+        return {(int(v // 100), CONTESTS[int(v // 10 % 10)], PROBLEMS[int(v % 10)]) for v in combined}
+
+    def without(self, keys):
+        """去掉指定 (年份, 赛别, 题号) 的行, 返回新表(字典原样保留)"""
+        year = np.asarray(self.columns["year"])
+        contest = np.asarray(self.columns["contest"])
+        problem = np.asarray(self.columns["problem"])
+        keep = np.ones(len(self), dtype=bool)
+        for y, t, p in keys:
+            keep &= ~((year == y) & (contest == CONTESTS.index(t)) & (problem == PROBLEMS.index(p)))
+        columns = {name: array(COLUMNS[name][0], np.asarray(col)[keep].tobytes())
+                   for name, col in self.columns.items()}
+        pools = {name: StringPool(pool.strings) for name, pool in self.pools.items()}
+        dropped = {stamp_key(*key) for key in keys}
+        stamps = {key: t for key, t in self.stamps.items() if key not in dropped}
+        return TeamTable(columns, pools, stamps)
+
+    # -----------------------------------
+    # 持久化
+    # -----------------------------------
+    def save(self, path: str = TABLE_DIR):
+        """写入临时目录后整体替换"""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name, (_, dtype) in COLUMNS.items():
+            np.save(os.path.join(tmp, f"{name}.npy"), np.asarray(self.columns[name], dtype=dtype))
+        for name, pool in self.pools.items():
+            pool.save(tmp, name)
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"rows": len(self), "contests": CONTESTS, "problems": PROBLEMS, "awards": AWARDS,
+                       "stamps": self.stamps}, f, ensure_ascii=False)
+        old = f"{path}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str = TABLE_DIR):
+        """列以只读内存映射方式打开; 不存在时返回空表"""
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return cls()
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+        pools = {name: StringPool.load(path, name) for name in STRING_COLUMNS}
+        return cls(columns, pools, meta.get("stamps"))
+
+
+def update_team_table(tasks, path: str = TABLE_DIR, max_workers=None) -> TeamTable:
+    """
+    tasks: [(年份, 题号, 路径, 赛别), ...](countall.build_tasks 的格式)
+    这些 PDF 的旧行先删除再追加新提取的行, 其余年份原样保留
+    """
+    max_workers = max_workers or os.cpu_count() or 4
+    table = TeamTable.load(path)
+    table = table.without({(year, contest_type, prob) for year, prob, _, contest_type in tasks})
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(task, executor.submit(extract_pdf_rows, task[0], task[3], task[1], task[2])) for task in tasks]
+        for (year, prob, _, contest_type), fut in futures:
+            rows = fut.result()
+            table.append_pdf(year, contest_type, prob, rows)
+            print(f"[完成] {year}-{contest_type}-Problem {prob}: {len(rows)} 支队伍")
+    table.save(path)
+    return TeamTable.load(path)
+
+
+# -----------------------------------
+# 主函数
+# -----------------------------------
+def main():
+    start_year = 2016
+    end_year = 2025
+
+    tasks = build_tasks(start_year, end_year)
+    if not tasks:
+        print("[错误] 没有找到任何 PDF 文件")
+        sys.exit(1)
+
+    table = update_team_table(tasks)
+    print(f"\n🎯 队伍表已写入 {TABLE_DIR}/: {len(table)} 行, "
+          f"{len(table.pools['institution'])} 所院校, {len(table.pools['advisor'])} 位指导教师")
+
+# -----------------------------------
+if __name__ == "__main__":
+    main()
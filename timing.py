@@ -0,0 +1,219 @@
+import os
+import json
+import time
+import shutil
+'''
+分阶段计时(按需开启): 设置环境变量 COMAP_TIMING=1(或一个输出目录)后, 各统计路径记录
+open(PdfReader 构造) / cache(读页面缓存) / extract(提取文本) / clean(清洗) / match(匹配与计数) / print(输出结果)
+的用时, 按 PDF、按页以及总计汇总, 并记录页数、缓存命中等计数
+
+- 未开启时 lap() 只做一次布尔判断就返回, 热路径上几乎没有开销
+- 工作进程在每个任务结束时调用 flush(), 把本进程累计的数据写到本次运行的临时目录;
+  主进程最后调用 report() 合并所有进程的数据, 输出 JSON 报告和 Prometheus textfile(供 node_exporter 采集)
+- fork 出的子进程一开始就清空从父进程继承的数据(那部分由父进程自己写出), 否则合并时会重复计入
+
+输出(默认目录 timing/):
+    timing-<运行编号>.json   总计、各 PDF、各页的用时与计数
+    comap_timing.prom        Prometheus 文本格式, 每次运行覆盖
+'''
+
+_SETTING = os.environ.get("COMAP_TIMING", "")
+ENABLED = _SETTING not in ("", "0")
+OUT_DIR = _SETTING if ENABLED and _SETTING != "1" else "timing"
+# 同一次运行的所有进程共用一个编号: 第一个导入本模块的进程生成, 工作进程通过环境变量继承
+RUN_ID = os.environ.setdefault("COMAP_TIMING_RUN", f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+PROM_NAME = "comap_timing.prom"
+# 单页用时直方图的桶(秒)
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+clock = time.perf_counter
+
+# 本进程的累计数据
+_stages = {}    # 阶段 -> [次数, 总秒数, 最大秒数]
+_pdfs = {}      # PDF 文件名 -> {阶段: 秒数}
+_pages = {}     # PDF 文件名 -> {页下标: {阶段: 秒数}}
+_counters = {}  # 名称 -> 数量
+
+
+def _reset():
+    _stages.clear()
+    _pdfs.clear()
+    _pages.clear()
+    _counters.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def start() -> float:
+    """开始计时, 未开启时返回 0"""
+    return clock() if ENABLED else 0.0
+
+
+def lap(stage: str, t0: float, pdf_path: str = None, page: int = None) -> float:
+    """
+    记录从 t0 到现在的用时, 返回当前时刻作为下一段的起点
+    用法: t = timing.start(); ...; t = timing.lap("clean", t, pdf_path, i); ...; t = timing.lap("match", t, pdf_path, i)
+    """
+    if not ENABLED:
+        return 0.0
+    now = clock()
+    seconds = now - t0
+    entry = _stages.get(stage)
+    if entry is None:
+        entry = _stages[stage] = [0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += seconds
+    if seconds > entry[2]:
+        entry[2] = seconds
+    if pdf_path is not None:
+        name = os.path.basename(pdf_path)
+        per_pdf = _pdfs.setdefault(name, {})
+        per_pdf[stage] = per_pdf.get(stage, 0.0) + seconds
+        if page is not None:
+            per_page = _pages.setdefault(name, {}).setdefault(page, {})
+            per_page[stage] = per_page.get(stage, 0.0) + seconds
+    return now
+
+
+def count(name: str, n: int = 1):
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot() -> dict:
+    return {
+        "stages": _stages,
+        "pdfs": _pdfs,
+        "pages": {name: {str(i): stages for i, stages in pages.items()} for name, pages in _pages.items()},
+        "counters": _counters,
+    }
+
+
+def _spool_dir() -> str:
+    return os.path.join(OUT_DIR, f".spool-{RUN_ID}")
+
+
+def flush():
+    """把本进程的累计数据写入本次运行的临时目录(覆盖本进程上一次写入的文件)"""
+    if not ENABLED or not (_stages or _counters):
+        return
+    spool = _spool_dir()
+    os.makedirs(spool, exist_ok=True)
+    path = os.path.join(spool, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def merge(snapshots) -> dict:
+    """合并多个进程的数据"""
+    stages, pdfs, pages, counters = {}, {}, {}, {}
+    for snap in snapshots:
+        for stage, (n, total, peak) in snap["stages"].items():
+            entry = stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += n
+            entry[1] += total
+            entry[2] = max(entry[2], peak)
+        for name, per_pdf in snap["pdfs"].items():
+            merged = pdfs.setdefault(name, {})
+            for stage, seconds in per_pdf.items():
+                merged[stage] = merged.get(stage, 0.0) + seconds
+        for name, per_page in snap["pages"].items():
+            merged = pages.setdefault(name, {})
+            for page, per_stage in per_page.items():
+                target = merged.setdefault(page, {})
+                for stage, seconds in per_stage.items():
+                    target[stage] = target.get(stage, 0.0) + seconds
+        for name, n in snap["counters"].items():
+            counters[name] = counters.get(name, 0) + n
+    return {"stages": stages, "pdfs": pdfs, "pages": pages, "counters": counters}
+
+
+# -----------------------------------
+# 输出
+# -----------------------------------
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(data: dict) -> str:
+    lines = [
+        "# HELP comap_stage_seconds_total 各阶段累计用时(秒)",
+        "# TYPE comap_stage_seconds_total counter",
+    ]
+    for stage, (_, total, _) in sorted(data["stages"].items()):
+        lines.append(f'comap_stage_seconds_total{{stage="{stage}"}} {total:.6f}')
+    lines += ["# HELP comap_stage_calls_total 各阶段计时次数", "# TYPE comap_stage_calls_total counter"]
+    for stage, (n, _, _) in sorted(data["stages"].items()):
+        lines.append(f'comap_stage_calls_total{{stage="{stage}"}} {n}')
+    lines += ["# HELP comap_stage_max_seconds 各阶段单次最大用时(秒)", "# TYPE comap_stage_max_seconds gauge"]
+    for stage, (_, _, peak) in sorted(data["stages"].items()):
+        lines.append(f'comap_stage_max_seconds{{stage="{stage}"}} {peak:.6f}')
+
+    lines += ["# HELP comap_pdf_stage_seconds 各 PDF 各阶段用时(秒)", "# TYPE comap_pdf_stage_seconds gauge"]
+    for name, per_pdf in sorted(data["pdfs"].items()):
+        for stage, seconds in sorted(per_pdf.items()):
+            lines.append(f'comap_pdf_stage_seconds{{pdf="{_label(name)}",stage="{stage}"}} {seconds:.6f}')
+
+    # 单页用时分布
+    lines += ["# HELP comap_page_stage_seconds 单页各阶段用时分布(秒)", "# TYPE comap_page_stage_seconds histogram"]
+    per_stage = {}
+    for per_page in data["pages"].values():
+        for stages in per_page.values():
+            for stage, seconds in stages.items():
+                per_stage.setdefault(stage, []).append(seconds)
+    for stage, values in sorted(per_stage.items()):
+        for bound in BUCKETS:
+            n = sum(1 for v in values if v <= bound)
+            lines.append(f'comap_page_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+        lines.append(f'comap_page_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {len(values)}')
+        lines.append(f'comap_page_stage_seconds_sum{{stage="{stage}"}} {sum(values):.6f}')
+        lines.append(f'comap_page_stage_seconds_count{{stage="{stage}"}} {len(values)}')
+
+    lines += ["# HELP comap_events_total 计数(页数、缓存命中等)", "# TYPE comap_events_total counter"]
+    for name, n in sorted(data["counters"].items()):
+        lines.append(f'comap_events_total{{name="{_label(name)}"}} {n}')
+    return "\n".join(lines) + "\n"
+
+
+def report(title: str = None):
+    """
+    主进程结束前调用: 合并本次运行所有进程的数据, 写出 JSON 报告和 Prometheus 文件并打印总计
+    未开启时什么也不做
+    """
+    if not ENABLED:
+        return None
+    flush()
+    spool = _spool_dir()
+    snapshots = []
+    if os.path.isdir(spool):
+        for name in sorted(os.listdir(spool)):
+            if name.endswith(".json"):
+                with open(os.path.join(spool, name), encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+    data = merge(snapshots)
+    data["run"] = RUN_ID
+    data["title"] = title
+    data["processes"] = len(snapshots)
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    json_path = os.path.join(OUT_DIR, f"timing-{RUN_ID}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    prom_path = os.path.join(OUT_DIR, PROM_NAME)
+    with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(prometheus_text(data))
+    os.replace(prom_path + ".tmp", prom_path)
+    shutil.rmtree(spool, ignore_errors=True)
+
+    total = sum(entry[1] for entry in data["stages"].values()) or 1.0
+    print(f"\n⏱️ 分阶段用时({len(snapshots)} 个进程合计)")
+    for stage, (n, seconds, peak) in sorted(data["stages"].items(), key=lambda item: -item[1][1]):
+        print(f"{stage:<8} {seconds:>9.3f} 秒  {seconds / total:>6.1%}  {n:>7} 次  最长 {peak * 1000:>8.1f} ms")
+    if data["counters"]:
+        print("  " + ", ".join(f"{name}: {n}" for name, n in sorted(data["counters"].items())))
+    print(f"[完成] 计时报告: {json_path}, {prom_path}")
+    return data